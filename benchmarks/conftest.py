@@ -0,0 +1,180 @@
+"""Timing, allocation and baseline plumbing for the benchmarks.
+
+Run with ``pytest benchmarks``. Results are compared with
+``benchmarks/baseline.json``; pass ``--bench-update-baseline`` to record a
+new baseline and ``--bench-fail-on-regression`` to fail the session when a
+phase is slower than the baseline by more than ``--bench-tolerance``.
+"""
+
+import gc
+import inspect
+import json
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DEFAULT_TOLERANCE = 1.5
+
+
+@dataclass
+class BenchResult:
+    """Timing and allocations of one benchmarked phase."""
+
+    seconds: float
+    items_per_second: float
+    allocated_kib: float
+    peak_kib: float
+
+
+class BenchRecorder:
+    """Measure phases and collect their results for the session report."""
+
+    def __init__(self, results: dict[str, BenchResult]) -> None:
+        """Initialize the recorder."""
+        self._results = results
+
+    async def async_measure(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        *,
+        items: int,
+        rounds: int = 5,
+    ) -> BenchResult:
+        """Time a phase over several rounds, then trace one more for memory.
+
+        ``func`` may return an awaitable. ``items`` is the number of objects
+        the phase handles, used to report throughput. The reported time is
+        the median round.
+        """
+        timings = []
+        for _ in range(rounds):
+            gc.collect()
+            start = time.perf_counter()
+            if inspect.isawaitable(result := func()):
+                await result
+            timings.append(time.perf_counter() - start)
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            if inspect.isawaitable(result := func()):
+                await result
+            allocated, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return self.record(name, timings, items=items, allocated=allocated, peak=peak)
+
+    def record(self, name: str, timings: list[float], *, items: int, allocated: int, peak: int) -> BenchResult:
+        """Record a phase measured elsewhere, such as in a subprocess.
+
+        ``allocated`` and ``peak`` are traced memory in bytes.
+        """
+        seconds = statistics.median(timings)
+        self._results[name] = bench_result = BenchResult(
+            seconds=seconds,
+            items_per_second=items / seconds if seconds else float("inf"),
+            allocated_kib=allocated / 1024,
+            peak_kib=peak / 1024,
+        )
+        return bench_result
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register the benchmark options."""
+    group = parser.getgroup("hyperoptic benchmarks")
+    group.addoption("--bench-update-baseline", action="store_true", help="Write results to baseline.json")
+    group.addoption(
+        "--bench-fail-on-regression",
+        action="store_true",
+        help="Fail if a phase is slower than the baseline beyond the tolerance",
+    )
+    group.addoption(
+        "--bench-tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Allowed slowdown factor against the baseline (default {DEFAULT_TOLERANCE})",
+    )
+
+
+_RESULTS_KEY = pytest.StashKey[dict[str, BenchResult]]()
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Create the result store shared by all benchmarks."""
+    config.stash[_RESULTS_KEY] = {}
+
+
+@pytest.fixture
+def bench(request: pytest.FixtureRequest) -> BenchRecorder:
+    """Return the recorder for the running benchmark."""
+    return BenchRecorder(request.config.stash[_RESULTS_KEY])
+
+
+def _load_baseline() -> dict[str, dict[str, float]]:
+    """Return the stored baseline, or an empty one."""
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text())["results"]
+
+
+def _regressions(config: pytest.Config) -> list[str]:
+    """Return the phases slower than the baseline beyond the tolerance."""
+    baseline = _load_baseline()
+    tolerance = config.getoption("--bench-tolerance")
+    return [
+        name
+        for name, result in config.stash[_RESULTS_KEY].items()
+        if name in baseline and result.seconds > baseline[name]["seconds"] * tolerance
+    ]
+
+
+def pytest_terminal_summary(terminalreporter: Any, exitstatus: int, config: pytest.Config) -> None:
+    """Report every phase against the baseline, and update it if asked."""
+    results = config.stash[_RESULTS_KEY]
+    if not results:
+        return
+
+    baseline = _load_baseline()
+    regressions = set(_regressions(config))
+    terminalreporter.section("hyperoptic benchmarks")
+    terminalreporter.write_line(
+        f"{'phase':<44} {'median ms':>10} {'items/s':>12} {'alloc KiB':>10} {'peak KiB':>10} {'vs base':>8}"
+    )
+    for name, result in sorted(results.items()):
+        ratio = f"{result.seconds / baseline[name]['seconds']:.2f}x" if name in baseline else "new"
+        flag = "  REGRESSION" if name in regressions else ""
+        terminalreporter.write_line(
+            f"{name:<44} {result.seconds * 1000:>10.3f} {result.items_per_second:>12.0f} "
+            f"{result.allocated_kib:>10.1f} {result.peak_kib:>10.1f} {ratio:>8}{flag}"
+        )
+
+    if config.getoption("--bench-update-baseline"):
+        BASELINE_PATH.write_text(
+            json.dumps(
+                {
+                    "results": {
+                        name: {key: float(f"{value:.6g}") for key, value in asdict(result).items()}
+                        for name, result in sorted(results.items())
+                    }
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        terminalreporter.write_line(f"Baseline written to {BASELINE_PATH}")
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    """Fail the session on regressions when asked to."""
+    config = session.config
+    if config.getoption("--bench-fail-on-regression") and _regressions(config):
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
@@ -0,0 +1,75 @@
+"""Synthetic Hyperoptic portfolios for benchmarking."""
+
+from dataclasses import dataclass
+from typing import Any
+
+from hyperoptic.models import Customer, Package
+
+from tests.fake_hyperoptic import FakeDataset, generate_dataset
+
+
+@dataclass(frozen=True)
+class PortfolioSize:
+    """Shape of a synthetic portfolio; see generate_dataset."""
+
+    accounts: int
+    packages: int
+    connections: int
+    tiers: int
+
+    def dataset(self, seed: int = 0) -> FakeDataset:
+        """Return the raw API responses of a portfolio of this size."""
+        return generate_dataset(self.accounts, self.packages, self.connections, self.tiers, seed)
+
+    def __str__(self) -> str:
+        """Return a compact label like a10-p20-c10-t6."""
+        return f"a{self.accounts}-p{self.packages}-c{self.connections}-t{self.tiers}"
+
+
+@dataclass
+class Portfolio:
+    """Raw API responses of a synthetic customer."""
+
+    customer: dict[str, Any]
+    packages: list[dict[str, Any]]
+    connections: dict[str, dict[str, Any]]
+
+
+def generate_portfolio(size: PortfolioSize, seed: int = 0) -> Portfolio:
+    """Build a deterministic synthetic portfolio of the given size."""
+    dataset = size.dataset(seed)
+    return Portfolio(customer=dataset.customer, packages=dataset.packages, connections=dataset.connections)
+
+
+class FakeClient:
+    """In-memory stand-in for HyperopticApiClient serving a portfolio."""
+
+    def __init__(self, portfolio: Portfolio) -> None:
+        """Initialize the client."""
+        self._portfolio = portfolio
+
+    async def async_authenticate(self) -> None:
+        """Do nothing; there is no login."""
+
+    async def async_get_customer_data(self) -> dict[str, Any]:
+        """Return the raw customer."""
+        return self._portfolio.customer
+
+    async def async_get_customer(self) -> Customer:
+        """Return the customer."""
+        return Customer.model_validate(self._portfolio.customer)
+
+    async def async_get_packages_data(self, customer_id: str) -> list[dict[str, Any]]:
+        """Return the raw packages."""
+        return self._portfolio.packages
+
+    async def async_get_packages(self, customer_id: str) -> list[Package]:
+        """Return the packages."""
+        return [Package.model_validate(package) for package in self._portfolio.packages]
+
+    async def async_get_connection(self, connection_id: str) -> dict[str, Any]:
+        """Return the raw details of a connection."""
+        return self._portfolio.connections[connection_id]
+
+    async def async_close(self) -> None:
+        """Do nothing; there is nothing to release."""
@@ -0,0 +1,216 @@
+"""Benchmarks of the refresh transform, entity setup, state reads and import time."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.hyperoptic import binary_sensor, sensor
+from custom_components.hyperoptic.const import DOMAIN
+from custom_components.hyperoptic.coordinator import HyperopticCoordinator
+
+from tests.fake_hyperoptic import FakeHyperopticServer
+
+from .synthetic import FakeClient, PortfolioSize, generate_portfolio
+
+# Per-request latency of the fake server in the end-to-end benchmark
+SERVER_LATENCY = 0.005
+
+SIZES = [
+    PortfolioSize(accounts=1, packages=1, connections=1, tiers=3),
+    PortfolioSize(accounts=10, packages=20, connections=10, tiers=6),
+    PortfolioSize(accounts=50, packages=100, connections=50, tiers=12),
+]
+
+
+# Modules Home Assistant has already loaded when it imports the integration
+HA_PRELOADED = [
+    "aiohttp",
+    "voluptuous",
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.helpers.storage",
+    "homeassistant.components.sensor",
+    "homeassistant.components.binary_sensor",
+    "homeassistant.components.diagnostics",
+]
+
+INTEGRATION_MODULES = [
+    "custom_components.hyperoptic",
+    "custom_components.hyperoptic.config_flow",
+    "custom_components.hyperoptic.sensor",
+    "custom_components.hyperoptic.binary_sensor",
+    "custom_components.hyperoptic.diagnostics",
+]
+
+# Imports the integration in a fresh interpreter and prints the cost as JSON
+IMPORT_SCRIPT = """
+import importlib, json, sys, time, tracemalloc
+for module in sys.argv[2].split(","):
+    importlib.import_module(module)
+trace = sys.argv[1] == "trace"
+if trace:
+    tracemalloc.start()
+start = time.perf_counter()
+for module in sys.argv[3].split(","):
+    importlib.import_module(module)
+seconds = time.perf_counter() - start
+allocated, peak = tracemalloc.get_traced_memory() if trace else (0, 0)
+print(json.dumps({"seconds": seconds, "allocated": allocated, "peak": peak, "modules": sorted(sys.modules)}))
+"""
+
+
+@pytest.fixture(params=SIZES, ids=str)
+def size(request: pytest.FixtureRequest) -> PortfolioSize:
+    """Return the portfolio size to benchmark."""
+    return request.param
+
+
+@pytest.fixture
+async def coordinator(hass: HomeAssistant, size: PortfolioSize):
+    """Return a coordinator serving a synthetic portfolio."""
+    coordinator = HyperopticCoordinator(hass, email="bench@example.com", password="password")
+    coordinator._client = FakeClient(generate_portfolio(size))
+    coordinator.data = await coordinator._async_update_data()
+    yield coordinator
+    await coordinator.async_shutdown()
+
+
+async def _async_setup_entities(hass: HomeAssistant, coordinator: HyperopticCoordinator) -> list:
+    """Set up both platforms and return their entities."""
+    entities: list = []
+    unloads: list = []
+    entry = SimpleNamespace(entry_id="bench", async_on_unload=unloads.append)
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {"coordinator": coordinator}
+
+    await sensor.async_setup_entry(hass, entry, entities.extend)
+    await binary_sensor.async_setup_entry(hass, entry, entities.extend)
+    for unload in unloads:
+        unload()
+    return entities
+
+
+async def test_bench_transform(bench, coordinator: HyperopticCoordinator, size: PortfolioSize):
+    """Benchmark a refresh whose responses all changed."""
+
+    async def _async_refresh() -> None:
+        coordinator.payload_digests = {}
+        coordinator.invalidate_endpoints()
+        await coordinator._async_update_data()
+
+    await bench.async_measure(
+        f"transform[{size}]",
+        _async_refresh,
+        items=size.accounts + size.packages + size.connections,
+    )
+
+
+async def test_bench_end_to_end_refresh(bench, hass: HomeAssistant, size: PortfolioSize):
+    """Benchmark a refresh through the real client against the fake server."""
+    async with FakeHyperopticServer(size.dataset(), latency=SERVER_LATENCY) as server:
+        with server.patch_client():
+            coordinator = HyperopticCoordinator(hass, email="test@example.com", password="password")
+
+            async def _async_refresh() -> None:
+                coordinator.payload_digests = {}
+                coordinator.invalidate_endpoints()
+                await coordinator._async_update_data()
+
+            await bench.async_measure(
+                f"end_to_end[{size}]",
+                _async_refresh,
+                items=size.accounts + size.packages + size.connections,
+                rounds=3,
+            )
+            await coordinator.async_shutdown()
+
+
+async def test_bench_refresh_unchanged(bench, coordinator: HyperopticCoordinator, size: PortfolioSize):
+    """Benchmark a refresh whose responses match the current snapshot."""
+    data = coordinator.data
+
+    async def _async_refresh() -> None:
+        coordinator.invalidate_endpoints()
+        await coordinator._async_update_data()
+
+    await bench.async_measure(
+        f"refresh_unchanged[{size}]",
+        _async_refresh,
+        items=size.accounts + size.packages + size.connections,
+    )
+
+    assert coordinator.data is data
+
+
+async def test_bench_entity_setup(bench, hass: HomeAssistant, coordinator: HyperopticCoordinator, size: PortfolioSize):
+    """Benchmark creating the entities of both platforms."""
+    entities = await _async_setup_entities(hass, coordinator)
+
+    await bench.async_measure(
+        f"entity_setup[{size}]",
+        lambda: _async_setup_entities(hass, coordinator),
+        items=len(entities),
+        rounds=3,
+    )
+
+
+async def test_bench_state_reads(bench, hass: HomeAssistant, coordinator: HyperopticCoordinator, size: PortfolioSize):
+    """Benchmark reading the state of every entity."""
+    entities = await _async_setup_entities(hass, coordinator)
+    coordinator.async_add_value_builder(sensor.build_values)
+    coordinator.async_add_value_builder(binary_sensor.build_values)
+    sensors = [entity for entity in entities if isinstance(entity, sensor.HyperopticSensorEntity)]
+    binary_sensors = [entity for entity in entities if isinstance(entity, binary_sensor.HyperopticBinarySensorEntity)]
+
+    def _read_states() -> None:
+        for entity in sensors:
+            entity.native_value
+        for entity in binary_sensors:
+            entity.is_on
+
+    await bench.async_measure(f"state_reads[{size}]", _read_states, items=len(entities))
+
+
+def _import_integration(trace: bool) -> dict:
+    """Import the integration in a subprocess and return its measurements."""
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            IMPORT_SCRIPT,
+            "trace" if trace else "time",
+            ",".join(HA_PRELOADED),
+            ",".join(INTEGRATION_MODULES),
+        ],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def test_bench_integration_import(bench):
+    """Benchmark importing the integration's modules into a running Home Assistant.
+
+    Each round uses a fresh interpreter, so nothing is cached between rounds.
+    The client library must not be part of it: it is imported in the
+    executor when first needed.
+    """
+    runs = [_import_integration(trace=False) for _ in range(5)]
+    traced = _import_integration(trace=True)
+
+    assert "hyperoptic" not in traced["modules"]
+    bench.record(
+        "integration_import",
+        [run["seconds"] for run in runs],
+        items=len(INTEGRATION_MODULES),
+        allocated=traced["allocated"],
+        peak=traced["peak"],
+    )
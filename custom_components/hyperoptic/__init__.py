@@ -5,28 +5,58 @@ import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_validation as cv
-
-from .const import CONF_EMAIL, CONF_PASSWORD, DOMAIN, PLATFORMS
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
+
+from .const import (
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    DATA_HANDOFF,
+    DOMAIN,
+    PLATFORMS,
+    STORAGE_VERSION,
+)
 from .coordinator import HyperopticCoordinator
+from .governor import async_get_governor
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
 CONFIG_SCHEMA = cv.empty_config_schema(DOMAIN)
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Hyperoptic services."""
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Hyperoptic from a config entry."""
     hass.data.setdefault(DOMAIN, {})
+    governor = async_get_governor(hass)
+    governor.register(entry.entry_id)
 
     # Create coordinator
     coordinator = HyperopticCoordinator(
         hass,
         email=entry.data[CONF_EMAIL],
         password=entry.data[CONF_PASSWORD],
+        config_entry=entry,
+        governor=governor,
     )
 
-    # Fetch initial data
-    await coordinator.async_config_entry_first_refresh()
+    # Warm start from the last good data and refresh in the background;
+    # only block on the first refresh when there is nothing to restore
+    handoff = hass.data[DOMAIN].setdefault(DATA_HANDOFF, {}).pop(entry.entry_id, None)
+    if await coordinator.async_restore_data(handoff):
+        entry.async_create_background_task(
+            hass,
+            coordinator.async_staggered_refresh(governor.startup_delay(entry.entry_id)),
+            f"{DOMAIN} refresh {entry.entry_id}",
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
 
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
@@ -35,9 +65,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:  # noqa: E501
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)  # noqa: E501
@@ -46,5 +83,16 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         coordinator: HyperopticCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
         await coordinator.async_shutdown()
         hass.data[DOMAIN].pop(entry.entry_id)
+        async_get_governor(hass).unregister(entry.entry_id)
+
+        # Hand the data and its freshness over to the next setup of this entry
+        if (state := coordinator.async_handoff_state()) is not None:
+            hass.data[DOMAIN].setdefault(DATA_HANDOFF, {})[entry.entry_id] = state
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached data of a deleted config entry."""
+    hass.data.get(DOMAIN, {}).get(DATA_HANDOFF, {}).pop(entry.entry_id, None)
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
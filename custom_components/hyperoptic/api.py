@@ -0,0 +1,273 @@
+"""Async client for the Hyperoptic customer portal API."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor
+from functools import partial
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, TypeVar
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.importlib import async_import_module
+
+from .const import TIMEOUT_SECONDS
+
+if TYPE_CHECKING:
+    from hyperoptic import Customer, HyperopticClient, Package
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+API_BASE = "https://api.hyperopticportal.com/account-service"
+TOKEN_URL = "https://auth.hyperoptic.com/realms/hyperoptic/protocol/openid-connect/token"
+CLIENT_ID = "customer-portal"
+SCOPES = "openid email customer_id atlas-chat-audience profile"
+
+HEADERS = {
+    "Accept": "*/*",
+    "Origin": "https://account.hyperoptic.com",
+    "Referer": "https://account.hyperoptic.com/",
+}
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=TIMEOUT_SECONDS)
+
+# Seconds before expiry at which a token is treated as expired
+TOKEN_GRACE_SECONDS = 30
+
+
+async def async_get_library(hass: HomeAssistant) -> ModuleType:
+    """Return the hyperoptic library, importing it in the executor on first use.
+
+    The library pulls in its HTTP stack and pydantic models, which is too
+    slow to do on the event loop while Home Assistant starts.
+    """
+    return await async_import_module(hass, "hyperoptic")
+
+
+class TokenBucket:
+    """Token bucket limiting the request rate of every client sharing it."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Initialize a full bucket refilling at ``rate`` tokens per second."""
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def async_acquire(self) -> None:
+        """Wait until a request may be sent."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+class HyperopticApiClient:
+    """Hyperoptic API client running on Home Assistant's shared aiohttp session.
+
+    Logs in with the OIDC password grant. If the realm refuses that grant,
+    requests fall back to the synchronous library client in the executor,
+    which handles the browser-style PKCE login.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        email: str,
+        password: str,
+        rate_limiter: TokenBucket | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        """Initialize the client."""
+        self._hass = hass
+        self._rate_limiter = rate_limiter
+        self._executor = executor
+        self._session = async_get_clientsession(hass)
+        self._email = email
+        self._password = password
+        self._token_lock = asyncio.Lock()
+        self._access_token: str | None = None
+        self._refresh_token: str | None = None
+        self._access_expires_at = 0.0
+        self._refresh_expires_at = 0.0
+        self._sync_client: "HyperopticClient | None" = None
+
+    async def async_close(self) -> None:
+        """Release resources; the shared aiohttp session stays open."""
+        self._access_token = None
+        self._refresh_token = None
+        client, self._sync_client = self._sync_client, None
+        if client is not None:
+            try:
+                await self._async_run_sync(client.close)
+            except TimeoutError:
+                _LOGGER.warning("Timed out closing the Hyperoptic client")
+
+    async def _async_run_sync(self, target: Callable[..., _T], *args: Any) -> _T:
+        """Run a blocking library call in the executor, within TIMEOUT_SECONDS.
+
+        A call that times out is abandoned. Its thread stays busy until the
+        library returns, which is why the governor gives clients a small
+        dedicated executor instead of Home Assistant's shared one.
+        """
+        async with asyncio.timeout(TIMEOUT_SECONDS):
+            return await self._hass.loop.run_in_executor(self._executor, target, *args)
+
+    # Authentication
+
+    async def _async_token_request(self, data: dict[str, str]) -> tuple[int, Any, str]:
+        """Post to the token endpoint and return status, JSON body and text."""
+        if self._rate_limiter is not None:
+            await self._rate_limiter.async_acquire()
+        async with self._session.post(
+            TOKEN_URL,
+            data={"client_id": CLIENT_ID, **data},
+            headers=HEADERS,
+            timeout=REQUEST_TIMEOUT,
+        ) as resp:
+            text = await resp.text()
+            try:
+                body = await resp.json(content_type=None)
+            except ValueError:
+                body = None
+            return resp.status, body, text
+
+    def _store_tokens(self, data: dict[str, Any]) -> None:
+        """Store a token response."""
+        now = time.monotonic()
+        self._access_token = data["access_token"]
+        self._refresh_token = data.get("refresh_token")
+        self._access_expires_at = now + data.get("expires_in", 300) - TOKEN_GRACE_SECONDS
+        self._refresh_expires_at = now + data.get("refresh_expires_in", 1800) - TOKEN_GRACE_SECONDS
+
+    async def _async_login(self) -> None:
+        """Log in with the password grant, or switch to the sync client."""
+        status, body, text = await self._async_token_request(
+            {
+                "grant_type": "password",
+                "username": self._email,
+                "password": self._password,
+                "scope": SCOPES,
+            }
+        )
+        if status == 200 and body:
+            self._store_tokens(body)
+            return
+
+        lib = await async_get_library(self._hass)
+        if isinstance(body, dict) and body.get("error") == "unauthorized_client":
+            _LOGGER.info("Password grant refused, falling back to the synchronous client")
+            self._sync_client = await self._async_run_sync(
+                partial(lib.HyperopticClient, email=self._email, password=self._password)
+            )
+            return
+
+        raise lib.AuthenticationError(f"Password grant failed ({status}): {text}")
+
+    async def _async_refresh(self) -> None:
+        """Refresh the access token in place, logging in again if refused."""
+        status, body, _ = await self._async_token_request(
+            {"grant_type": "refresh_token", "refresh_token": self._refresh_token or ""}
+        )
+        if status == 200 and body:
+            self._store_tokens(body)
+            return
+
+        _LOGGER.debug("Token refresh failed (%s), logging in again", status)
+        await self._async_login()
+
+    async def _async_ensure_token(self, force_login: bool = False) -> None:
+        """Make sure a valid access token is available."""
+        async with self._token_lock:
+            if self._sync_client is not None:
+                return
+
+            now = time.monotonic()
+            if force_login or self._access_token is None or now >= self._refresh_expires_at:
+                await self._async_login()
+            elif now >= self._access_expires_at:
+                await self._async_refresh()
+
+    # Requests
+
+    async def _async_get(self, path: str, params: dict[str, Any] | None = None) -> Any:
+        """Send an authenticated GET and return the JSON body."""
+        await self._async_ensure_token()
+        if self._sync_client is not None:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.async_acquire()
+            return await self._async_run_sync(partial(self._sync_client.get_raw, path, **(params or {})))
+
+        status, body, text = await self._async_api_request(path, params)
+        if status == 401:
+            # Token may have been revoked server-side, log in again and retry
+            _LOGGER.debug("Got 401 for %s, re-authenticating", path)
+            await self._async_ensure_token(force_login=True)
+            status, body, text = await self._async_api_request(path, params)
+
+        if status >= 400:
+            lib = await async_get_library(self._hass)
+            raise lib.APIError(status_code=status, message=text, url=f"{API_BASE}{path}")
+
+        return body
+
+    async def _async_api_request(self, path: str, params: dict[str, Any] | None) -> tuple[int, Any, str]:
+        """Perform a single GET against the account service."""
+        if self._rate_limiter is not None:
+            await self._rate_limiter.async_acquire()
+        async with self._session.get(
+            f"{API_BASE}{path}",
+            params=params,
+            headers={**HEADERS, "Authorization": f"Bearer {self._access_token}"},
+            timeout=REQUEST_TIMEOUT,
+        ) as resp:
+            if resp.status >= 400:
+                return resp.status, None, await resp.text()
+            return resp.status, await resp.json(content_type=None), ""
+
+    async def async_authenticate(self) -> None:
+        """Log in, or refresh the access token, if needed."""
+        await self._async_ensure_token()
+
+    async def async_get_customer_data(self) -> dict[str, Any]:
+        """Return the raw response for the first (usually only) customer on the account."""
+        data = await self._async_get("/customers")
+        customers = data.get("_embedded", {}).get("customers", [])
+        if not customers:
+            lib = await async_get_library(self._hass)
+            raise lib.APIError(404, "No customers found for this account")
+        return customers[0]
+
+    async def async_get_customer(self) -> "Customer":
+        """Return the first (usually only) customer on the account."""
+        data = await self.async_get_customer_data()
+        lib = await async_get_library(self._hass)
+        return lib.Customer.model_validate(data)
+
+    async def async_get_packages_data(self, customer_id: str) -> list[dict[str, Any]]:
+        """Return the raw responses for the packages of a customer."""
+        data = await self._async_get(
+            f"/customers/{customer_id}/packages",
+            {"sort": "identifier,desc"},
+        )
+        return data.get("_embedded", {}).get("packages", [])
+
+    async def async_get_packages(self, customer_id: str) -> "list[Package]":
+        """Return the packages of a customer."""
+        data = await self.async_get_packages_data(customer_id)
+        lib = await async_get_library(self._hass)
+        return [lib.Package.model_validate(p) for p in data]
+
+    async def async_get_connection(self, connection_id: str) -> dict[str, Any]:
+        """Return the raw details of a connection."""
+        return await self._async_get(f"/connections/{connection_id}")
@@ -1,35 +1,57 @@
 """Binary sensor platform for Hyperoptic integration."""
 
 import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
 
 from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
     BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, ICON_CONNECTION, ICON_ROUTER
-from .coordinator import HyperopticCoordinator
+from .coordinator import SCOPE_ENDPOINTS, HyperopticCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True, kw_only=True)
+class HyperopticBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Describes a Hyperoptic binary sensor and how to read its value.
+
+    The value function receives the account, connection or package snapshot
+    named by entity_type.
+    """
+
+    entity_type: str
+    value_fn: Callable[[Any], bool | None]
+
+
 BINARY_SENSOR_DESCRIPTIONS = {
-    "has_hyperhub": BinarySensorEntityDescription(
+    "has_hyperhub": HyperopticBinarySensorEntityDescription(
         key="has_hyperhub",
         name="Has Hyperhub",
         icon=ICON_ROUTER,
+        entity_type="account",
+        value_fn=lambda account: account.have_hyperhub,
     ),
-    "is_installed": BinarySensorEntityDescription(
+    "is_installed": HyperopticBinarySensorEntityDescription(
         key="is_installed",
         name="Connection Installed",
         icon=ICON_CONNECTION,
+        entity_type="connection",
+        value_fn=lambda connection: connection.is_installed,
     ),
-    "can_renew": BinarySensorEntityDescription(
+    "can_renew": HyperopticBinarySensorEntityDescription(
         key="can_renew",
         name="Can Renew",
+        entity_type="package",
+        value_fn=lambda package: package.can_renew,
     ),
 }
 
@@ -40,7 +62,7 @@ class HyperopticBinarySensorEntity(CoordinatorEntity, BinarySensorEntity):
     def __init__(
         self,
         coordinator: HyperopticCoordinator,
-        description: BinarySensorEntityDescription,
+        description: HyperopticBinarySensorEntityDescription,
         uprn: str,
         entity_type: str,
         entity_id: str | None = None,
@@ -53,44 +75,51 @@ class HyperopticBinarySensorEntity(CoordinatorEntity, BinarySensorEntity):
         self._entity_id = entity_id
 
         self._attr_name = f"{description.name} {uprn}"
-        unique_id_suffix = entity_id if entity_id else uprn
-        self._attr_unique_id = f"hyperoptic_{uprn}_{entity_type}_{unique_id_suffix}"  # noqa: E501
+        self._attr_unique_id = _unique_id(uprn, entity_type, entity_id)
+
+        self._scopes = {(entity_type, uprn if entity_type == "account" else entity_id)}
+        self._endpoints = {SCOPE_ENDPOINTS[entity_type]}
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the data this binary sensor reads has changed."""
+        if self.coordinator.data_changed(self._scopes):
+            super()._handle_coordinator_update()
+
+    @property
+    def available(self) -> bool:
+        """Return True while the data is fresh, or stale but not too old."""
+        return self.coordinator.data_available(self._endpoints)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return how fresh the data shown is."""
+        return self.coordinator.freshness_attributes(self._endpoints)
 
     @property
     def is_on(self) -> bool | None:
         """Return True if the binary sensor is on."""
-        if self.coordinator.data is None:
-            return None
+        return self.coordinator.values.get(self._attr_unique_id)
 
-        account_data = self.coordinator.data["accounts"].get(self._uprn)
-        if not account_data:
-            return None
 
-        key = self.entity_description.key
+def _unique_id(uprn: str, entity_type: str, entity_id: str | None) -> str:
+    """Return the unique ID of a binary sensor."""
+    return f"hyperoptic_{uprn}_{entity_type}_{entity_id if entity_id else uprn}"
 
-        if key == "has_hyperhub":
-            account = account_data["account"]
-            return account.have_hyperhub
-
-        if key == "is_installed":
-            connection = next(
-                (conn for conn in account_data["connections"] if conn.get("id") == self._entity_id),
-                None,
-            )
-            if connection:
-                return connection.get("isInstalled", False)
-            return None
-
-        if key == "can_renew":
-            package = next(
-                (pkg for pkg in account_data["packages"] if pkg.id == self._entity_id),
-                None,
-            )
-            if package:
-                return package.can_renew
-            return None
 
-        return None
+def build_values(data: dict[str, Any]) -> dict[str, bool | None]:
+    """Return the value of every binary sensor, keyed by unique ID."""
+    values: dict[str, bool | None] = {}
+    for uprn, account_data in data["accounts"].items():
+        targets = {
+            "account": {None: account_data["account"]},
+            "connection": account_data["connections"],
+            "package": account_data["packages"],
+        }
+        for description in BINARY_SENSOR_DESCRIPTIONS.values():
+            for target_id, target in targets[description.entity_type].items():
+                values[_unique_id(uprn, description.entity_type, target_id)] = description.value_fn(target)
+    return values
 
 
 async def async_setup_entry(
@@ -100,6 +129,7 @@ async def async_setup_entry(
 ) -> None:
     """Set up Hyperoptic binary sensors from a config entry."""
     coordinator: HyperopticCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    entry.async_on_unload(coordinator.async_add_value_builder(build_values))
 
     entities = []
 
@@ -118,19 +148,19 @@ async def async_setup_entry(
         )
 
         # Add is_installed sensor for each connection
-        for connection in account_data["connections"]:
+        for connection in account_data["connections"].values():
             entities.append(
                 HyperopticBinarySensorEntity(
                     coordinator=coordinator,
                     description=BINARY_SENSOR_DESCRIPTIONS["is_installed"],
                     uprn=uprn,
                     entity_type="connection",
-                    entity_id=connection.get("id"),
+                    entity_id=connection.id,
                 )
             )
 
         # Add can_renew sensor for each package
-        for package in account_data["packages"]:
+        for package in account_data["packages"].values():
             entities.append(
                 HyperopticBinarySensorEntity(
                     coordinator=coordinator,
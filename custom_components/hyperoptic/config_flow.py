@@ -4,13 +4,30 @@ import logging
 from typing import Any
 
 import voluptuous as vol
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import selector
-from hyperoptic import HyperopticClient
 
-from .const import CONF_EMAIL, CONF_PASSWORD, DOMAIN
+from .api import async_get_library
+from .const import (
+    CONF_EMAIL,
+    CONF_MAX_STALENESS,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_PASSWORD,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DOMAIN,
+)
+from .governor import async_get_governor
+from .resilience import is_auth_error
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,29 +43,72 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
 )
 
 
-def _validate_credentials(email: str, password: str) -> dict[str, Any]:
-    """Validate credentials (blocking operation)."""
-    client = HyperopticClient(email=email, password=password)
-    try:
-        customer = client.get_customer()
-        return {
-            "title": f"Hyperoptic - {customer.full_name}",
+def _interval_selector(maximum: int) -> selector.NumberSelector:
+    """Return a selector for a refresh interval bound in hours."""
+    return selector.NumberSelector(
+        selector.NumberSelectorConfig(
+            min=1,
+            max=maximum,
+            step=1,
+            unit_of_measurement="h",
+            mode=selector.NumberSelectorMode.BOX,
+        )
+    )
+
+
+def _options_schema(options: dict[str, Any]) -> vol.Schema:
+    """Return the options schema with the current values as defaults."""
+    return vol.Schema(
+        {
+            vol.Required(
+                CONF_MIN_UPDATE_INTERVAL,
+                default=options.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL),
+            ): _interval_selector(168),
+            vol.Required(
+                CONF_MAX_UPDATE_INTERVAL,
+                default=options.get(CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL),
+            ): _interval_selector(720),
+            vol.Required(
+                CONF_MAX_STALENESS,
+                default=options.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS),
+            ): _interval_selector(720),
         }
-    finally:
-        client.close()
+    )
+
+
+async def _validate_credentials(hass: HomeAssistant, email: str, password: str) -> dict[str, Any]:
+    """Validate credentials against the API.
+
+    The logged-in client and the raw customer response are handed off to
+    the governor, so the first refresh of the new entry does not log in and
+    fetch the customer again.
+    """
+    governor = async_get_governor(hass)
+    client = governor.create_client(email, password)
+    try:
+        customer_data = await client.async_get_customer_data()
+        lib = await async_get_library(hass)
+        customer = lib.Customer.model_validate(customer_data)
+    except Exception:
+        await governor.async_close_client(client)
+        raise
+    governor.hand_off_login(email, password, client, customer_data)
+    return {
+        "title": f"Hyperoptic - {customer.full_name}",
+    }
 
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:  # noqa: E501
     """Validate the user input allows us to connect."""
     try:
-        return await hass.async_add_executor_job(
-            _validate_credentials,
+        return await _validate_credentials(
+            hass,
             data[CONF_EMAIL],
             data[CONF_PASSWORD],
         )
     except Exception as err:
         _LOGGER.error("Error validating credentials: %s", err)
-        if "401" in str(err) or "Unauthorized" in str(err):
+        if is_auth_error(err):
             raise InvalidAuth from err
         raise CannotConnect from err
 
@@ -58,6 +118,12 @@ class HyperopticConfigFlow(ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Return the options flow."""
+        return HyperopticOptionsFlow()
+
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
         """Handle the initial step."""
         if user_input is None:
@@ -89,6 +155,26 @@ class HyperopticConfigFlow(ConfigFlow, domain=DOMAIN):
         )
 
 
+class HyperopticOptionsFlow(OptionsFlow):
+    """Handle Hyperoptic options."""
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Manage the refresh interval bounds and the maximum staleness."""
+        errors = {}
+
+        if user_input is not None:
+            if user_input[CONF_MIN_UPDATE_INTERVAL] > user_input[CONF_MAX_UPDATE_INTERVAL]:
+                errors["base"] = "invalid_interval"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=_options_schema(user_input or dict(self.config_entry.options)),
+            errors=errors,
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
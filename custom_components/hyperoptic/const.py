@@ -9,6 +9,30 @@ SCAN_INTERVAL = timedelta(days=1)
 CONF_EMAIL = "email"
 CONF_PASSWORD = "password"
 
+# Options: bounds of the adaptive refresh interval, in hours
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+DEFAULT_MIN_UPDATE_INTERVAL = 1
+DEFAULT_MAX_UPDATE_INTERVAL = 168
+
+# Option: hours the last good data stays available while refreshes fail
+CONF_MAX_STALENESS = "max_staleness"
+DEFAULT_MAX_STALENESS = 48
+
+# Adaptive refresh cadence
+INSTALL_UPDATE_INTERVAL = timedelta(hours=1)
+RENEWAL_UPDATE_INTERVAL = timedelta(hours=6)
+RENEWAL_WINDOW_DAYS = 60
+CUSTOMER_UPDATE_INTERVAL = timedelta(days=7)
+UPDATE_INTERVAL_JITTER = 0.1
+
+# Warm-start storage
+STORAGE_VERSION = 2
+STORAGE_SAVE_DELAY = 10
+
+# Key in hass.data[DOMAIN] holding payloads handed over across reloads
+DATA_HANDOFF = "handoff"
+
 # Data keys for coordinator
 DATA_CUSTOMER = "customer"
 DATA_ACCOUNTS = "accounts"
@@ -23,9 +47,67 @@ ICON_CALENDAR = "mdi:calendar"
 ICON_STATUS = "mdi:information"
 ICON_ROUTER = "mdi:router-wireless"
 ICON_CONNECTION = "mdi:cable-data"
+ICON_TIMER = "mdi:timer-outline"
+ICON_ALERT = "mdi:alert-circle-outline"
+
+# Entity attributes describing how fresh the data shown is
+ATTR_DATA_AGE = "data_age"
+ATTR_STALE = "stale"
 
 # Entity ID format
 ENTITY_ID_FORMAT = "{domain}.{name}"
 
-# Timeouts
+# Timeouts: seconds allowed for one API request, and for a whole refresh
+# including retries
 TIMEOUT_SECONDS = 10
+REFRESH_TIMEOUT_SECONDS = 120
+
+# Threads running the synchronous library client, shared by all entries
+EXECUTOR_MAX_WORKERS = 2
+
+# Maximum number of API requests in flight per coordinator
+MAX_PARALLEL_REQUESTS = 3
+
+# Per-endpoint retries within a refresh: attempts, and the bounds in
+# seconds of the exponential backoff between them
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# Per-endpoint circuit breaker: consecutive failed calls that open it, and
+# seconds it stays open before a trial call (doubled after a failed trial)
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 300
+BREAKER_MAX_RESET_TIMEOUT = 6 * 3600
+
+# Domain-wide request rate limit shared by all entries
+RATE_LIMIT_PER_SECOND = 2.0
+RATE_LIMIT_BURST = 6
+
+# Seconds between the first background refreshes of entries at startup
+STARTUP_STAGGER_SECONDS = 5
+
+# Seconds a login validated by the config flow is kept for its new entry
+LOGIN_HANDOFF_SECONDS = 60
+
+# Refresh service: its fields, the seconds on-demand refreshes are debounced
+# for, and how old an endpoint's data must be for a request to refetch it
+SERVICE_REFRESH = "refresh"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_UPRN = "uprn"
+ATTR_ENDPOINT = "endpoint"
+REFRESH_SERVICE_COOLDOWN = 10
+REFRESH_SERVICE_MIN_AGE = timedelta(minutes=1)
+
+# Key in hass.data[DOMAIN] holding the shared request governor
+DATA_GOVERNOR = "governor"
+
+# Refresh statistics: runs kept per phase, histogram bucket upper bounds in
+# seconds, and the dispatcher signal sent after each refresh (per entry)
+STATS_HISTORY = 100
+STATS_HISTOGRAM_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIGNAL_STATS_UPDATED = f"{DOMAIN}_stats_updated_{{}}"
+
+# Most accounts and packages included in a diagnostics download
+DIAGNOSTICS_MAX_ACCOUNTS = 25
+DIAGNOSTICS_MAX_PACKAGES = 25
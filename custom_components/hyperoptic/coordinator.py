@@ -1,201 +1,328 @@
 """Data coordinator for Hyperoptic integration."""
 
+import asyncio
+import hashlib
+import json
 import logging
-from datetime import datetime
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
+from types import ModuleType
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from hyperoptic import HyperopticClient
-
-from .const import DOMAIN, SCAN_INTERVAL
+from homeassistant.util import dt as dt_util
+
+from .api import HyperopticApiClient, async_get_library
+from .const import (
+    ATTR_DATA_AGE,
+    ATTR_STALE,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_RESET_TIMEOUT,
+    BREAKER_RESET_TIMEOUT,
+    CONF_MAX_STALENESS,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DOMAIN,
+    MAX_PARALLEL_REQUESTS,
+    REFRESH_SERVICE_COOLDOWN,
+    REFRESH_SERVICE_MIN_AGE,
+    REFRESH_TIMEOUT_SECONDS,
+    RENEWAL_WINDOW_DAYS,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    SCAN_INTERVAL,
+    SIGNAL_STATS_UPDATED,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    UPDATE_INTERVAL_JITTER,
+)
+from .governor import HyperopticGovernor
+from .pricing import PricingTimelineCache
+from .resilience import CircuitBreaker, CircuitOpenError, async_retry, is_auth_error
+from .scheduler import RefreshScheduler
+from .snapshot import (
+    ConnectionSnapshot,
+    CustomerSnapshot,
+    PackageSnapshot,
+)
+from .stats import API_PHASES, RefreshStats
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class PackageWrapper:
-    """Wrapper for Package objects to store calculated fields."""
+# Identifies the account, package or connection an entity reads from
+Scope = tuple[str, Any]
 
-    def __init__(self, package: Any) -> None:
-        """Initialize the wrapper."""
-        self._package = package
-        self.next_price_increase_date: str | None = None
-        self.next_price_increase_price: str | None = None
-        self.current_price_tier: str | None = None
+# Endpoint providing the data of each kind of scope
+SCOPE_ENDPOINTS = {"account": "customer", "package": "packages", "connection": "connections"}
 
-    def __getattr__(self, name: str) -> Any:
-        """Delegate attribute access to the wrapped package."""
-        return getattr(self._package, name)
+# Computes the values of a platform's entities from a payload, keyed by
+# entity unique ID
+ValueBuilder = Callable[[dict[str, Any]], dict[str, Any]]
 
 
-def _get_current_price_tier(package: Any) -> str | None:
-    """Get the current applicable price tier from pricing schedule.
+def _is_retryable(err: Exception) -> bool:
+    """Return True if a failed call may succeed when repeated.
 
-    Evaluates pricing tiers based on date ranges, preferring more specific
-    entries (with both from/until or just until) over the default (both null).
-
-    Returns:
-        Human-readable current price tier description or None.
+    Rejected credentials and client errors other than rate limiting fail
+    the same way every time; so does a call refused by an open circuit.
     """
+    if isinstance(err, CircuitOpenError) or is_auth_error(err):
+        return False
+    status = getattr(err, "status_code", None)
+    return not (isinstance(status, int) and 400 <= status < 500 and status != 429)
+
+
+def _parse_date(value: Any) -> date | None:
+    """Parse an API date string, returning None if missing or malformed."""
     try:
-        if not hasattr(package, "plan_details"):
-            return None
+        return date.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
 
-        plan_details = package.plan_details
-        if not hasattr(plan_details, "pricing"):
-            return None
 
-        pricing_list = plan_details.pricing
-        if not pricing_list:
-            return None
+def _days_until(target: date | None, today: date) -> int | None:
+    """Return the whole days from today until a date, not below zero."""
+    if target is None:
+        return None
+    return max((target - today).days, 0)
+
+
+def _with_derived_fields(package: PackageSnapshot, today: date) -> PackageSnapshot:
+    """Return a package with its date-dependent fields computed for today."""
+    next_date, next_price, tier = (
+        package.next_price_increase_date,
+        package.next_price_increase_price,
+        package.current_price_tier,
+    )
+    timeline = package.pricing_timeline
+    if timeline is not None:
+        next_date, next_price = timeline.next_increase(today)
+        tier = timeline.current_tier(today)
+
+    return replace(
+        package,
+        current_price_tier=tier,
+        next_price_increase_date=next_date,
+        next_price_increase_price=next_price,
+        days_until_next_price_increase=_days_until(_parse_date(next_date), today),
+        days_until_contract_end=_days_until(_parse_date(package.end_date), today),
+    )
+
+
+def _package_maps(data: dict[str, Any]) -> list[dict[Any, PackageSnapshot]]:
+    """Return each distinct package mapping of a payload once."""
+    return list(
+        {id(account_data["packages"]): account_data["packages"] for account_data in data["accounts"].values()}.values()
+    )
+
+
+def _iter_packages(data: dict[str, Any]) -> list[PackageSnapshot]:
+    """Return each package of a payload once."""
+    packages: dict[Any, PackageSnapshot] = {}
+    for package_map in _package_maps(data):
+        packages.update(package_map)
+    return list(packages.values())
+
+
+def _refresh_derived_fields(data: dict[str, Any], today: date) -> None:
+    """Swap every package of a payload for one derived for today."""
+    for package_map in _package_maps(data):
+        for package_id, package in package_map.items():
+            package_map[package_id] = _with_derived_fields(package, today)
+
+
+def _next_local_update(data: dict[str, Any], today: date) -> datetime | None:
+    """Return when the date-dependent fields next change.
+
+    Pricing boundaries and contract end dates are calendar dates, so every
+    transition - and every countdown tick - happens at a local midnight.
+    No update is needed once no package has a date left in the future.
+    """
+    for package in _iter_packages(data):
+        end_date = _parse_date(package.end_date)
+        boundaries = package.pricing_timeline.boundaries if package.pricing_timeline else []
+        if (end_date is not None and end_date > today) or any(boundary > today for boundary in boundaries):
+            return dt_util.start_of_local_day(today + timedelta(days=1))
+    return None
 
-        today = datetime.now().date()
-        default_price = None
-        applicable_prices = []
 
-        for pricing in pricing_list:
-            from_date_str = (
-                pricing.get("from") if isinstance(pricing, dict) else getattr(pricing, "from_date", None)  # noqa: E501
-            )
-            until_date_str = (
-                pricing.get("until") if isinstance(pricing, dict) else getattr(pricing, "until", None)  # noqa: E501
-            )
-            price = pricing.get("price") if isinstance(pricing, dict) else getattr(pricing, "price", None)
-
-            # Skip if no price
-            if not price:
-                continue
-
-            # If both from and until are null, this is the default price
-            if from_date_str is None and until_date_str is None:
-                default_price = price
-                continue
-
-            # Try to parse dates
-            from_date = None
-            until_date = None
-
-            if from_date_str:
-                try:
-                    from_date = datetime.strptime(from_date_str, "%Y-%m-%d").date()
-                except ValueError:
-                    continue
-
-            if until_date_str:
-                try:
-                    until_date = datetime.strptime(until_date_str, "%Y-%m-%d").date()
-                except ValueError:
-                    continue
-
-            # Check if this entry applies to today
-            # It applies if: from <= today < until (or from is None, or until is None)
-            applies = True
-            if from_date is not None and today < from_date:
-                applies = False
-            if until_date is not None and today >= until_date:
-                applies = False
-
-            if applies and until_date is not None:
-                # Entries with an until date are more specific
-                applicable_prices.append((until_date, price))
-
-        # Use the most specific applicable price (smallest until date)
-        if applicable_prices:
-            applicable_prices.sort(key=lambda x: x[0])
-            return f"Active Tier: £{applicable_prices[0][1]}/month"
-
-        # Fall back to default price
-        if default_price:
-            return f"Default Price: £{default_price}/month"
+def _index_packages(packages: Iterable[PackageSnapshot], timelines: PricingTimelineCache) -> dict[str, PackageSnapshot]:
+    """Derive today's fields of every package, keyed by package id."""
+    today = dt_util.now().date()
+    packages_by_id = {package.id: _with_derived_fields(package, today) for package in packages}
+    timelines.retain(set(packages_by_id))
+    return packages_by_id
 
-        return None
 
-    except Exception as err:
-        _LOGGER.debug("Error parsing current price tier: %s", err)
-        return None
+def _partition_connections(connections: Iterable[ConnectionSnapshot]) -> dict[Any, dict[str, ConnectionSnapshot]]:
+    """Partition connection snapshots by premise UPRN."""
+    connections_by_uprn: dict[Any, dict[str, ConnectionSnapshot]] = defaultdict(dict)
+    for snapshot in connections:
+        connections_by_uprn[snapshot.premise_uprn][snapshot.id] = snapshot
+    return dict(connections_by_uprn)
+
+
+def _build_part(endpoint: str, result: Any, timelines: PricingTimelineCache) -> Any:
+    """Snapshot one endpoint's response.
 
+    Only the snapshots are kept; the library models can be released
+    afterwards. Every package is priced once.
+    """
+    if endpoint == "customer":
+        return CustomerSnapshot.from_api(result)
+    if endpoint == "packages":
+        return _index_packages(
+            (PackageSnapshot.from_api(package, timelines.get(package)) for package in result), timelines
+        )
+    return _partition_connections(ConnectionSnapshot.from_api(conn) for conn in result)
+
+
+def _serialize_part(endpoint: str, part: Any) -> Any:
+    """Return one endpoint's snapshot part in JSON-compatible form."""
+    if endpoint == "customer":
+        return part.as_dict()
+    if endpoint == "packages":
+        return [package.as_dict() for package in part.values()]
+    return [conn.as_dict() for connections in part.values() for conn in connections.values()]
+
+
+def _restore_part(endpoint: str, value: Any, timelines: PricingTimelineCache) -> Any:
+    """Rebuild one endpoint's snapshot part from its serialized form."""
+    if endpoint == "customer":
+        return CustomerSnapshot.from_dict(value)
+    if endpoint == "packages":
+        return _index_packages(
+            (
+                PackageSnapshot.from_dict(
+                    package, timelines.get_for_entries(package["id"], tuple(map(tuple, package["pricing"])))
+                )
+                for package in value
+            ),
+            timelines,
+        )
+    return _partition_connections(ConnectionSnapshot.from_dict(conn) for conn in value)
+
+
+def _format_times(times: dict[str, datetime]) -> dict[str, str]:
+    """Return per-endpoint times in JSON-compatible form."""
+    return {endpoint: when.isoformat() for endpoint, when in times.items()}
 
-def _get_next_price_increase(
-    package: Any,
-) -> tuple[str | None, str | None]:
-    """Get next price increase date and amount from package pricing.
 
-    The next price increase happens at the end of the current pricing period.
+def _parse_times(values: dict[str, str]) -> dict[str, datetime]:
+    """Parse per-endpoint times returned by _format_times."""
+    return {endpoint: parsed for endpoint, value in values.items() if (parsed := dt_util.parse_datetime(value))}
 
-    Returns:
-        Tuple of (increase_date, new_price) or (None, None) if no increase.
+
+def _merge_parts(
+    customer: CustomerSnapshot,
+    packages_by_id: dict[str, PackageSnapshot],
+    connections_by_uprn: dict[Any, dict[str, ConnectionSnapshot]],
+) -> dict[str, Any]:
+    """Organize packages and connections by account UPRN.
+
+    Packages carry no premise reference in the API model, so one package
+    mapping is shared by every account.
     """
-    try:
-        if not hasattr(package, "plan_details"):
-            return None, None
+    return {
+        uprn: {
+            "account": account,
+            "packages": packages_by_id,
+            "connections": connections_by_uprn.get(account.uprn, {}),
+        }
+        for uprn, account in customer.accounts.items()
+    }
+
+
+def _lifecycle_flags(data: dict[str, Any], today: date) -> tuple[bool, bool]:
+    """Return whether an install is pending and whether a renewal is near."""
+    install_pending = any(
+        account_data["account"].order_status not in (None, "ACTIVE")
+        or any(not conn.is_installed for conn in account_data["connections"].values())
+        for account_data in data["accounts"].values()
+    )
+    renewal_due = False
+    for package in _iter_packages(data):
+        end_date = _parse_date(package.end_date)
+        if end_date is not None and 0 <= (end_date - today).days <= RENEWAL_WINDOW_DAYS:
+            renewal_due = True
+            break
+    return install_pending, renewal_due
+
+
+def _fingerprints(data: dict[str, Any]) -> dict[Scope, Any]:
+    """Return the snapshot behind every scope of a payload.
+
+    Snapshots compare by the fields the platforms read, so they serve as
+    their own fingerprints.
+    """
+    fingerprints: dict[Scope, Any] = {}
+    for uprn, account_data in data["accounts"].items():
+        fingerprints[("account", uprn)] = account_data["account"]
+        for conn_id, conn in account_data["connections"].items():
+            fingerprints[("connection", conn_id)] = conn
+    for package in _iter_packages(data):
+        fingerprints[("package", package.id)] = package
+    return fingerprints
 
-        plan_details = package.plan_details
-        if not hasattr(plan_details, "pricing"):
-            return None, None
 
-        pricing_list = plan_details.pricing
-        if not pricing_list:
-            return None, None
+def _validate_raw(lib: ModuleType, endpoint: str, value: Any) -> Any:
+    """Build an endpoint's API models from its raw response."""
+    if endpoint == "customer":
+        return lib.Customer.model_validate(value)
+    if endpoint == "packages":
+        return [lib.Package.model_validate(package) for package in value]
+    return value
 
-        today = datetime.now().date()
 
-        # Get all entries with until dates and parse them
-        entries_with_until = []
-        for pricing in pricing_list:
-            until_date_str = (
-                pricing.get("until") if isinstance(pricing, dict) else getattr(pricing, "until", None)  # noqa: E501
-            )
-            price = pricing.get("price") if isinstance(pricing, dict) else getattr(pricing, "price", None)
-
-            if until_date_str and price:
-                try:
-                    until_date = datetime.strptime(until_date_str, "%Y-%m-%d").date()
-                    entries_with_until.append((until_date, str(price), pricing))
-                except ValueError:
-                    continue
-
-        if not entries_with_until:
-            return None, None
-
-        # Sort by until date
-        entries_with_until.sort(key=lambda x: x[0])
-
-        # Find the index of the current applicable entry
-        current_index = None
-        for i, (until_date, _, _) in enumerate(entries_with_until):
-            if until_date > today:
-                current_index = i
-                break
-
-        # If we found a current entry and there's a next one, return it
-        if current_index is not None and current_index < len(entries_with_until) - 1:
-            # The next price increase is at the current entry's until date
-            current_until_date = entries_with_until[current_index][0]
-            next_price = entries_with_until[current_index + 1][1]
-            return str(current_until_date), str(next_price)
-
-        # No next price increase found
-        return None, None
-
-    except Exception as err:
-        _LOGGER.debug("Error parsing price increase: %s", err)
-        return None, None
-
-
-def _fetch_hyperoptic_data(email: str, password: str) -> tuple[Any, Any, Any]:
-    """Fetch data from Hyperoptic API (blocking operation)."""
-    client = HyperopticClient(email=email, password=password)
-    try:
-        customer = client.get_customer()
-        packages = client.get_my_packages()
-        connections = client.get_my_connections()
-        return customer, packages, connections
-    finally:
-        client.close()
+def _encode_response(response: Any) -> bytes:
+    """Return a raw API response in a stable encoding."""
+    return json.dumps(response, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+
+def _response_digest(encoded: bytes) -> str:
+    """Return a stable digest of an encoded response."""
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class _SnapshotStore(Store[dict[str, Any]]):
+    """Stored snapshot parts of an entry.
+
+    Version 1 stored the raw API responses, personal details included; they
+    are dropped rather than migrated, and the next refresh stores snapshots.
+    """
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Discard data stored by an older version."""
+        return {}
+
+
+@dataclass(frozen=True, slots=True)
+class _FetchedResponse:
+    """A raw API response's digest and size, and its snapshot part if it changed."""
+
+    digest: str
+    size: int
+    part: Any = None
 
 
 class HyperopticCoordinator(DataUpdateCoordinator[dict[str, Any]]):
@@ -206,60 +333,670 @@ class HyperopticCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         hass: HomeAssistant,
         email: str,
         password: str,
+        config_entry: ConfigEntry | None = None,
+        governor: HyperopticGovernor | None = None,
     ) -> None:
         """Initialize coordinator."""
         super().__init__(
             hass,
             _LOGGER,
+            config_entry=config_entry,
             name=DOMAIN,
             update_interval=SCAN_INTERVAL,
+            # Unchanged refreshes return the same snapshot object, which
+            # then skips the listener round entirely
+            always_update=False,
         )
         self.email = email
         self.password = password
+        self._governor = governor
+        self._entry_id = config_entry.entry_id if config_entry else DOMAIN
+        # Long-lived client: keeps the token set and the pooled keep-alive
+        # connections of the shared aiohttp session between polls.
+        self._client: HyperopticApiClient | None = None
+        self._request_semaphore = asyncio.Semaphore(MAX_PARALLEL_REQUESTS)
+        self.stats = RefreshStats()
+        self.timelines = PricingTimelineCache()
+        self._unsub_local_update: CALLBACK_TYPE | None = None
+        # Objects whose visible fields changed in the latest update; None
+        # means every entity must write (first data or availability change)
+        self.changed_scopes: set[Scope] | None = None
+        self._fingerprints: dict[Scope, Any] = {}
+        # Entity values materialized once per payload, keyed by unique ID
+        self.values: dict[str, Any] = {}
+        self._value_builders: list[ValueBuilder] = []
+
+        options = config_entry.options if config_entry else {}
+        self.scheduler = RefreshScheduler(
+            timedelta(hours=options.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL)),
+            timedelta(hours=options.get(CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL)),
+        )
+        self.update_interval = self.scheduler.decision.interval
+        # How long stale data stays available, and the pending callback that
+        # makes it unavailable once too old
+        self.max_staleness = timedelta(hours=options.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS))
+        self._unsub_stale_expiry: CALLBACK_TYPE | None = None
+        # Digests of the raw responses behind self.data, and the snapshot
+        # part built from each; identical responses reuse their part
+        self.payload_digests: dict[str, str] = {}
+        self._parts: dict[str, Any] = {}
+        # Per endpoint: circuit breaker, when its data was fetched, and
+        # whether the current data fell back to an earlier response
+        self.breakers = {
+            endpoint: CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT, BREAKER_MAX_RESET_TIMEOUT)
+            for endpoint in API_PHASES
+        }
+        self.fetched_at: dict[str, datetime] = {}
+        self.stale_endpoints: set[str] = set()
+        # When each stale endpoint first failed to revalidate
+        self.stale_since: dict[str, datetime] = {}
+        # Endpoints to fetch on the next refresh whatever their cadence
+        self._forced_endpoints: set[str] = set()
+        # Customer fetched by the config flow, with its fetch time
+        self._seed_customer: tuple[dict[str, Any], datetime] | None = None
+        # Fetch in flight, joined by concurrent refreshes and cancelled on shutdown
+        self._fetch_task: asyncio.Task[dict[str, _FetchedResponse]] | None = None
+        # Refreshes requested through the refresh service, after they
+        # invalidated the endpoints they want fetched
+        self._on_demand_refresh = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=REFRESH_SERVICE_COOLDOWN,
+            immediate=True,
+            function=self.async_refresh,
+        )
+        self._store: Store[dict[str, Any]] | None = (
+            _SnapshotStore(hass, STORAGE_VERSION, f"{DOMAIN}.{config_entry.entry_id}") if config_entry else None
+        )
 
-    async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch data from Hyperoptic API."""
+    def _get_client(self) -> HyperopticApiClient:
+        """Return the shared client, creating it on first use.
+
+        A login handed off by the config flow is adopted, and its customer
+        seeds the first refresh.
+        """
+        if self._client is None:
+            if self._governor is not None:
+                login = self._governor.claim_login(self.email, self.password)
+                if login is not None:
+                    self._seed_customer = (login.customer, login.fetched_at)
+                self._client = self._governor.get_client(
+                    self.email, self.password, self._entry_id, login.client if login else None
+                )
+            else:
+                self._client = HyperopticApiClient(self.hass, self.email, self.password)
+        return self._client
+
+    async def _async_close_client(self) -> None:
+        """Close and drop the shared client."""
+        client, self._client = self._client, None
+        if client is None:
+            return
+        if self._governor is not None:
+            await self._governor.async_release_client(self.email, self.password, self._entry_id)
+        else:
+            await client.async_close()
+
+    async def _async_timed(self, phase: str, target: Any, *args: Any) -> Any:
+        """Await a refresh phase and record its timing and outcome."""
+        start = time.monotonic()
         try:
-            # Run blocking operations in executor
-            customer, packages, connections = await self.hass.async_add_executor_job(
-                _fetch_hyperoptic_data,
-                self.email,
-                self.password,
+            result = await target(*args)
+        except Exception as err:
+            self.stats.phase(phase).record(time.monotonic() - start, str(err))
+            raise
+        self.stats.phase(phase).record(duration := time.monotonic() - start)
+        _LOGGER.debug("Completed %s in %.3fs", phase, duration)
+        return result
+
+    async def _async_request(self, target: Any, *args: Any) -> Any:
+        """Await one API call, shared with other entries making the same call."""
+        if self._governor is None:
+            return await target(*args)
+        return await self._governor.async_join_call(target, *args)
+
+    async def _async_call(self, endpoint: str, target: Any, *args: Any) -> Any:
+        """Await one API call with retries, guarded by the endpoint's breaker.
+
+        Each attempt is bounded by the request semaphore and timed.
+        """
+        breaker = self.breakers[endpoint]
+
+        async def _attempt() -> Any:
+            breaker.check()
+            try:
+                async with self._request_semaphore:
+                    result = await self._async_timed(endpoint, self._async_request, target, *args)
+            except Exception as err:
+                if _is_retryable(err):
+                    breaker.record_failure()
+                raise
+            finally:
+                # Whatever the outcome, a trial call is over
+                breaker.release()
+            breaker.record_success()
+            return result
+
+        return await async_retry(
+            _attempt,
+            attempts=RETRY_ATTEMPTS,
+            base_delay=RETRY_BASE_DELAY,
+            max_delay=RETRY_MAX_DELAY,
+            retryable=_is_retryable,
+        )
+
+    async def _async_get_connections(
+        self, client: HyperopticApiClient, connection_ids: list[str]
+    ) -> list[dict[str, Any]]:
+        """Fetch the connection of every account.
+
+        Each connection is a call of its own, with its own request slot and
+        retries, so a failing connection does not fetch the others again.
+        """
+        connections = await asyncio.gather(
+            *(self._async_call("connections", client.async_get_connection, conn_id) for conn_id in connection_ids),
+            return_exceptions=True,
+        )
+        for connection in connections:
+            if isinstance(connection, BaseException):
+                raise connection
+        return connections
+
+    def invalidate_endpoints(self, endpoints: Iterable[str] = API_PHASES) -> None:
+        """Fetch these endpoints on the next refresh, even if not due."""
+        self._forced_endpoints.update(endpoints)
+
+    async def async_refresh_on_demand(self, endpoints: Iterable[str] = API_PHASES) -> set[str]:
+        """Refresh endpoints for a caller that wants fresh data now.
+
+        A fetch in flight is joined first, and endpoints fetched within
+        REFRESH_SERVICE_MIN_AGE are skipped. The rest are refreshed through
+        a debouncer, so requests arriving together share one fetch. Returns
+        the endpoints that were requested.
+        """
+        if (in_flight := self._fetch_task) is not None:
+            await asyncio.wait([in_flight])
+
+        now = dt_util.utcnow()
+        requested = {
+            endpoint
+            for endpoint in endpoints
+            if (fetched_at := self.fetched_at.get(endpoint)) is None or now - fetched_at >= REFRESH_SERVICE_MIN_AGE
+        }
+        if requested:
+            self.invalidate_endpoints(requested)
+            await self._on_demand_refresh.async_call()
+        else:
+            _LOGGER.debug("Hyperoptic %s data is fresh, not refreshing", ", ".join(sorted(endpoints)))
+        return requested
+
+    def _cadence_due_at(self, endpoint: str) -> datetime | None:
+        """Return when an endpoint's cadence has it fetched again, if known.
+
+        The refresh interval is jittered, so endpoints are due slightly
+        before their cadence has fully elapsed.
+        """
+        fetched_at = self.fetched_at.get(endpoint)
+        cadence = self.scheduler.decision.endpoints.get(endpoint)
+        if fetched_at is None or cadence is None:
+            return None
+        return fetched_at + cadence * (1 - UPDATE_INTERVAL_JITTER)
+
+    def _due_at(self, endpoint: str) -> datetime | None:
+        """Return when an endpoint is next due, or None if it is due now."""
+        if (
+            self.data is None
+            or endpoint not in self._parts
+            or endpoint in self.stale_endpoints
+            or endpoint in self._forced_endpoints
+        ):
+            return None
+        return self._cadence_due_at(endpoint)
+
+    def _due_endpoints(self) -> set[str]:
+        """Return the endpoints to fetch in this refresh."""
+        now = dt_util.utcnow()
+        due = {endpoint for endpoint in API_PHASES if (due_at := self._due_at(endpoint)) is None or due_at <= now}
+        self._forced_endpoints.clear()
+        return due
+
+    async def _async_fetch_data(self, due: set[str]) -> dict[str, _FetchedResponse]:
+        """Fetch the due endpoints, keyed by endpoint.
+
+        Authentication and the customer call go first: the customer provides
+        the customer id and connection ids, so the remaining endpoints can
+        then be requested concurrently. If the customer is not fetched, its
+        last snapshot provides them. An endpoint that fails keeps its last
+        snapshot, as long as one of the due endpoints succeeds.
+        """
+        client = self._get_client()
+        await self._async_timed("auth", client.async_authenticate)
+        lib = await async_get_library(self.hass)
+        results: dict[str, _FetchedResponse] = {}
+        failures: dict[str, Exception] = {}
+
+        async def _async_fetch(endpoint: str, call: Awaitable[Any]) -> None:
+            try:
+                results[endpoint] = self._receive(lib, endpoint, await call)
+            except Exception as err:
+                if is_auth_error(err) or endpoint not in self._parts:
+                    raise
+                _LOGGER.warning("Keeping Hyperoptic %s data from %s: %s", endpoint, self.fetched_at.get(endpoint), err)
+                failures[endpoint] = err
+            else:
+                self.fetched_at[endpoint] = dt_util.utcnow()
+
+        if self._seed_customer is not None:
+            (seed, self.fetched_at["customer"]), self._seed_customer = self._seed_customer, None
+            results["customer"] = self._receive(lib, "customer", seed)
+        elif "customer" in due:
+            await _async_fetch("customer", self._async_call("customer", client.async_get_customer_data))
+        customer = results["customer"].part if "customer" in results else None
+        if customer is None:
+            customer = self._parts["customer"]
+        customer_id = customer.id
+        connection_ids = customer.connection_ids
+
+        fetches = []
+        if "packages" in due:
+            fetches.append(
+                _async_fetch("packages", self._async_call("packages", client.async_get_packages_data, customer_id))
+            )
+        if "connections" in due:
+            fetches.append(_async_fetch("connections", self._async_get_connections(client, connection_ids)))
+        for result in await asyncio.gather(*fetches, return_exceptions=True):
+            if isinstance(result, BaseException):
+                raise result
+
+        self._set_stale_endpoints((self.stale_endpoints - results.keys()) | failures.keys())
+        if not results:
+            raise next(iter(failures.values()))
+        return results
+
+    def _receive(self, lib: ModuleType, endpoint: str, raw: Any) -> _FetchedResponse:
+        """Digest a raw response, validating and snapshotting it only if it changed.
+
+        A response identical to the one behind the current part never goes
+        through the library models at all.
+        """
+        encoded = _encode_response(raw)
+        digest = _response_digest(encoded)
+        part = None
+        if digest != self.payload_digests.get(endpoint) or endpoint not in self._parts:
+            part = _build_part(endpoint, _validate_raw(lib, endpoint, raw), self.timelines)
+        return _FetchedResponse(digest, len(encoded), part)
+
+    def _set_stale_endpoints(self, endpoints: set[str]) -> None:
+        """Mark endpoints stale, keeping when those already stale became so."""
+        now = dt_util.utcnow()
+        self.stale_since = {endpoint: self.stale_since.get(endpoint, now) for endpoint in endpoints}
+        self.stale_endpoints = endpoints
+
+    @callback
+    def _async_track_changes(self, data: dict[str, Any]) -> None:
+        """Diff a payload against the previous one before listeners run."""
+        fingerprints = _fingerprints(data)
+        if self.data is None or not self.last_update_success:
+            self.changed_scopes = None
+        else:
+            old = self._fingerprints
+            self.changed_scopes = {scope for scope, values in fingerprints.items() if old.get(scope) != values}
+            self.changed_scopes.update(old.keys() - fingerprints.keys())
+        self._fingerprints = fingerprints
+
+    @callback
+    def async_add_value_builder(self, builder: ValueBuilder) -> CALLBACK_TYPE:
+        """Register a platform's value builder and fill in its values."""
+        self._value_builders.append(builder)
+        if self.data is not None:
+            self.values.update(builder(self.data))
+
+        @callback
+        def _remove() -> None:
+            self._value_builders.remove(builder)
+
+        return _remove
+
+    @callback
+    def _async_update_values(self, data: dict[str, Any]) -> None:
+        """Recompute the value table of every registered platform."""
+        values: dict[str, Any] = {}
+        for builder in self._value_builders:
+            values.update(builder(data))
+        self.values = values
+
+    @property
+    def packages(self) -> list[PackageSnapshot]:
+        """Return each package of the current data once."""
+        return _iter_packages(self.data) if self.data is not None else []
+
+    def data_changed(self, scopes: set[Scope]) -> bool:
+        """Return True if an entity reading these scopes must write its state."""
+        return self.changed_scopes is None or not self.changed_scopes.isdisjoint(scopes)
+
+    def data_age(self, endpoints: Iterable[str]) -> timedelta | None:
+        """Return the age of the oldest data fetched from these endpoints."""
+        fetched = [self.fetched_at.get(endpoint) for endpoint in endpoints]
+        if not fetched or None in fetched:
+            return None
+        return dt_util.utcnow() - min(fetched)
+
+    def data_available(self, endpoints: set[str]) -> bool:
+        """Return True if entities reading these endpoints may show their data.
+
+        Data the latest refreshes failed to update stays available for
+        max_staleness after the first failure, so entities ride out API
+        outages however long the endpoint's cadence is.
+        """
+        if self.data is None:
+            return False
+        stale_since = [since for endpoint in endpoints if (since := self.stale_since.get(endpoint)) is not None]
+        return not stale_since or dt_util.utcnow() - min(stale_since) <= self.max_staleness
+
+    def freshness_attributes(self, endpoints: set[str]) -> dict[str, Any]:
+        """Return the data_age and stale attributes of an entity reading these endpoints.
+
+        data_age is the age in seconds of stale data, and None while the data
+        is fresh: entities only write their state when their data changes,
+        so an age kept up to date would need a write after every refresh.
+        """
+        stale = not self.stale_endpoints.isdisjoint(endpoints)
+        age = self.data_age(endpoints) if stale else None
+        return {ATTR_DATA_AGE: None if age is None else round(age.total_seconds()), ATTR_STALE: stale}
+
+    @callback
+    def _async_schedule_stale_expiry(self) -> None:
+        """Schedule a state write for when stale data becomes too old to show."""
+        if self._unsub_stale_expiry is not None:
+            self._unsub_stale_expiry()
+            self._unsub_stale_expiry = None
+
+        now = dt_util.utcnow()
+        expiries = [expiry for since in self.stale_since.values() if (expiry := since + self.max_staleness) > now]
+        if expiries:
+            self._unsub_stale_expiry = async_track_point_in_time(
+                self.hass, self._async_handle_stale_expiry, min(expiries)
             )
 
-            # Transform data: organize by account UPRN
-            accounts_data: dict[str, Any] = {}
-
-            for account in customer.accounts:
-                uprn = account.uprn
-
-                account_connections = [conn for conn in connections if conn.get("premiseUprn") == uprn]
-
-                # Add pricing info to each package
-                packages_with_pricing = []
-                for package in packages:
-                    next_increase_date, next_increase_price = _get_next_price_increase(package)
-                    current_price_tier = _get_current_price_tier(package)
-                    # Wrap package to store calculated pricing info
-                    wrapped_package = PackageWrapper(package)
-                    wrapped_package.next_price_increase_date = next_increase_date
-                    wrapped_package.next_price_increase_price = next_increase_price
-                    wrapped_package.current_price_tier = current_price_tier
-                    packages_with_pricing.append(wrapped_package)
-
-                accounts_data[str(uprn)] = {
-                    "account": account,
-                    "packages": packages_with_pricing,
-                    "connections": account_connections,
-                }
-
-            return {
-                "customer": customer,
-                "accounts": accounts_data,
+    @callback
+    def _async_handle_stale_expiry(self, _now: datetime) -> None:
+        """Make entities showing data stale for longer than max_staleness unavailable."""
+        self._unsub_stale_expiry = None
+        self.changed_scopes = None
+        self.async_update_listeners()
+        self._async_schedule_stale_expiry()
+
+    @callback
+    def _async_schedule_local_update(self, data: dict[str, Any]) -> None:
+        """Schedule the next local recompute of date-dependent fields."""
+        if self._unsub_local_update is not None:
+            self._unsub_local_update()
+            self._unsub_local_update = None
+
+        if (next_update := _next_local_update(data, dt_util.now().date())) is not None:
+            self._unsub_local_update = async_track_point_in_time(
+                self.hass, self._async_handle_local_update, next_update
+            )
+
+    @callback
+    def _async_handle_local_update(self, _now: datetime) -> None:
+        """Recompute price tiers and countdowns without calling the API."""
+        self._unsub_local_update = None
+        if self.data is None:
+            return
+
+        _refresh_derived_fields(self.data, dt_util.now().date())
+        self._async_track_changes(self.data)
+        self._async_update_values(self.data)
+        self.async_update_listeners()
+        self._async_schedule_local_update(self.data)
+
+    def _restore_state(self, state: dict[str, Any]) -> dict[str, Any] | None:
+        """Restore the snapshot parts and their freshness returned by _data_to_store.
+
+        Returns the payload merged from the parts, or None if the state
+        cannot be read.
+        """
+        try:
+            parts = {
+                endpoint: _restore_part(endpoint, state["parts"][endpoint], self.timelines) for endpoint in API_PHASES
             }
+            fetched_at = _parse_times(state["fetched_at"])
+            stale_since = _parse_times(state["stale_since"])
+        except Exception as err:
+            _LOGGER.warning("Ignoring unreadable cached Hyperoptic data: %s", err)
+            return None
+
+        self._parts = parts
+        self.payload_digests = dict(state["digests"])
+        self.fetched_at = fetched_at
+        self.stale_since = stale_since
+        self.stale_endpoints = set(stale_since)
+        return self._merge_parts()
 
+    async def _async_load_stored_data(self) -> dict[str, Any] | None:
+        """Rebuild the payload from the stored snapshot parts."""
+        if self._store is None or not (stored := await self._store.async_load()):
+            return None
+        return self._restore_state(stored)
+
+    @callback
+    def async_handoff_state(self) -> dict[str, Any] | None:
+        """Return the state for the next setup of this entry to restore, if there is data.
+
+        Stale endpoints are handed over as such, so a reloaded entry keeps
+        counting their staleness from the first failure.
+        """
+        if self.data is None or not self._has_all_parts:
+            return None
+        return self._data_to_store()
+
+    async def async_restore_data(self, handoff: dict[str, Any] | None = None) -> bool:
+        """Seed the coordinator with the last good payload.
+
+        Uses the state handed over by a previous instance of this entry if
+        given, otherwise the stored one. Returns False if neither exists.
+        """
+        data = self._restore_state(handoff) if handoff is not None else None
+        if data is None and (data := await self._async_load_stored_data()) is None:
+            return False
+
+        self._async_schedule_local_update(data)
+        self._async_schedule_stale_expiry()
+        self._async_track_changes(data)
+        self._async_update_values(data)
+        self.async_set_updated_data(data)
+        return True
+
+    async def async_staggered_refresh(self, delay: float) -> None:
+        """Refresh every endpoint after a delay that keeps entries from polling together."""
+        if delay:
+            await asyncio.sleep(delay)
+        self.invalidate_endpoints()
+        await self.async_refresh()
+
+    async def async_shutdown(self) -> None:
+        """Shut down the coordinator, cancel a fetch in flight and close the shared client."""
+        await super().async_shutdown()
+        self._on_demand_refresh.async_shutdown()
+        if (fetch_task := self._fetch_task) is not None:
+            # Let the cancelled calls end before the client is closed
+            fetch_task.cancel()
+            await asyncio.wait([fetch_task])
+        if self._unsub_local_update is not None:
+            self._unsub_local_update()
+            self._unsub_local_update = None
+        if self._unsub_stale_expiry is not None:
+            self._unsub_stale_expiry()
+            self._unsub_stale_expiry = None
+        await self._async_close_client()
+
+    @callback
+    def _async_apply_decision(self, data: dict[str, Any], changed: bool) -> None:
+        """Set the interval until the next refresh after a successful one."""
+        install_pending, renewal_due = _lifecycle_flags(data, dt_util.now().date())
+        decision = self.scheduler.next_decision(
+            install_pending=install_pending,
+            renewal_due=renewal_due,
+            changed=changed,
+        )
+        self.update_interval = decision.interval
+        if self._governor is not None:
+            due_at = [due for endpoint in API_PHASES if (due := self._cadence_due_at(endpoint)) is not None]
+            earliest = min(due_at) - dt_util.utcnow() if due_at else timedelta(0)
+            self.update_interval = self._governor.align_interval(
+                self._entry_id,
+                decision.base_interval,
+                earliest,
+                jitter=decision.interval - decision.base_interval,
+            )
+        _LOGGER.debug("Next refresh in %s (%s)", self.update_interval, decision.reason)
+
+    def _merge_parts(self) -> dict[str, Any]:
+        """Return a payload merging the snapshot parts of every endpoint."""
+        return {"accounts": _merge_parts(self._parts["customer"], self._parts["packages"], self._parts["connections"])}
+
+    @callback
+    def _async_transform(self, results: dict[str, _FetchedResponse]) -> dict[str, Any]:
+        """Merge fresh API responses into the payload.
+
+        Only endpoints whose response changed come with a new part, and the
+        current payload is reused if none did.
+        """
+        rebuilt = False
+        for endpoint, response in results.items():
+            self.stats.phase(endpoint).last_bytes = response.size
+            self.payload_digests[endpoint] = response.digest
+            if response.part is not None:
+                self._parts[endpoint] = response.part
+                rebuilt = True
+
+        if not rebuilt and self.data is not None and self.last_update_success:
+            # Same responses as last time: the current snapshot, kept up
+            # to date by the local midnight updates, is still exact
+            self.changed_scopes = set()
+            self.stats.snapshot_hits += 1
+            self._async_apply_decision(self.data, changed=False)
+            return self.data
+
+        self.stats.snapshot_misses += 1
+        data = self._merge_parts()
+        self._async_schedule_local_update(data)
+        self._async_track_changes(data)
+        self._async_update_values(data)
+        self._async_apply_decision(data, changed=self.changed_scopes is None or bool(self.changed_scopes))
+        return data
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        """Return the snapshot parts and what is known of their freshness.
+
+        Only the fields the platforms read are stored; the raw responses
+        carry personal details the integration never shows.
+        """
+        return {
+            "parts": {endpoint: _serialize_part(endpoint, part) for endpoint, part in self._parts.items()},
+            "digests": dict(self.payload_digests),
+            "fetched_at": _format_times(self.fetched_at),
+            "stale_since": _format_times(self.stale_since),
+        }
+
+    @property
+    def _has_all_parts(self) -> bool:
+        """Return True once every endpoint has a snapshot part."""
+        return self._parts.keys() >= set(API_PHASES)
+
+    @callback
+    def _async_save_state(self) -> None:
+        """Schedule a save of the snapshot parts, once every endpoint has one."""
+        if self._store is not None and self._has_all_parts:
+            self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch data from Hyperoptic API and record how the refresh went."""
+        start = time.monotonic()
+        try:
+            data = await self._async_refresh_data()
+        except Exception as err:
+            self.stats.record_refresh(time.monotonic() - start, str(err))
+            raise
+        else:
+            self.stats.record_refresh(time.monotonic() - start)
+            return data
+        finally:
+            self._async_schedule_stale_expiry()
+            self._async_save_state()
+            async_dispatcher_send(self.hass, SIGNAL_STATS_UPDATED.format(self._entry_id))
+
+    async def _async_fetch_within_budget(self, due: set[str]) -> dict[str, _FetchedResponse]:
+        """Fetch the due endpoints within REFRESH_TIMEOUT_SECONDS.
+
+        The fetch runs as its own task, so that async_shutdown can cancel it
+        without cancelling whoever awaits the refresh.
+        """
+        self._fetch_task = self.hass.async_create_task(self._async_timed("fetch", self._async_fetch_data, due))
+        try:
+            async with asyncio.timeout(REFRESH_TIMEOUT_SECONDS) as budget:
+                return await self._fetch_task
+        except TimeoutError:
+            if not budget.expired():
+                raise
+            raise TimeoutError(f"Refresh took longer than {REFRESH_TIMEOUT_SECONDS}s") from None
+        finally:
+            self._fetch_task = None
+
+    async def _async_refresh_data(self) -> dict[str, Any]:
+        """Fetch and transform the data, mapping failures to HA errors.
+
+        After a failure the last good data is kept, and its endpoints are
+        marked stale so they are retried and reported as such.
+        """
+        due: set[str] = set()
+        stale_before = set(self.stale_endpoints)
+        try:
+            if (in_flight := self._fetch_task) is not None:
+                # Join the fetch in flight instead of starting another one
+                await asyncio.wait([in_flight])
+            due = self._due_endpoints()
+            if not due and self.data is not None:
+                # Nothing to fetch yet: wait for the next endpoint to be due
+                self.changed_scopes = set()
+                self.update_interval = min(map(self._due_at, API_PHASES)) - dt_util.utcnow()
+                return self.data
+
+            results = await self._async_fetch_within_budget(due)
+
+            start = time.monotonic()
+            data = self._async_transform(results)
+            self.stats.phase("transform").record(time.monotonic() - start)
+            if self.stale_endpoints:
+                # Retry the failed endpoints sooner than a full success would
+                self.update_interval = self.scheduler.failure_decision().interval
+            if self.stale_endpoints or stale_before:
+                # Let entities write their data_age and stale attributes
+                self.changed_scopes = None
+            if self.stale_endpoints != stale_before and data is self.data and self.last_update_success:
+                # Listeners are skipped when neither the data nor the success
+                # state changes, yet the entities' stale attribute did
+                self.async_update_listeners()
+            return data
+
+        except asyncio.CancelledError:
+            if (task := asyncio.current_task()) is not None and task.cancelling():
+                raise
+            # Only the fetch task was cancelled, by async_shutdown
+            raise UpdateFailed("Refresh cancelled by shutdown") from None
         except Exception as err:
+            self._set_stale_endpoints(self.stale_endpoints | (due & self._parts.keys()))
+            self.changed_scopes = None
+            if self.stale_endpoints != stale_before and not self.last_update_success:
+                # Already failing: only this write reports the newly stale data
+                self.async_update_listeners()
+            self.update_interval = self.scheduler.failure_decision().interval
             _LOGGER.error("Error updating Hyperoptic data: %s", err)
-            if "401" in str(err) or "Unauthorized" in str(err):
+            if is_auth_error(err):
+                # Rebuild the session on the next refresh; transient errors
+                # keep the authenticated client.
+                await self._async_close_client()
                 raise ConfigEntryAuthFailed("Invalid email or password") from err
             raise UpdateFailed(f"Error communicating with API: {err}") from err
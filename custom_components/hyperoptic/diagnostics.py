@@ -0,0 +1,101 @@
+"""Diagnostics support for Hyperoptic."""
+
+from collections.abc import Iterator
+from dataclasses import fields
+from itertools import islice
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .const import (
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    DIAGNOSTICS_MAX_ACCOUNTS,
+    DIAGNOSTICS_MAX_PACKAGES,
+    DOMAIN,
+)
+from .coordinator import HyperopticCoordinator
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD, "title", "unique_id", "uprn", "premise_uprn"}
+
+
+def _snapshot_fields(snapshot: Any) -> dict[str, Any]:
+    """Return the compared fields of a snapshot, skipping cached helpers."""
+    return {field.name: getattr(snapshot, field.name) for field in fields(snapshot) if field.compare}
+
+
+def _iter_accounts(data: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Yield the accounts of a payload with their connections.
+
+    Accounts are labelled by position, since the UPRN keys identify a
+    home. Packages are shared by every account, so they are listed once.
+    """
+    for index, account_data in enumerate(data["accounts"].values()):
+        yield {
+            "label": f"account_{index}",
+            "account": _snapshot_fields(account_data["account"]),
+            "connections": [_snapshot_fields(conn) for conn in account_data["connections"].values()],
+        }
+
+
+def _hit_rate(hits: int, misses: int) -> float | None:
+    """Return the share of lookups served from cache."""
+    return round(hits / (hits + misses), 3) if hits + misses else None
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: HyperopticCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+    snapshot: dict[str, Any] | None = None
+    if (data := coordinator.data) is not None:
+        packages = coordinator.packages
+        snapshot = {
+            "accounts": list(islice(_iter_accounts(data), DIAGNOSTICS_MAX_ACCOUNTS)),
+            "accounts_omitted": max(len(data["accounts"]) - DIAGNOSTICS_MAX_ACCOUNTS, 0),
+            "packages": [_snapshot_fields(package) for package in packages[:DIAGNOSTICS_MAX_PACKAGES]],
+            "packages_omitted": max(len(packages) - DIAGNOSTICS_MAX_PACKAGES, 0),
+        }
+
+    entity_counts: dict[str, int] = {}
+    for registry_entry in er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id):
+        entity_counts[registry_entry.domain] = entity_counts.get(registry_entry.domain, 0) + 1
+
+    decision = coordinator.scheduler.decision
+    timelines = coordinator.timelines
+    return async_redact_data(
+        {
+            "entry": entry.as_dict(),
+            "last_update_success": coordinator.last_update_success,
+            "payload_digests": coordinator.payload_digests,
+            "scheduler": {
+                "interval": decision.interval.total_seconds(),
+                "reason": decision.reason,
+                "update_interval": (
+                    coordinator.update_interval.total_seconds() if coordinator.update_interval else None
+                ),
+            },
+            "endpoints": {
+                endpoint: {
+                    "circuit": breaker.state,
+                    "cadence": (cadence.total_seconds() if (cadence := decision.endpoints.get(endpoint)) else None),
+                    "fetched_at": (
+                        fetched_at.isoformat() if (fetched_at := coordinator.fetched_at.get(endpoint)) else None
+                    ),
+                    "stale": endpoint in coordinator.stale_endpoints,
+                }
+                for endpoint, breaker in coordinator.breakers.items()
+            },
+            "stats": coordinator.stats.as_dict(),
+            "cache": {
+                "snapshot_hit_rate": _hit_rate(coordinator.stats.snapshot_hits, coordinator.stats.snapshot_misses),
+                "pricing_timeline_hit_rate": _hit_rate(timelines.hits, timelines.misses),
+            },
+            "entity_counts": entity_counts,
+            "snapshot": snapshot,
+        },
+        TO_REDACT,
+    )
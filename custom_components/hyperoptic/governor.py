@@ -0,0 +1,251 @@
+"""Domain-wide coordination of Hyperoptic API traffic."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .api import HyperopticApiClient, TokenBucket
+from .const import (
+    DATA_GOVERNOR,
+    DOMAIN,
+    EXECUTOR_MAX_WORKERS,
+    LOGIN_HANDOFF_SECONDS,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_PER_SECOND,
+    STARTUP_STAGGER_SECONDS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _SharedClient:
+    """A client and the entries using it."""
+
+    client: HyperopticApiClient
+    owners: set[str] = field(default_factory=set)
+
+
+@dataclass
+class _JoinedCall:
+    """An API call in flight and how many callers await it."""
+
+    task: asyncio.Task[Any]
+    waiters: int = 0
+
+
+@dataclass
+class ValidatedLogin:
+    """A login made by the config flow, kept for the entry it creates."""
+
+    client: HyperopticApiClient
+    customer: dict[str, Any]
+    fetched_at: datetime
+    cancel_expiry: CALLBACK_TYPE | None = None
+
+
+def _credentials_key(email: str, password: str) -> tuple[str, str]:
+    """Return the key identifying a Hyperoptic login."""
+    return email.casefold(), password
+
+
+class HyperopticGovernor:
+    """Shared rate limit, executor, clients and refresh slots for all config entries.
+
+    Every client draws from one token bucket, and runs blocking library
+    calls on one small executor so a hung call cannot hold Home Assistant's
+    shared threads. Entries with the same credentials share a single
+    logged-in client, and an API call one of them makes is joined by the
+    others making the same call meanwhile. A login validated by the config flow is held briefly
+    so the new entry can adopt it. Each entry owns a slot that offsets its
+    refreshes so entries are spread evenly over their interval instead of
+    polling together.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the governor."""
+        self._hass = hass
+        self.rate_limiter = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+        self._executor: ThreadPoolExecutor | None = None
+        self._clients: dict[tuple[str, str], _SharedClient] = {}
+        self._logins: dict[tuple[str, str], ValidatedLogin] = {}
+        self._entries: list[str] = []
+        # API calls in flight, keyed by bound client method and arguments
+        self._calls: dict[tuple[Any, ...], _JoinedCall] = {}
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Return the executor for blocking library calls, starting it if needed."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=EXECUTOR_MAX_WORKERS, thread_name_prefix=DOMAIN)
+        return self._executor
+
+    def _release_executor(self) -> None:
+        """Shut the executor down once no entry, client or login can use it.
+
+        Queued calls are cancelled; a call already running finishes on its
+        own thread, and nothing waits for it.
+        """
+        if self._executor is not None and not (self._entries or self._clients or self._logins):
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def register(self, entry_id: str) -> None:
+        """Give an entry a refresh slot."""
+        if entry_id not in self._entries:
+            self._entries.append(entry_id)
+
+    def unregister(self, entry_id: str) -> None:
+        """Release the refresh slot of an entry."""
+        if entry_id in self._entries:
+            self._entries.remove(entry_id)
+        self._release_executor()
+
+    def create_client(self, email: str, password: str) -> HyperopticApiClient:
+        """Return a new client drawing from the shared rate limit and executor."""
+        return HyperopticApiClient(self._hass, email, password, rate_limiter=self.rate_limiter, executor=self.executor)
+
+    async def async_close_client(self, client: HyperopticApiClient) -> None:
+        """Close a client no entry uses, and the executor if nothing else needs it."""
+        await client.async_close()
+        self._release_executor()
+
+    def get_client(
+        self, email: str, password: str, owner: str, client: HyperopticApiClient | None = None
+    ) -> HyperopticApiClient:
+        """Return the client shared by all entries with these credentials.
+
+        A given client becomes the shared one if there is none yet, and is
+        closed otherwise.
+        """
+        key = _credentials_key(email, password)
+        if (shared := self._clients.get(key)) is None:
+            shared = self._clients[key] = _SharedClient(client or self.create_client(email, password))
+        else:
+            if client is not None and client is not shared.client:
+                self._hass.async_create_task(self.async_close_client(client))
+            if owner not in shared.owners:
+                _LOGGER.debug("Sharing the Hyperoptic session for %s", email)
+        shared.owners.add(owner)
+        return shared.client
+
+    async def async_release_client(self, email: str, password: str, owner: str) -> None:
+        """Stop using a shared client, closing it once no entry needs it."""
+        key = _credentials_key(email, password)
+        if (shared := self._clients.get(key)) is None:
+            return
+        shared.owners.discard(owner)
+        if not shared.owners:
+            del self._clients[key]
+            await self.async_close_client(shared.client)
+
+    async def async_join_call(self, target: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Await an API call, joining the same call if one is in flight.
+
+        Entries sharing a client share its bound methods, so identical calls
+        have identical keys. The call is shielded: a caller giving up does
+        not cancel it for the others, but the last caller giving up cancels
+        it and waits for it to end.
+        """
+        key = (target, *args)
+        if (call := self._calls.get(key)) is None:
+            call = self._calls[key] = _JoinedCall(self._hass.async_create_task(target(*args)))
+            call.task.add_done_callback(lambda _: self._forget_call(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # Nobody else awaits the call: stop it instead of letting it
+                # run on against a client about to be closed
+                self._forget_call(key, call)
+                call.task.cancel()
+                await asyncio.wait([call.task])
+            raise
+        finally:
+            call.waiters -= 1
+
+    @callback
+    def _forget_call(self, key: tuple[Any, ...], call: _JoinedCall) -> None:
+        """Stop offering a call to new callers, unless it was already replaced."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    @callback
+    def hand_off_login(self, email: str, password: str, client: HyperopticApiClient, customer: dict[str, Any]) -> None:
+        """Keep a validated login and its raw customer response for the entry being created.
+
+        The login is closed if no entry claims it within LOGIN_HANDOFF_SECONDS.
+        """
+        key = _credentials_key(email, password)
+        if (previous := self.claim_login(email, password)) is not None:
+            self._hass.async_create_task(self.async_close_client(previous.client))
+
+        login = self._logins[key] = ValidatedLogin(client, customer, dt_util.utcnow())
+
+        @callback
+        def _expire(_now: datetime) -> None:
+            if self._logins.get(key) is login:
+                del self._logins[key]
+                self._hass.async_create_task(self.async_close_client(login.client))
+
+        login.cancel_expiry = async_call_later(self._hass, LOGIN_HANDOFF_SECONDS, _expire)
+
+    @callback
+    def claim_login(self, email: str, password: str) -> ValidatedLogin | None:
+        """Take the login handed off for these credentials, if any."""
+        if (login := self._logins.pop(_credentials_key(email, password), None)) is None:
+            return None
+        if login.cancel_expiry is not None:
+            login.cancel_expiry()
+        return login
+
+    def startup_delay(self, entry_id: str) -> float:
+        """Return the delay before the first background refresh of an entry."""
+        if entry_id not in self._entries:
+            return 0
+        return self._entries.index(entry_id) * STARTUP_STAGGER_SECONDS
+
+    def align_interval(
+        self,
+        entry_id: str,
+        interval: timedelta,
+        earliest: timedelta = timedelta(0),
+        jitter: timedelta = timedelta(0),
+    ) -> timedelta:
+        """Adjust an interval so the refresh lands on the entry's slot.
+
+        Slots divide the un-jittered interval evenly between registered
+        entries. The result is the first slot at least half an interval away
+        and not before ``earliest``, when the entry next has something to
+        fetch, so an aligned refresh never wakes up to find nothing due.
+        ``jitter`` is added after alignment, so it nudges a refresh around
+        its slot without moving the slots themselves.
+        """
+        if len(self._entries) < 2 or entry_id not in self._entries:
+            return interval + jitter
+
+        period = interval.total_seconds()
+        offset = period * self._entries.index(entry_id) / len(self._entries)
+        now = time.time()
+        start = now + max(period / 2, earliest.total_seconds())
+        aligned = start + (offset - start) % period
+        return max(timedelta(seconds=aligned - now) + jitter, earliest)
+
+
+def async_get_governor(hass: HomeAssistant) -> HyperopticGovernor:
+    """Return the governor shared by all Hyperoptic entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (governor := domain_data.get(DATA_GOVERNOR)) is None:
+        governor = domain_data[DATA_GOVERNOR] = HyperopticGovernor(hass)
+    return governor
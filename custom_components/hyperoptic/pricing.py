@@ -0,0 +1,188 @@
+"""Pricing schedule evaluation for Hyperoptic packages."""
+
+import logging
+from bisect import bisect_right
+from datetime import date, datetime
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# Raw (from, until, price) triples as returned by the API
+PricingEntries = tuple[tuple[Any, Any, Any], ...]
+
+
+def _parse_date(value: str | None) -> date | None:
+    """Parse an API date string, raising ValueError if malformed."""
+    if not value:
+        return None
+    return datetime.strptime(value, DATE_FORMAT).date()
+
+
+def get_pricing_entries(package: Any) -> PricingEntries:
+    """Return the package pricing list as plain (from, until, price) triples.
+
+    Handles both the dict shape of the raw API payload and the attribute
+    shape of the library models.
+    """
+    plan_details = getattr(package, "plan_details", None)
+    pricing_list = getattr(plan_details, "pricing", None)
+    if not pricing_list:
+        return ()
+
+    entries = []
+    for pricing in pricing_list:
+        if isinstance(pricing, dict):
+            entries.append((pricing.get("from"), pricing.get("until"), pricing.get("price")))
+        else:
+            entries.append(
+                (
+                    getattr(pricing, "from_date", None),
+                    getattr(pricing, "until", None),
+                    getattr(pricing, "price", None),
+                )
+            )
+    return tuple(entries)
+
+
+class PricingTimeline:
+    """Pre-parsed pricing schedule answering date queries by bisection.
+
+    Tiers with an ``until`` date are kept sorted by that date. The tier with
+    neither ``from`` nor ``until`` is the default price. The entries parsed
+    are kept, so the timeline can be stored and compiled again.
+    """
+
+    __slots__ = ("entries", "_untils", "_froms", "_prices", "_from_valid", "default_price")
+
+    def __init__(self, entries: PricingEntries) -> None:
+        """Parse the pricing entries once."""
+        self.entries = entries
+        tiers = []
+        self.default_price: Any = None
+
+        for from_str, until_str, price in entries:
+            # Skip if no price
+            if not price:
+                continue
+
+            # If both from and until are null, this is the default price
+            if from_str is None and until_str is None:
+                self.default_price = price
+                continue
+
+            try:
+                until = _parse_date(until_str)
+            except ValueError:
+                continue
+            if until is None:
+                # Open-ended tiers are never more specific than the default
+                continue
+
+            try:
+                from_date = _parse_date(from_str)
+                from_valid = True
+            except ValueError:
+                # Still marks a price boundary, but never the active tier
+                from_date = None
+                from_valid = False
+
+            tiers.append((until, from_date, price, from_valid))
+
+        tiers.sort(key=lambda tier: tier[0])
+        self._untils = [tier[0] for tier in tiers]
+        self._froms = [tier[1] for tier in tiers]
+        self._prices = [tier[2] for tier in tiers]
+        self._from_valid = [tier[3] for tier in tiers]
+
+    @property
+    def boundaries(self) -> list[date]:
+        """Return the sorted dates at which a tier ends."""
+        return list(self._untils)
+
+    def _active_index(self, day: date) -> int | None:
+        """Return the index of the tier applying on a day, if any."""
+        # Tiers still running on ``day`` are those with until > day; the
+        # first of them that has started is the most specific one.
+        for index in range(bisect_right(self._untils, day), len(self._untils)):
+            if not self._from_valid[index]:
+                continue
+            from_date = self._froms[index]
+            if from_date is None or from_date <= day:
+                return index
+        return None
+
+    def price_at(self, day: date) -> Any:
+        """Return the monthly price applying on a day."""
+        index = self._active_index(day)
+        if index is not None:
+            return self._prices[index]
+        return self.default_price
+
+    def current_tier(self, day: date) -> str | None:
+        """Return a human-readable description of the tier applying on a day."""
+        index = self._active_index(day)
+        if index is not None:
+            return f"Active Tier: £{self._prices[index]}/month"
+
+        if self.default_price:
+            return f"Default Price: £{self.default_price}/month"
+
+        return None
+
+    def next_increase(self, day: date) -> tuple[str | None, str | None]:
+        """Return the date and price of the next change after a day.
+
+        The next price increase happens at the end of the current pricing
+        period.
+        """
+        index = bisect_right(self._untils, day)
+        if index < len(self._untils) - 1:
+            return str(self._untils[index]), str(self._prices[index + 1])
+        return None, None
+
+
+class PricingTimelineCache:
+    """Compiled timelines keyed by package id and pricing content."""
+
+    def __init__(self) -> None:
+        """Initialize the cache."""
+        self._timelines: dict[Any, tuple[int, PricingTimeline]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, package: Any) -> PricingTimeline | None:
+        """Return the compiled timeline of a package, reusing it if unchanged."""
+        try:
+            entries = get_pricing_entries(package)
+        except Exception as err:
+            _LOGGER.debug("Error parsing package pricing: %s", err)
+            return None
+        return self.get_for_entries(package.id, entries)
+
+    def get_for_entries(self, package_id: Any, entries: PricingEntries) -> PricingTimeline | None:
+        """Return the compiled timeline of a package's pricing entries, reusing it if unchanged."""
+        try:
+            if not entries:
+                return None
+
+            content_hash = hash(entries)
+            cached = self._timelines.get(package_id)
+            if cached is not None and cached[0] == content_hash:
+                self.hits += 1
+                return cached[1]
+
+            self.misses += 1
+            timeline = PricingTimeline(entries)
+        except Exception as err:
+            _LOGGER.debug("Error parsing package pricing: %s", err)
+            return None
+
+        self._timelines[package_id] = (content_hash, timeline)
+        return timeline
+
+    def retain(self, package_ids: set[Any]) -> None:
+        """Drop timelines of packages that no longer exist."""
+        for package_id in self._timelines.keys() - package_ids:
+            del self._timelines[package_id]
@@ -0,0 +1,117 @@
+"""Retry and circuit breaking for Hyperoptic API calls."""
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+def is_auth_error(err: Exception) -> bool:
+    """Return True if the error indicates rejected credentials.
+
+    Errors carrying an HTTP status are judged by it alone, since their
+    message also holds the request URL.
+    """
+    status = getattr(err, "status_code", None)
+    if isinstance(status, int):
+        return status == 401
+    return "401" in str(err) or "Unauthorized" in str(err)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Stop calling an endpoint after repeated failures.
+
+    The circuit opens after ``threshold`` consecutive failed calls, and
+    calls then fail fast with CircuitOpenError. Once ``reset_timeout``
+    seconds have passed a single trial call is let through, and the calls
+    made while it runs still fail fast: success closes the circuit, failure
+    opens it again for twice as long, up to ``max_reset_timeout``.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float, max_reset_timeout: float) -> None:
+        """Initialize a closed breaker."""
+        self._threshold = threshold
+        self._base_reset_timeout = reset_timeout
+        self._max_reset_timeout = max(max_reset_timeout, reset_timeout)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Return "closed", "open" or "half_open"."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if a call may not be made now.
+
+        While half-open, the call let through is the trial call.
+        """
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_in_flight):
+            raise CircuitOpenError(f"circuit open after {self.failures} failures")
+        if state == "half_open":
+            self._trial_in_flight = True
+
+    def release(self) -> None:
+        """End a call whose outcome says nothing about the endpoint's health."""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        self._trial_in_flight = False
+        self.failures = 0
+        self._opened_at = None
+        self.reset_timeout = self._base_reset_timeout
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit if needed."""
+        self._trial_in_flight = False
+        self.failures += 1
+        if self._opened_at is not None:
+            # Failed trial call
+            self.reset_timeout = min(self.reset_timeout * 2, self._max_reset_timeout)
+            self._opened_at = time.monotonic()
+        elif self.failures >= self._threshold:
+            self._opened_at = time.monotonic()
+
+
+async def async_retry(
+    call: Callable[[], Awaitable[_T]],
+    *,
+    attempts: int,
+    base_delay: float,
+    max_delay: float,
+    retryable: Callable[[Exception], bool],
+) -> _T:
+    """Await a call, retrying retryable failures with exponential backoff.
+
+    Delays use full jitter: a random wait of up to base_delay * 2**n,
+    capped at max_delay, so clients recovering together do not retry in
+    lockstep.
+    """
+    for attempt in range(attempts):
+        try:
+            return await call()
+        except Exception as err:
+            if attempt == attempts - 1 or not retryable(err):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2**attempt))
+            _LOGGER.debug("Attempt %s failed (%s), retrying in %.1fs", attempt + 1, err, delay)
+            await asyncio.sleep(delay)
+    raise RuntimeError("attempts must be positive")
@@ -0,0 +1,102 @@
+"""Adaptive refresh scheduling for the Hyperoptic coordinator."""
+
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from .const import (
+    CUSTOMER_UPDATE_INTERVAL,
+    INSTALL_UPDATE_INTERVAL,
+    RENEWAL_UPDATE_INTERVAL,
+    SCAN_INTERVAL,
+    UPDATE_INTERVAL_JITTER,
+)
+
+
+@dataclass(frozen=True)
+class SchedulerDecision:
+    """Interval chosen for the next refresh and why.
+
+    ``endpoints`` holds how often each API endpoint needs fetching; the
+    refresh interval is the shortest of them. ``base_interval`` is the
+    same interval before jitter, for aligning refreshes to fixed slots.
+    """
+
+    interval: timedelta
+    base_interval: timedelta
+    reason: str
+    endpoints: dict[str, timedelta] = field(default_factory=dict)
+
+
+class RefreshScheduler:
+    """Choose the next refresh interval from the account lifecycle.
+
+    Pending installs and contracts close to their end are polled quickly.
+    Otherwise the interval starts at SCAN_INTERVAL and doubles after every
+    refresh that changed nothing. Intervals are jittered and clamped to the
+    configured floor and ceiling.
+
+    Each endpoint gets the cadence of what it reports: connections and the
+    accounts' order status follow installs, packages follow renewals, and
+    the customer is otherwise fetched no more than CUSTOMER_UPDATE_INTERVAL.
+    """
+
+    def __init__(
+        self,
+        min_interval: timedelta,
+        max_interval: timedelta,
+        jitter: float = UPDATE_INTERVAL_JITTER,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self._jitter = jitter
+        self._stable_interval = SCAN_INTERVAL
+        initial = self._clamp(SCAN_INTERVAL)
+        self.decision = SchedulerDecision(initial, initial, "initial")
+
+    def _clamp(self, interval: timedelta) -> timedelta:
+        """Clamp an interval to the configured floor and ceiling."""
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _decide(
+        self, interval: timedelta, reason: str, endpoints: dict[str, timedelta] | None = None
+    ) -> SchedulerDecision:
+        """Record a jittered, clamped decision, keeping the endpoint cadences if not given."""
+        jittered = interval
+        if self._jitter:
+            jittered *= random.uniform(1 - self._jitter, 1 + self._jitter)
+        if endpoints is None:
+            endpoints = self.decision.endpoints
+        self.decision = SchedulerDecision(self._clamp(jittered), self._clamp(interval), reason, endpoints)
+        return self.decision
+
+    def next_decision(self, *, install_pending: bool, renewal_due: bool, changed: bool) -> SchedulerDecision:
+        """Return the interval until the refresh after a successful one."""
+        if changed:
+            self._stable_interval = SCAN_INTERVAL
+        else:
+            self._stable_interval = min(self._stable_interval * 2, self.max_interval)
+
+        stable = self._stable_interval
+        endpoints = {
+            "customer": INSTALL_UPDATE_INTERVAL if install_pending else max(stable, CUSTOMER_UPDATE_INTERVAL),
+            "packages": RENEWAL_UPDATE_INTERVAL if renewal_due else stable,
+            "connections": INSTALL_UPDATE_INTERVAL if install_pending else stable,
+        }
+
+        if install_pending:
+            reason = "install_pending"
+        elif renewal_due:
+            reason = "renewal_window"
+        else:
+            reason = "changed" if changed else "stable"
+        return self._decide(
+            min(endpoints.values()),
+            reason,
+            {endpoint: self._clamp(interval) for endpoint, interval in endpoints.items()},
+        )
+
+    def failure_decision(self) -> SchedulerDecision:
+        """Return the interval until the retry after a failed refresh."""
+        return self._decide(min(self.decision.base_interval, SCAN_INTERVAL), "failure")
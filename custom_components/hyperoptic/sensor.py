@@ -1,74 +1,158 @@
 """Sensor platform for Hyperoptic integration."""
 
 import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
 
 from homeassistant.components.sensor import (
+    SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     DOMAIN,
+    ICON_ALERT,
     ICON_CALENDAR,
     ICON_DOWNLOAD,
     ICON_MONEY,
+    ICON_TIMER,
     ICON_UPLOAD,
+    SIGNAL_STATS_UPDATED,
 )
-from .coordinator import HyperopticCoordinator
+from .coordinator import SCOPE_ENDPOINTS, HyperopticCoordinator
+from .snapshot import AccountSnapshot, PackageSnapshot
+from .stats import RefreshStats
 
 _LOGGER = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True, kw_only=True)
+class HyperopticSensorEntityDescription(SensorEntityDescription):
+    """Describes a Hyperoptic sensor and how to read its value."""
+
+    value_fn: Callable[[AccountSnapshot, PackageSnapshot], StateType]
+
+
 SENSOR_DESCRIPTIONS = {
-    "download_speed": SensorEntityDescription(
+    "download_speed": HyperopticSensorEntityDescription(
         key="download_speed",
         name="Download Speed",
         icon=ICON_DOWNLOAD,
         native_unit_of_measurement="Mbps",
+        value_fn=lambda account, package: package.download_speed,
     ),
-    "upload_speed": SensorEntityDescription(
+    "upload_speed": HyperopticSensorEntityDescription(
         key="upload_speed",
         name="Upload Speed",
         icon=ICON_UPLOAD,
         native_unit_of_measurement="Mbps",
+        value_fn=lambda account, package: package.upload_speed,
     ),
-    "current_price": SensorEntityDescription(
+    "current_price": HyperopticSensorEntityDescription(
         key="current_price",
         name="Current Price",
         icon=ICON_MONEY,
         native_unit_of_measurement="GBP",
+        value_fn=lambda account, package: package.current_price,
     ),
-    "current_price_tier": SensorEntityDescription(
+    "current_price_tier": HyperopticSensorEntityDescription(
         key="current_price_tier",
         name="Current Price Tier",
         icon=ICON_MONEY,
+        value_fn=lambda account, package: package.current_price_tier,
     ),
-    "contract_end_date": SensorEntityDescription(
+    "contract_end_date": HyperopticSensorEntityDescription(
         key="contract_end_date",
         name="Contract End Date",
         icon=ICON_CALENDAR,
+        value_fn=lambda account, package: package.end_date,
     ),
-    "bundle_name": SensorEntityDescription(
+    "bundle_name": HyperopticSensorEntityDescription(
         key="bundle_name",
         name="Bundle Name",
+        value_fn=lambda account, package: package.bundle_name,
     ),
-    "order_status": SensorEntityDescription(
+    "order_status": HyperopticSensorEntityDescription(
         key="order_status",
         name="Order Status",
+        value_fn=lambda account, package: account.order_status,
     ),
-    "next_price_increase_date": SensorEntityDescription(
+    "next_price_increase_date": HyperopticSensorEntityDescription(
         key="next_price_increase_date",
         name="Next Price Increase Date",
         icon=ICON_CALENDAR,
+        value_fn=lambda account, package: package.next_price_increase_date,
     ),
-    "next_price_increase_amount": SensorEntityDescription(
+    "next_price_increase_amount": HyperopticSensorEntityDescription(
         key="next_price_increase_amount",
         name="Next Price Increase Amount",
         icon=ICON_MONEY,
         native_unit_of_measurement="GBP",
+        value_fn=lambda account, package: package.next_price_increase_price,
+    ),
+    "days_until_contract_end": HyperopticSensorEntityDescription(
+        key="days_until_contract_end",
+        name="Days Until Contract End",
+        icon=ICON_CALENDAR,
+        native_unit_of_measurement=UnitOfTime.DAYS,
+        value_fn=lambda account, package: package.days_until_contract_end,
+    ),
+    "days_until_next_price_increase": HyperopticSensorEntityDescription(
+        key="days_until_next_price_increase",
+        name="Days Until Next Price Increase",
+        icon=ICON_CALENDAR,
+        native_unit_of_measurement=UnitOfTime.DAYS,
+        value_fn=lambda account, package: package.days_until_next_price_increase,
+    ),
+}
+
+
+@dataclass(frozen=True, kw_only=True)
+class HyperopticDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Describes a refresh statistics sensor and how to read its value."""
+
+    value_fn: Callable[[RefreshStats], StateType]
+
+
+def _milliseconds(seconds: float | None) -> int | None:
+    """Convert a duration in seconds to whole milliseconds."""
+    return None if seconds is None else round(seconds * 1000)
+
+
+DIAGNOSTIC_SENSOR_DESCRIPTIONS = {
+    "api_latency": HyperopticDiagnosticSensorEntityDescription(
+        key="api_latency",
+        name="API Latency",
+        icon=ICON_TIMER,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda stats: _milliseconds(stats.api_latency),
+    ),
+    "last_refresh_duration": HyperopticDiagnosticSensorEntityDescription(
+        key="last_refresh_duration",
+        name="Last Refresh Duration",
+        icon=ICON_TIMER,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda stats: _milliseconds(stats.refresh.last_duration),
+    ),
+    "consecutive_failures": HyperopticDiagnosticSensorEntityDescription(
+        key="consecutive_failures",
+        name="Consecutive Failures",
+        icon=ICON_ALERT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda stats: stats.consecutive_failures,
     ),
 }
 
@@ -79,7 +163,7 @@ class HyperopticSensorEntity(CoordinatorEntity, SensorEntity):
     def __init__(
         self,
         coordinator: HyperopticCoordinator,
-        description: SensorEntityDescription,
+        description: HyperopticSensorEntityDescription,
         uprn: str,
         package_id: str,
     ) -> None:
@@ -90,48 +174,83 @@ class HyperopticSensorEntity(CoordinatorEntity, SensorEntity):
         self._package_id = package_id
 
         self._attr_name = f"{description.name} {uprn}"
-        self._attr_unique_id = f"hyperoptic_{uprn}_{package_id}_{description.key}"
+        self._attr_unique_id = _unique_id(uprn, package_id, description.key)
+
+        self._scopes = {("package", package_id)}
+        if description.key == "order_status":
+            self._scopes.add(("account", uprn))
+        self._endpoints = {SCOPE_ENDPOINTS[kind] for kind, _ in self._scopes}
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the data this sensor reads has changed."""
+        if self.coordinator.data_changed(self._scopes):
+            super()._handle_coordinator_update()
+
+    @property
+    def available(self) -> bool:
+        """Return True while the data is fresh, or stale but not too old."""
+        return self.coordinator.data_available(self._endpoints)
 
     @property
-    def native_value(self) -> int | str | None:
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return how fresh the data shown is."""
+        return self.coordinator.freshness_attributes(self._endpoints)
+
+    @property
+    def native_value(self) -> StateType:
         """Return the native value of the sensor."""
-        if self.coordinator.data is None:
-            return None
-
-        account_data = self.coordinator.data["accounts"].get(self._uprn)
-        if not account_data:
-            return None
-
-        package = next(
-            (pkg for pkg in account_data["packages"] if pkg.id == self._package_id),
-            None,
-        )
-        if not package:
-            return None
-
-        key = self.entity_description.key
-
-        if key == "download_speed":
-            return package.download_speed
-        elif key == "upload_speed":
-            return package.upload_speed
-        elif key == "current_price":
-            return package.current_price
-        elif key == "current_price_tier":
-            return getattr(package, "current_price_tier", None)
-        elif key == "contract_end_date":
-            return package.end_date
-        elif key == "bundle_name":
-            return package.bundle_name
-        elif key == "order_status":
-            account = account_data["account"]
-            return account.order_status
-        elif key == "next_price_increase_date":
-            return getattr(package, "next_price_increase_date", None)
-        elif key == "next_price_increase_amount":
-            return getattr(package, "next_price_increase_price", None)
-
-        return None
+        return self.coordinator.values.get(self._attr_unique_id)
+
+
+class HyperopticDiagnosticSensorEntity(SensorEntity):
+    """Refresh statistics sensor of a config entry.
+
+    Updated after every refresh attempt, including failed and unchanged
+    ones, and always available so failures can be observed.
+    """
+
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        coordinator: HyperopticCoordinator,
+        description: HyperopticDiagnosticSensorEntityDescription,
+        entry_id: str,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._stats = coordinator.stats
+        self._signal = SIGNAL_STATS_UPDATED.format(entry_id)
+
+        self._attr_name = f"Hyperoptic {description.name}"
+        self._attr_unique_id = f"hyperoptic_{entry_id}_{description.key}"
+
+    async def async_added_to_hass(self) -> None:
+        """Write state whenever the statistics change."""
+        await super().async_added_to_hass()
+        self.async_on_remove(async_dispatcher_connect(self.hass, self._signal, self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the native value of the sensor."""
+        return self.entity_description.value_fn(self._stats)
+
+
+def _unique_id(uprn: str, package_id: str, key: str) -> str:
+    """Return the unique ID of a package sensor."""
+    return f"hyperoptic_{uprn}_{package_id}_{key}"
+
+
+def build_values(data: dict[str, Any]) -> dict[str, StateType]:
+    """Return the value of every sensor, keyed by unique ID."""
+    values: dict[str, StateType] = {}
+    for uprn, account_data in data["accounts"].items():
+        account = account_data["account"]
+        for package in account_data["packages"].values():
+            for description in SENSOR_DESCRIPTIONS.values():
+                values[_unique_id(uprn, package.id, description.key)] = description.value_fn(account, package)
+    return values
 
 
 async def async_setup_entry(
@@ -141,15 +260,20 @@ async def async_setup_entry(
 ) -> None:
     """Set up Hyperoptic sensors from a config entry."""
     coordinator: HyperopticCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    entry.async_on_unload(coordinator.async_add_value_builder(build_values))
 
-    entities = []
+    entities: list[SensorEntity] = [
+        HyperopticDiagnosticSensorEntity(coordinator, description, entry.entry_id)
+        for description in DIAGNOSTIC_SENSOR_DESCRIPTIONS.values()
+    ]
 
     # Create sensors for each account/package combo
     if coordinator.data is None:
+        async_add_entities(entities)
         return
 
     for uprn, account_data in coordinator.data["accounts"].items():
-        for package in account_data["packages"]:
+        for package in account_data["packages"].values():
             for description in SENSOR_DESCRIPTIONS.values():
                 entities.append(
                     HyperopticSensorEntity(
@@ -0,0 +1,90 @@
+"""Services for the Hyperoptic integration."""
+
+import asyncio
+import logging
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_ENDPOINT,
+    ATTR_UPRN,
+    DOMAIN,
+    SERVICE_REFRESH,
+)
+from .coordinator import HyperopticCoordinator
+from .stats import API_PHASES
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_UPRN): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_ENDPOINT): vol.In(API_PHASES),
+    }
+)
+
+
+def _loaded_coordinators(hass: HomeAssistant) -> dict[str, HyperopticCoordinator]:
+    """Return the coordinator of every loaded entry, keyed by entry ID."""
+    domain_data = hass.data.get(DOMAIN, {})
+    return {
+        entry.entry_id: domain_data[entry.entry_id]["coordinator"]
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.entry_id in domain_data
+    }
+
+
+def _target_coordinators(hass: HomeAssistant, call: ServiceCall) -> list[HyperopticCoordinator]:
+    """Return the coordinators a service call targets.
+
+    Entries are targeted by ID or by the UPRN of one of their accounts;
+    a call naming neither targets every loaded entry.
+    """
+    coordinators = _loaded_coordinators(hass)
+    entry_ids = call.data.get(ATTR_CONFIG_ENTRY_ID, [])
+    uprns = call.data.get(ATTR_UPRN, [])
+    if not entry_ids and not uprns:
+        return list(coordinators.values())
+
+    targets: dict[str, HyperopticCoordinator] = {}
+    for entry_id in entry_ids:
+        if entry_id not in coordinators:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="entry_not_loaded",
+                translation_placeholders={"entry_id": entry_id},
+            )
+        targets[entry_id] = coordinators[entry_id]
+    for uprn in uprns:
+        matches = {
+            entry_id: coordinator
+            for entry_id, coordinator in coordinators.items()
+            if coordinator.data is not None and uprn in coordinator.data["accounts"]
+        }
+        if not matches:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="unknown_uprn",
+                translation_placeholders={"uprn": uprn},
+            )
+        targets.update(matches)
+    return list(targets.values())
+
+
+async def _async_refresh(call: ServiceCall) -> None:
+    """Refresh the targeted entries, optionally a single endpoint only."""
+    endpoints = [call.data[ATTR_ENDPOINT]] if ATTR_ENDPOINT in call.data else API_PHASES
+    coordinators = _target_coordinators(call.hass, call)
+    _LOGGER.debug("Refreshing %s for %s entries", ", ".join(endpoints), len(coordinators))
+    await asyncio.gather(*(coordinator.async_refresh_on_demand(endpoints) for coordinator in coordinators))
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Hyperoptic services."""
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH, _async_refresh, schema=SERVICE_REFRESH_SCHEMA)
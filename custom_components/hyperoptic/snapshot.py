@@ -0,0 +1,173 @@
+"""Immutable snapshots of the Hyperoptic data read by the platforms."""
+
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from .pricing import PricingTimeline
+
+
+def connection_id(account: Any) -> str | None:
+    """Return the id of the connection linked from a library Account."""
+    return account.connection_url.rsplit("/", 1)[-1] if account.connection_url else None
+
+
+@dataclass(frozen=True, slots=True)
+class AccountSnapshot:
+    """The fields of an account used by the platforms.
+
+    The connection id is only kept to fetch the connection and takes no
+    part in comparisons.
+    """
+
+    uprn: int | None
+    order_status: str | None
+    have_hyperhub: bool | None
+    connection_id: str | None = field(default=None, compare=False)
+
+    @classmethod
+    def from_api(cls, account: Any) -> "AccountSnapshot":
+        """Copy the used fields out of a library Account."""
+        return cls(
+            uprn=account.uprn,
+            order_status=account.order_status,
+            have_hyperhub=account.have_hyperhub,
+            connection_id=connection_id(account),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the snapshot in JSON-compatible form."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "AccountSnapshot":
+        """Rebuild a snapshot returned by as_dict."""
+        return cls(**data)
+
+
+@dataclass(frozen=True, slots=True)
+class CustomerSnapshot:
+    """The customer id and its accounts, keyed by UPRN."""
+
+    id: str
+    accounts: dict[str, AccountSnapshot]
+
+    @classmethod
+    def from_api(cls, customer: Any) -> "CustomerSnapshot":
+        """Copy the used fields out of a library Customer."""
+        return cls(
+            id=customer.id,
+            accounts={str(account.uprn): AccountSnapshot.from_api(account) for account in customer.accounts},
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the snapshot in JSON-compatible form."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CustomerSnapshot":
+        """Rebuild a snapshot returned by as_dict."""
+        return cls(
+            id=data["id"],
+            accounts={uprn: AccountSnapshot.from_dict(account) for uprn, account in data["accounts"].items()},
+        )
+
+    @property
+    def connection_ids(self) -> list[str]:
+        """Return the ids of the connections linked from the accounts."""
+        return [account.connection_id for account in self.accounts.values() if account.connection_id]
+
+
+@dataclass(frozen=True, slots=True)
+class ConnectionSnapshot:
+    """The fields of a connection used by the platforms."""
+
+    id: str | None
+    premise_uprn: int | None
+    is_installed: bool
+
+    @classmethod
+    def from_api(cls, connection: dict[str, Any]) -> "ConnectionSnapshot":
+        """Copy the used fields out of a raw connection response."""
+        return cls(
+            id=connection.get("id"),
+            premise_uprn=connection.get("premiseUprn"),
+            is_installed=connection.get("isInstalled", False),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the snapshot in JSON-compatible form."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ConnectionSnapshot":
+        """Rebuild a snapshot returned by as_dict."""
+        return cls(**data)
+
+
+@dataclass(frozen=True, slots=True)
+class PackageSnapshot:
+    """The fields of a package used by the platforms.
+
+    The date-dependent fields are derived from the pricing timeline and the
+    contract end date for a given day; they are replaced, not mutated, when
+    the day changes. The timeline itself takes no part in comparisons.
+    """
+
+    id: str
+    bundle_name: str | None
+    download_speed: int | None
+    upload_speed: int | None
+    current_price: float | None
+    end_date: str | None
+    can_renew: bool
+    current_price_tier: str | None = None
+    next_price_increase_date: str | None = None
+    next_price_increase_price: str | None = None
+    days_until_contract_end: int | None = None
+    days_until_next_price_increase: int | None = None
+    pricing_timeline: PricingTimeline | None = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_api(cls, package: Any, timeline: PricingTimeline | None) -> "PackageSnapshot":
+        """Copy the used fields out of a library Package."""
+        return cls(
+            id=package.id,
+            bundle_name=package.bundle_name,
+            download_speed=package.download_speed,
+            upload_speed=package.upload_speed,
+            current_price=package.current_price,
+            end_date=package.end_date,
+            can_renew=package.can_renew,
+            pricing_timeline=timeline,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the fields copied from the API and the pricing entries in JSON-compatible form.
+
+        The date-dependent fields are left out, as they are derived again
+        for the day the snapshot is rebuilt.
+        """
+        return {
+            "id": self.id,
+            "bundle_name": self.bundle_name,
+            "download_speed": self.download_speed,
+            "upload_speed": self.upload_speed,
+            "current_price": self.current_price,
+            "end_date": self.end_date,
+            "can_renew": self.can_renew,
+            "pricing": [list(entry) for entry in self.pricing_timeline.entries] if self.pricing_timeline else [],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], timeline: PricingTimeline | None) -> "PackageSnapshot":
+        """Rebuild a snapshot returned by as_dict, with the timeline of its pricing entries."""
+        return cls(
+            id=data["id"],
+            bundle_name=data["bundle_name"],
+            download_speed=data["download_speed"],
+            upload_speed=data["upload_speed"],
+            current_price=data["current_price"],
+            end_date=data["end_date"],
+            can_renew=data["can_renew"],
+            pricing_timeline=timeline,
+        )
@@ -0,0 +1,108 @@
+"""In-memory refresh statistics for the Hyperoptic coordinator."""
+
+import statistics
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from homeassistant.util import dt as dt_util
+
+from .const import STATS_HISTOGRAM_BUCKETS, STATS_HISTORY
+
+# Phases that are calls to the account service
+API_PHASES = ("customer", "packages", "connections")
+
+
+@dataclass
+class PhaseStats:
+    """Rolling timings, sizes and outcomes of one refresh phase."""
+
+    durations: deque[float] = field(default_factory=lambda: deque(maxlen=STATS_HISTORY))
+    successes: int = 0
+    failures: int = 0
+    last_duration: float | None = None
+    last_bytes: int | None = None
+    last_error: str | None = None
+    last_success: datetime | None = None
+
+    def record(self, duration: float, error: str | None = None) -> None:
+        """Record one run of the phase."""
+        self.durations.append(duration)
+        self.last_duration = duration
+        self.last_error = error
+        if error is None:
+            self.successes += 1
+            self.last_success = dt_util.utcnow()
+        else:
+            self.failures += 1
+
+    def histogram(self) -> dict[str, int]:
+        """Return the recent durations counted per bucket upper bound."""
+        counts = dict.fromkeys([f"le_{bucket}" for bucket in STATS_HISTOGRAM_BUCKETS] + ["inf"], 0)
+        for duration in self.durations:
+            for bucket in STATS_HISTOGRAM_BUCKETS:
+                if duration <= bucket:
+                    counts[f"le_{bucket}"] += 1
+                    break
+            else:
+                counts["inf"] += 1
+        return counts
+
+    def as_dict(self) -> dict[str, object]:
+        """Return a JSON-friendly summary."""
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "last_duration": self.last_duration,
+            "last_bytes": self.last_bytes,
+            "last_error": self.last_error,
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+            "histogram": self.histogram(),
+        }
+
+
+class RefreshStats:
+    """Per-phase statistics and refresh outcome counters.
+
+    Phases are the auth check, each account service endpoint, the fetch as
+    a whole and the transform. Durations are kept for the last
+    STATS_HISTORY runs of each phase.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.phases: dict[str, PhaseStats] = {}
+        self.refresh = PhaseStats()
+        self.consecutive_failures = 0
+        # Successful refreshes that reused the current snapshot, and those
+        # that had to rebuild it
+        self.snapshot_hits = 0
+        self.snapshot_misses = 0
+
+    def phase(self, name: str) -> PhaseStats:
+        """Return the statistics of a phase, creating them on first use."""
+        if (phase := self.phases.get(name)) is None:
+            phase = self.phases[name] = PhaseStats()
+        return phase
+
+    def record_refresh(self, duration: float, error: str | None = None) -> None:
+        """Record the outcome of a whole refresh."""
+        self.refresh.record(duration, error)
+        self.consecutive_failures = 0 if error is None else self.consecutive_failures + 1
+
+    @property
+    def api_latency(self) -> float | None:
+        """Return the median recent account service call duration in seconds."""
+        durations = [duration for name in API_PHASES if name in self.phases for duration in self.phases[name].durations]
+        return statistics.median(durations) if durations else None
+
+    def as_dict(self) -> dict[str, object]:
+        """Return a JSON-friendly summary."""
+        return {
+            "refresh": self.refresh.as_dict(),
+            "consecutive_failures": self.consecutive_failures,
+            "snapshot_hits": self.snapshot_hits,
+            "snapshot_misses": self.snapshot_misses,
+            "api_latency": self.api_latency,
+            "phases": {name: phase.as_dict() for name, phase in self.phases.items()},
+        }
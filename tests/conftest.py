@@ -3,11 +3,23 @@
 import random
 import string
 import uuid
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from hyperoptic.models import Customer, Package
 
-from custom_components.hyperoptic.coordinator import PackageWrapper
+from custom_components.hyperoptic.snapshot import (
+    AccountSnapshot,
+    ConnectionSnapshot,
+    PackageSnapshot,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay():
+    """Retry failed API calls without waiting."""
+    with patch("custom_components.hyperoptic.coordinator.RETRY_BASE_DELAY", 0):
+        yield
 
 
 def _generate_uuid() -> str:
@@ -47,71 +59,72 @@ def mock_hyperoptic_client():
 
     connection_id = _generate_uuid()
 
-    # Mock customer
-    customer = MagicMock()
-    customer.id = customer_id
-    customer.identifier = customer_identifier
-    customer.full_name = customer_name
-    customer.email = customer_email
-
-    # Mock account
-    account = MagicMock()
-    account.id = account_id
-    account.uprn = account_uprn
-    account.bundle_name = "1Gb Fibre Connection - Broadband Only"
-    account.order_status = "ACTIVE"
-    account.have_hyperhub = True
-    customer.accounts = [account]
-
-    # Mock package
-    package = MagicMock()
-    package.id = package_id
-    package.identifier = package_identifier
-    package.status = "ACTIVE"
-    package.bundle_name = "1Gb Fibre Connection - Broadband"
-    package.download_speed = 1000
-    package.upload_speed = 1000
-    package.current_price = 16.0
-    package.end_date = "2026-09-02"
-    package.can_renew = True
-
-    # Mock plan details with pricing information
-    pricing_item_1 = {
-        "from": None,
-        "until": None,
-        "price": "63.0",
-    }
-    pricing_item_2 = {
-        "from": "2025-09-01",
-        "until": "2026-05-01",
-        "price": "16.0",
-    }
-    pricing_item_3 = {
-        "from": "2026-05-01",
-        "until": "2026-09-01",
-        "price": "19.0",
+    # Raw API responses
+    given_name, family_name = customer_name.split(" ")
+    customer_data = {
+        "id": customer_id,
+        "identifier": customer_identifier,
+        "givenName": given_name,
+        "familyName": family_name,
+        "email": customer_email,
+        "accounts": [
+            {
+                "id": account_id,
+                "uprn": account_uprn,
+                "bundleName": "1Gb Fibre Connection - Broadband Only",
+                "orderStatus": "ACTIVE",
+                "haveHyperhub": True,
+                "_links": {
+                    "connection": {
+                        "href": f"https://api.hyperopticportal.com/account-service/connections/{connection_id}"
+                    }
+                },
+            }
+        ],
     }
 
-    plan_details = MagicMock()
-    plan_details.pricing = [
-        pricing_item_1,
-        pricing_item_2,
-        pricing_item_3,
-    ]
-    package.plan_details = plan_details
+    # Pricing: an old list price, then two tiers ending with the contract
+    package_data = {
+        "id": package_id,
+        "identifier": package_identifier,
+        "status": "ACTIVE",
+        "bundleName": "1Gb Fibre Connection - Broadband",
+        "broadbandProduct": {"downloadSpeedMbps": 1000, "uploadSpeedMbps": 1000},
+        "currentPrice": 16.0,
+        "endDate": "2026-09-02",
+        "canRenew": True,
+        "planDetails": {
+            "pricing": [
+                {"from": None, "until": None, "price": "63.0"},
+                {"from": "2025-09-01", "until": "2026-05-01", "price": "16.0"},
+                {"from": "2026-05-01", "until": "2026-09-01", "price": "19.0"},
+            ]
+        },
+    }
 
-    # Mock connection
     connection = {
         "id": connection_id,
         "isInstalled": True,
         "premiseUprn": account_uprn,
     }
 
+    customer = Customer.model_validate(customer_data)
+    package = Package.model_validate(package_data)
+
     client.get_customer = MagicMock(return_value=customer)
     client.get_my_packages = MagicMock(return_value=[package])
     client.get_my_connections = MagicMock(return_value=[connection])
     client.close = MagicMock()
 
+    # Async API surface used by the coordinator and config flow
+    client.async_authenticate = AsyncMock()
+    client.async_get_customer = AsyncMock(return_value=customer)
+    client.async_get_customer_data = AsyncMock(return_value=customer_data)
+    client.async_get_packages = AsyncMock(return_value=[package])
+    client.async_get_packages_data = AsyncMock(return_value=[package_data])
+    client.async_get_connection = AsyncMock(return_value=connection)
+    client.async_close = AsyncMock()
+
     # Store generated IDs for test access
     client.test_customer_id = customer_id
     client.test_customer_name = customer_name
@@ -130,19 +143,29 @@ def mock_coordinator_data(mock_hyperoptic_client):
     uprn_str = str(mock_hyperoptic_client.test_account_uprn)
     package = mock_hyperoptic_client.get_my_packages.return_value[0]
 
-    # Wrap the package with the calculated fields
-    wrapped_package = PackageWrapper(package)
-    wrapped_package.next_price_increase_date = "2026-05-01"
-    wrapped_package.next_price_increase_price = "19.0"
-    wrapped_package.current_price_tier = "Active Tier: £16.0/month"
+    # Snapshot the package with the calculated fields
+    package_snapshot = PackageSnapshot(
+        id=package.id,
+        bundle_name=package.bundle_name,
+        download_speed=package.download_speed,
+        upload_speed=package.upload_speed,
+        current_price=package.current_price,
+        end_date=package.end_date,
+        can_renew=package.can_renew,
+        current_price_tier="Active Tier: £16.0/month",
+        next_price_increase_date="2026-05-01",
+        next_price_increase_price="19.0",
+        days_until_contract_end=244,
+        days_until_next_price_increase=120,
+    )
+    connections = [ConnectionSnapshot.from_api(conn) for conn in mock_hyperoptic_client.get_my_connections.return_value]
 
     return {
-        "customer": mock_hyperoptic_client.get_customer.return_value,
         "accounts": {
             uprn_str: {
-                "account": (mock_hyperoptic_client.get_customer.return_value.accounts[0]),
-                "packages": [wrapped_package],
-                "connections": (mock_hyperoptic_client.get_my_connections.return_value),
+                "account": AccountSnapshot.from_api(mock_hyperoptic_client.get_customer.return_value.accounts[0]),
+                "packages": {package_snapshot.id: package_snapshot},
+                "connections": {conn.id: conn for conn in connections},
             }
         },
     }
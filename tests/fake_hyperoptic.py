@@ -0,0 +1,288 @@
+"""In-process fake of the Hyperoptic auth and account service APIs.
+
+Serves the token endpoint and the customer, packages and connection
+endpoints on 127.0.0.1, with configurable latency, error rate, rate limit
+and dataset size, so the real HyperopticApiClient can be exercised end to
+end without network access:
+
+    async with FakeHyperopticServer(generate_dataset(accounts=10)) as server:
+        with server.patch_client():
+            ...
+"""
+
+import asyncio
+import random
+import secrets
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+from unittest.mock import patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+TOKEN_PATH = "/realms/hyperoptic/protocol/openid-connect/token"
+API_PATH = "/account-service"
+API_BASE = "https://api.hyperopticportal.com/account-service"
+
+
+@dataclass
+class FakeDataset:
+    """Raw JSON served by the fake account service."""
+
+    customer: dict[str, Any]
+    packages: list[dict[str, Any]]
+    connections: dict[str, dict[str, Any]]
+
+
+def _pricing(tiers: int, start: date, rng: random.Random) -> list[dict[str, Any]]:
+    """Return a pricing schedule of consecutive tiers plus a default price."""
+    pricing: list[dict[str, Any]] = [{"from": None, "until": None, "price": "63.0"}]
+    period_start = start
+    for _ in range(tiers):
+        period_end = period_start + timedelta(days=rng.randint(30, 180))
+        pricing.append(
+            {
+                "from": period_start.isoformat(),
+                "until": period_end.isoformat(),
+                "price": f"{rng.randint(15, 60)}.0",
+            }
+        )
+        period_start = period_end
+    rng.shuffle(pricing)
+    return pricing
+
+
+def generate_dataset(
+    accounts: int = 1,
+    packages: int = 1,
+    connections: int | None = None,
+    tiers: int = 3,
+    seed: int = 0,
+) -> FakeDataset:
+    """Build a deterministic dataset of the given size.
+
+    Every package is visible from every account, as in the API. Only the
+    first ``connections`` accounts (all by default) link to a connection,
+    since each account has at most one.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    first_uprn = 100_000_000_000
+    connections = accounts if connections is None else connections
+
+    account_list = []
+    connection_map: dict[str, dict[str, Any]] = {}
+    for index in range(accounts):
+        uprn = first_uprn + index
+        links = {}
+        if index < connections:
+            connection_id = f"connection-{index}"
+            links["connection"] = {"href": f"{API_BASE}/connections/{connection_id}"}
+            connection_map[connection_id] = {
+                "id": connection_id,
+                "isInstalled": rng.random() > 0.1,
+                "premiseUprn": uprn,
+            }
+        account_list.append(
+            {
+                "id": f"account-{index}",
+                "uprn": uprn,
+                "orderStatus": "ACTIVE" if rng.random() > 0.1 else "PENDING",
+                "haveHyperhub": rng.random() > 0.5,
+                "_links": links,
+            }
+        )
+
+    package_list = [
+        {
+            "id": f"package-{index}",
+            "identifier": 600_000 + index,
+            "status": "ACTIVE",
+            "bundleName": "1Gb Fibre Connection - Broadband",
+            "endDate": (today + timedelta(days=rng.randint(-30, 720))).isoformat(),
+            "currentPrice": float(rng.randint(15, 60)),
+            "canRenew": rng.random() > 0.5,
+            "broadbandProduct": {"downloadSpeedMbps": 1000, "uploadSpeedMbps": 1000},
+            "planDetails": {"pricing": _pricing(tiers, today - timedelta(days=365), rng)},
+        }
+        for index in range(packages)
+    ]
+
+    return FakeDataset(
+        customer={"id": "customer-id", "identifier": 123456, "accounts": account_list},
+        packages=package_list,
+        connections=connection_map,
+    )
+
+
+class FakeHyperopticServer:
+    """Fake Hyperoptic API server.
+
+    ``latency`` is a delay in seconds, or a (min, max) range, applied to
+    every request. ``error_rate`` is the share of account service requests
+    answered with a 500, and ``failing`` holds routes that always are.
+    ``rate_limit`` caps requests per second across all
+    endpoints; requests above it get a 429. ``password_grant`` False makes
+    the token endpoint refuse the password grant like the production realm
+    may do.
+    """
+
+    def __init__(
+        self,
+        dataset: FakeDataset | None = None,
+        *,
+        email: str = "test@example.com",
+        password: str = "password",
+        latency: float | tuple[float, float] = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: float | None = None,
+        access_token_lifetime: int = 300,
+        password_grant: bool = True,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the server."""
+        self.dataset = dataset or generate_dataset()
+        self.email = email
+        self.password = password
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.access_token_lifetime = access_token_lifetime
+        self.password_grant = password_grant
+        self.requests: Counter[str] = Counter()
+        self.failing: set[str] = set()
+        self._rng = random.Random(seed)
+        self._recent: deque[float] = deque()
+        self._access_tokens: set[str] = set()
+        self._refresh_tokens: set[str] = set()
+
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post(TOKEN_PATH, self._handle_token)
+        app.router.add_get(f"{API_PATH}/customers", self._handle_customers)
+        app.router.add_get(f"{API_PATH}/customers/{{customer_id}}/packages", self._handle_packages)
+        app.router.add_get(f"{API_PATH}/connections/{{connection_id}}", self._handle_connection)
+        self._server = TestServer(app, host="127.0.0.1")
+
+    async def __aenter__(self) -> "FakeHyperopticServer":
+        """Start serving."""
+        await self._server.start_server()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Stop serving."""
+        await self._server.close()
+
+    @property
+    def api_base(self) -> str:
+        """Return the account service base URL."""
+        return str(self._server.make_url(API_PATH))
+
+    @property
+    def token_url(self) -> str:
+        """Return the token endpoint URL."""
+        return str(self._server.make_url(TOKEN_PATH))
+
+    @contextmanager
+    def patch_client(self):
+        """Point HyperopticApiClient at this server."""
+        with (
+            patch("custom_components.hyperoptic.api.API_BASE", self.api_base),
+            patch("custom_components.hyperoptic.api.TOKEN_URL", self.token_url),
+        ):
+            yield self
+
+    def revoke_tokens(self) -> None:
+        """Invalidate every issued access and refresh token."""
+        self._access_tokens.clear()
+        self._refresh_tokens.clear()
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        """Apply latency and rate limiting, and count requests."""
+        resource = request.match_info.route.resource
+        self.requests[resource.canonical if resource else request.path] += 1
+
+        if isinstance(self.latency, tuple):
+            await asyncio.sleep(self._rng.uniform(*self.latency))
+        elif self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.rate_limit is not None:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= 1:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                return web.json_response({"error": "Too Many Requests"}, status=429)
+            self._recent.append(now)
+
+        return await handler(request)
+
+    def _issue_tokens(self) -> web.Response:
+        """Return a fresh token response."""
+        access_token = secrets.token_hex(16)
+        refresh_token = secrets.token_hex(16)
+        self._access_tokens.add(access_token)
+        self._refresh_tokens.add(refresh_token)
+        return web.json_response(
+            {
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "expires_in": self.access_token_lifetime,
+                "refresh_expires_in": self.access_token_lifetime * 6,
+            }
+        )
+
+    async def _handle_token(self, request: web.Request) -> web.Response:
+        """Handle the password and refresh token grants."""
+        form = await request.post()
+        grant_type = form.get("grant_type")
+
+        if grant_type == "password":
+            if not self.password_grant:
+                return web.json_response({"error": "unauthorized_client"}, status=400)
+            if form.get("username") != self.email or form.get("password") != self.password:
+                return web.json_response({"error": "invalid_grant"}, status=401)
+            return self._issue_tokens()
+
+        if grant_type == "refresh_token" and form.get("refresh_token") in self._refresh_tokens:
+            self._refresh_tokens.discard(form.get("refresh_token"))
+            return self._issue_tokens()
+
+        return web.json_response({"error": "invalid_grant"}, status=400)
+
+    def _check_request(self, request: web.Request) -> web.Response | None:
+        """Return an error response for unauthorized or failing requests."""
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if token not in self._access_tokens:
+            return web.Response(status=401, text="Unauthorized")
+        if request.match_info.route.resource.canonical in self.failing or (
+            self.error_rate and self._rng.random() < self.error_rate
+        ):
+            return web.Response(status=500, text="Internal Server Error")
+        return None
+
+    async def _handle_customers(self, request: web.Request) -> web.Response:
+        """Return the customer."""
+        if (error := self._check_request(request)) is not None:
+            return error
+        return web.json_response({"_embedded": {"customers": [self.dataset.customer]}})
+
+    async def _handle_packages(self, request: web.Request) -> web.Response:
+        """Return the packages of the customer."""
+        if (error := self._check_request(request)) is not None:
+            return error
+        if request.match_info["customer_id"] != self.dataset.customer["id"]:
+            return web.Response(status=404, text="Not Found")
+        return web.json_response({"_embedded": {"packages": self.dataset.packages}})
+
+    async def _handle_connection(self, request: web.Request) -> web.Response:
+        """Return one connection."""
+        if (error := self._check_request(request)) is not None:
+            return error
+        if (connection := self.dataset.connections.get(request.match_info["connection_id"])) is None:
+            return web.Response(status=404, text="Not Found")
+        return web.json_response(connection)
@@ -0,0 +1,121 @@
+"""Tests for the Hyperoptic async API client."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from hyperoptic.exceptions import AuthenticationError
+
+from custom_components.hyperoptic.api import (
+    API_BASE,
+    TOKEN_URL,
+    HyperopticApiClient,
+)
+
+TOKENS = {
+    "access_token": "access",
+    "refresh_token": "refresh",
+    "expires_in": 300,
+    "refresh_expires_in": 1800,
+}
+
+CUSTOMERS = {
+    "_embedded": {
+        "customers": [
+            {
+                "id": "customer-id",
+                "identifier": 123456,
+                "givenName": "Alice",
+                "familyName": "Smith",
+                "accounts": [],
+            }
+        ]
+    }
+}
+
+
+@pytest.mark.asyncio
+async def test_get_customer(hass: HomeAssistant, aioclient_mock):
+    """Test the client logs in once and parses the customer."""
+    aioclient_mock.post(TOKEN_URL, json=TOKENS)
+    aioclient_mock.get(f"{API_BASE}/customers", json=CUSTOMERS)
+
+    client = HyperopticApiClient(hass, "test@example.com", "password")
+
+    customer = await client.async_get_customer()
+    await client.async_get_customer()
+
+    assert customer.id == "customer-id"
+    assert customer.full_name == "Alice Smith"
+    assert aioclient_mock.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_invalid_credentials(hass: HomeAssistant, aioclient_mock):
+    """Test rejected credentials raise an authentication error."""
+    aioclient_mock.post(
+        TOKEN_URL,
+        status=401,
+        json={"error": "invalid_grant", "error_description": "Invalid user credentials"},
+    )
+
+    client = HyperopticApiClient(hass, "test@example.com", "wrongpassword")
+
+    with pytest.raises(AuthenticationError, match="401"):
+        await client.async_get_customer()
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_sync_client(hass: HomeAssistant, aioclient_mock):
+    """Test the sync client is used when the password grant is refused."""
+    aioclient_mock.post(TOKEN_URL, status=400, json={"error": "unauthorized_client"})
+
+    sync_client = MagicMock()
+    sync_client.get_raw = MagicMock(return_value=CUSTOMERS)
+
+    with patch(
+        "hyperoptic.HyperopticClient",
+        return_value=sync_client,
+    ):
+        client = HyperopticApiClient(hass, "test@example.com", "password")
+
+        customer = await client.async_get_customer()
+        await client.async_close()
+
+    assert customer.id == "customer-id"
+    sync_client.get_raw.assert_called_once_with("/customers")
+    sync_client.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_sync_client_calls_time_out(hass: HomeAssistant, aioclient_mock):
+    """Test a hung sync client call is abandoned on the client's executor."""
+    aioclient_mock.post(TOKEN_URL, status=400, json={"error": "unauthorized_client"})
+    release = threading.Event()
+    threads = []
+
+    def _get_raw(path):
+        threads.append(threading.current_thread().name)
+        release.wait(5)
+        return CUSTOMERS
+
+    sync_client = MagicMock()
+    sync_client.get_raw = MagicMock(side_effect=_get_raw)
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hyperoptic")
+
+    with (
+        patch("hyperoptic.HyperopticClient", return_value=sync_client),
+        patch("custom_components.hyperoptic.api.TIMEOUT_SECONDS", 0.05),
+    ):
+        client = HyperopticApiClient(hass, "test@example.com", "password", executor=executor)
+        with pytest.raises(TimeoutError):
+            await client.async_get_customer()
+
+        release.set()
+        await client.async_close()
+
+    executor.shutdown(wait=True)
+    assert threads[0].startswith("hyperoptic")
+    sync_client.close.assert_called_once()
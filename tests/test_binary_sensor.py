@@ -8,6 +8,7 @@ from homeassistant.core import HomeAssistant
 from custom_components.hyperoptic.binary_sensor import (
     BINARY_SENSOR_DESCRIPTIONS,
     HyperopticBinarySensorEntity,
+    build_values,
 )
 
 
@@ -16,6 +17,7 @@ async def test_binary_sensor_has_hyperhub(hass: HomeAssistant, mock_hyperoptic_c
     """Test has hyperhub binary sensor."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
 
     sensor = HyperopticBinarySensorEntity(
@@ -33,6 +35,7 @@ async def test_binary_sensor_is_installed(hass: HomeAssistant, mock_hyperoptic_c
     """Test connection installed binary sensor."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
     connection_id = mock_hyperoptic_client.test_connection_id
 
@@ -52,6 +55,7 @@ async def test_binary_sensor_can_renew(hass: HomeAssistant, mock_hyperoptic_clie
     """Test can renew binary sensor."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
     package_id = mock_hyperoptic_client.test_package_id
 
@@ -71,6 +75,7 @@ async def test_binary_sensor_unique_id(hass: HomeAssistant, mock_hyperoptic_clie
     """Test binary sensor unique ID is properly generated."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
 
     sensor = HyperopticBinarySensorEntity(
@@ -90,6 +95,7 @@ async def test_binary_sensor_unique_id_with_entity_id(
     """Test binary sensor unique ID with entity_id."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
     connection_id = mock_hyperoptic_client.test_connection_id
 
@@ -109,6 +115,7 @@ async def test_binary_sensor_no_coordinator_data(hass: HomeAssistant):
     """Test binary sensor handles no coordinator data."""
     coordinator = MagicMock()
     coordinator.data = None
+    coordinator.values = {}
 
     sensor = HyperopticBinarySensorEntity(
         coordinator=coordinator,
@@ -126,6 +133,7 @@ async def test_binary_sensor_missing_connection(hass: HomeAssistant, mock_hypero
     """Test binary sensor handles missing connection."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
 
     sensor = HyperopticBinarySensorEntity(
@@ -138,3 +146,28 @@ async def test_binary_sensor_missing_connection(hass: HomeAssistant, mock_hypero
 
     # Should return None if connection not found
     assert sensor.is_on is None
+
+
+@pytest.mark.asyncio
+async def test_binary_sensor_skips_unchanged_update(hass: HomeAssistant, mock_hyperoptic_client, mock_coordinator_data):
+    """Test binary sensor only writes state when its connection changed."""
+    coordinator = MagicMock()
+    coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
+    uprn = str(mock_hyperoptic_client.test_account_uprn)
+    connection_id = mock_hyperoptic_client.test_connection_id
+
+    sensor = HyperopticBinarySensorEntity(
+        coordinator=coordinator,
+        description=BINARY_SENSOR_DESCRIPTIONS["is_installed"],
+        uprn=uprn,
+        entity_type="connection",
+        entity_id=connection_id,
+    )
+    sensor.async_write_ha_state = MagicMock()
+
+    coordinator.data_changed.return_value = False
+    sensor._handle_coordinator_update()
+
+    sensor.async_write_ha_state.assert_not_called()
+    coordinator.data_changed.assert_called_with({("connection", connection_id)})
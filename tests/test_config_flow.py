@@ -1,14 +1,17 @@
 """Tests for Hyperoptic config flow."""
 
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
+import voluptuous as vol
 from homeassistant.config_entries import SOURCE_USER
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult, FlowResultType
+from hyperoptic.exceptions import APIError
 
 from custom_components.hyperoptic.config_flow import (
     HyperopticConfigFlow,
+    HyperopticOptionsFlow,
 )
 
 
@@ -25,7 +28,7 @@ async def test_config_flow_user_valid(hass: HomeAssistant, mock_hyperoptic_clien
     test_name = mock_hyperoptic_client.test_customer_name
     mock_customer = mock_hyperoptic_client.get_customer.return_value
 
-    def mock_validate(email, password):
+    def mock_validate(hass, email, password):
         """Mock validation function."""
         return {"title": f"Hyperoptic - {mock_customer.full_name}"}
 
@@ -94,6 +97,27 @@ async def test_config_flow_user_cannot_connect(hass: HomeAssistant):
         assert result["errors"] == {"base": "cannot_connect"}
 
 
+async def test_config_flow_server_error_with_401_in_url(hass: HomeAssistant):
+    """Test a server error is not reported as invalid credentials because of its URL."""
+    with patch(
+        "custom_components.hyperoptic.config_flow._validate_credentials",
+        side_effect=APIError(500, "Internal Server Error", "http://127.0.0.1:40169/account-service/customers"),
+    ):
+        flow = HyperopticConfigFlow()
+        flow.hass = hass
+        flow.context = {"source": SOURCE_USER, "unique_id": None}
+
+        result: FlowResult = await flow.async_step_user(
+            {
+                "email": "test@example.com",
+                "password": "password",
+            }
+        )
+
+        assert result["type"] == FlowResultType.FORM
+        assert result["errors"] == {"base": "cannot_connect"}
+
+
 async def test_config_flow_user_initial(hass: HomeAssistant):
     """Test config flow initial step."""
     flow = HyperopticConfigFlow()
@@ -104,3 +128,47 @@ async def test_config_flow_user_initial(hass: HomeAssistant):
 
     assert result["type"] == FlowResultType.FORM
     assert result["step_id"] == "user"
+
+
+async def test_options_flow(hass: HomeAssistant):
+    """Test the refresh interval bounds and the maximum staleness can be configured."""
+    entry = MagicMock()
+    entry.options = {}
+
+    flow = HyperopticOptionsFlow()
+    flow.hass = hass
+
+    with patch.object(HyperopticOptionsFlow, "config_entry", entry):
+        result: FlowResult = await flow.async_step_init()
+
+        assert result["type"] == FlowResultType.FORM
+        assert result["step_id"] == "init"
+
+        assert result["data_schema"]({})["max_staleness"] == 48
+
+        result = await flow.async_step_init({"min_update_interval": 48, "max_update_interval": 24, "max_staleness": 48})
+
+        assert result["type"] == FlowResultType.FORM
+        assert result["errors"] == {"base": "invalid_interval"}
+
+        result = await flow.async_step_init({"min_update_interval": 2, "max_update_interval": 72, "max_staleness": 12})
+
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        assert result["data"] == {"min_update_interval": 2, "max_update_interval": 72, "max_staleness": 12}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_staleness", [0, 721])
+async def test_options_flow_rejects_max_staleness_out_of_range(hass: HomeAssistant, max_staleness: int):
+    """Test the maximum staleness must be between 1 hour and 30 days."""
+    entry = MagicMock()
+    entry.options = {}
+
+    flow = HyperopticOptionsFlow()
+    flow.hass = hass
+
+    with patch.object(HyperopticOptionsFlow, "config_entry", entry):
+        result: FlowResult = await flow.async_step_init()
+
+    with pytest.raises(vol.Invalid):
+        result["data_schema"]({"min_update_interval": 2, "max_update_interval": 72, "max_staleness": max_staleness})
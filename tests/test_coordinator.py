@@ -1,15 +1,23 @@
 """Tests for Hyperoptic coordinator."""
 
-from unittest.mock import MagicMock, patch
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.update_coordinator import UpdateFailed
+from hyperoptic.exceptions import APIError
+from hyperoptic.models import Customer, Package
 
-from custom_components.hyperoptic.coordinator import (
-    HyperopticCoordinator,
-)
+from custom_components.hyperoptic.const import RETRY_ATTEMPTS, STORAGE_VERSION
+from custom_components.hyperoptic.coordinator import HyperopticCoordinator
+
+
+async def _async_refresh_all(coordinator: HyperopticCoordinator) -> None:
+    """Refresh every endpoint, whether due or not."""
+    coordinator.invalidate_endpoints()
+    await coordinator.async_refresh()
 
 
 @pytest.mark.asyncio
@@ -18,7 +26,7 @@ async def test_coordinator_update_data(hass: HomeAssistant, mock_hyperoptic_clie
     uprn_str = str(mock_hyperoptic_client.test_account_uprn)
 
     with patch(
-        "custom_components.hyperoptic.coordinator.HyperopticClient",
+        "custom_components.hyperoptic.coordinator.HyperopticApiClient",
         return_value=mock_hyperoptic_client,
     ):
         coordinator = HyperopticCoordinator(
@@ -30,22 +38,26 @@ async def test_coordinator_update_data(hass: HomeAssistant, mock_hyperoptic_clie
         data = await coordinator._async_update_data()
 
         assert data is not None
-        assert "customer" in data
+        assert "customer" not in data
         assert "accounts" in data
         assert uprn_str in data["accounts"]
         assert "account" in data["accounts"][uprn_str]
         assert "packages" in data["accounts"][uprn_str]
         assert "connections" in data["accounts"][uprn_str]
+        assert mock_hyperoptic_client.test_package_id in data["accounts"][uprn_str]["packages"]
+        assert mock_hyperoptic_client.test_connection_id in data["accounts"][uprn_str]["connections"]
+
+        await coordinator.async_shutdown()
 
 
 @pytest.mark.asyncio
 async def test_coordinator_update_data_auth_error(hass: HomeAssistant):
     """Test coordinator handles auth errors."""
-    mock_client = MagicMock()
-    mock_client.get_customer = MagicMock(side_effect=Exception("401 Unauthorized"))
+    mock_client = AsyncMock()
+    mock_client.async_get_customer_data = AsyncMock(side_effect=Exception("401 Unauthorized"))
 
     with patch(
-        "custom_components.hyperoptic.coordinator.HyperopticClient",
+        "custom_components.hyperoptic.coordinator.HyperopticApiClient",
         return_value=mock_client,
     ):
         coordinator = HyperopticCoordinator(
@@ -61,11 +73,33 @@ async def test_coordinator_update_data_auth_error(hass: HomeAssistant):
 @pytest.mark.asyncio
 async def test_coordinator_update_data_api_error(hass: HomeAssistant):
     """Test coordinator handles API errors."""
-    mock_client = MagicMock()
-    mock_client.get_customer = MagicMock(side_effect=Exception("API error"))
+    mock_client = AsyncMock()
+    mock_client.async_get_customer_data = AsyncMock(side_effect=Exception("API error"))
+
+    with patch(
+        "custom_components.hyperoptic.coordinator.HyperopticApiClient",
+        return_value=mock_client,
+    ):
+        coordinator = HyperopticCoordinator(
+            hass,
+            email="test@example.com",
+            password="password",
+        )
+
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_api_error_with_401_in_url(hass: HomeAssistant):
+    """Test a server error is not taken for rejected credentials because of its URL."""
+    mock_client = AsyncMock()
+    mock_client.async_get_customer_data = AsyncMock(
+        side_effect=APIError(500, "Internal Server Error", "http://127.0.0.1:40169/account-service/customers")
+    )
 
     with patch(
-        "custom_components.hyperoptic.coordinator.HyperopticClient",
+        "custom_components.hyperoptic.coordinator.HyperopticApiClient",
         return_value=mock_client,
     ):
         coordinator = HyperopticCoordinator(
@@ -89,3 +123,478 @@ async def test_coordinator_shutdown(hass: HomeAssistant):
 
     # Should complete without errors
     await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_reuses_client(hass: HomeAssistant, mock_hyperoptic_client):
+    """Test coordinator keeps one logged-in client across refreshes."""
+    with patch(
+        "custom_components.hyperoptic.coordinator.HyperopticApiClient",
+        return_value=mock_hyperoptic_client,
+    ) as mock_client_class:
+        coordinator = HyperopticCoordinator(
+            hass,
+            email="test@example.com",
+            password="password",
+        )
+
+        await coordinator._async_update_data()
+        await coordinator._async_update_data()
+
+        mock_client_class.assert_called_once()
+        mock_hyperoptic_client.async_close.assert_not_called()
+
+        await coordinator.async_shutdown()
+
+        mock_hyperoptic_client.async_close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_rebuilds_client_after_auth_error(hass: HomeAssistant, mock_hyperoptic_client):
+    """Test coordinator drops the client after an auth failure."""
+    failing_client = AsyncMock()
+    failing_client.async_get_customer_data = AsyncMock(side_effect=Exception("401 Unauthorized"))
+
+    with patch(
+        "custom_components.hyperoptic.coordinator.HyperopticApiClient",
+        side_effect=[failing_client, mock_hyperoptic_client],
+    ) as mock_client_class:
+        coordinator = HyperopticCoordinator(
+            hass,
+            email="test@example.com",
+            password="password",
+        )
+
+        with pytest.raises(ConfigEntryAuthFailed):
+            await coordinator._async_update_data()
+
+        failing_client.async_close.assert_called_once()
+
+        data = await coordinator._async_update_data()
+
+        assert data is not None
+        assert mock_client_class.call_count == 2
+
+        await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_keeps_client_after_api_error(hass: HomeAssistant):
+    """Test coordinator keeps the client after a transient error."""
+    mock_client = AsyncMock()
+    mock_client.async_get_customer_data = AsyncMock(side_effect=Exception("API error"))
+
+    with patch(
+        "custom_components.hyperoptic.coordinator.HyperopticApiClient",
+        return_value=mock_client,
+    ):
+        coordinator = HyperopticCoordinator(
+            hass,
+            email="test@example.com",
+            password="password",
+        )
+
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()
+
+        mock_client.async_close.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_records_phase_stats(hass: HomeAssistant, mock_hyperoptic_client):
+    """Test coordinator keeps per-phase timings, sizes and outcomes."""
+    mock_hyperoptic_client.async_get_connection.side_effect = Exception("Connection error")
+
+    with patch(
+        "custom_components.hyperoptic.coordinator.HyperopticApiClient",
+        return_value=mock_hyperoptic_client,
+    ):
+        coordinator = HyperopticCoordinator(
+            hass,
+            email="test@example.com",
+            password="password",
+        )
+
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()
+
+        phases = coordinator.stats.phases
+        assert set(phases) == {"auth", "fetch", "customer", "packages", "connections"}
+        assert phases["customer"].last_error is None
+        assert phases["packages"].last_error is None
+        assert phases["connections"].last_error == "Connection error"
+        assert phases["connections"].failures == RETRY_ATTEMPTS
+        assert coordinator.stats.consecutive_failures == 1
+        mock_hyperoptic_client.async_get_packages_data.assert_called_once_with(mock_hyperoptic_client.test_customer_id)
+
+        mock_hyperoptic_client.async_get_connection.side_effect = None
+        await coordinator._async_update_data()
+
+        assert coordinator.stats.consecutive_failures == 0
+        assert coordinator.stats.refresh.last_success is not None
+        assert phases["transform"].successes == 1
+        assert phases["packages"].last_bytes > 0
+        assert sum(phases["customer"].histogram().values()) == 2
+        assert coordinator.stats.api_latency is not None
+
+        await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_prices_each_package_once(hass: HomeAssistant, mock_hyperoptic_client):
+    """Test multi-premise customers are transformed in a single pass."""
+    accounts = mock_hyperoptic_client.async_get_customer_data.return_value["accounts"]
+    accounts.append({"id": "second-account", "uprn": 100023336957})
+    first_uprn, second_uprn = (account["uprn"] for account in accounts)
+
+    with (
+        patch(
+            "custom_components.hyperoptic.coordinator.HyperopticApiClient",
+            return_value=mock_hyperoptic_client,
+        ),
+        patch(
+            "custom_components.hyperoptic.coordinator.PricingTimelineCache.get",
+            return_value=None,
+        ) as mock_timeline,
+    ):
+        coordinator = HyperopticCoordinator(
+            hass,
+            email="test@example.com",
+            password="password",
+        )
+
+        data = await coordinator._async_update_data()
+        await coordinator.async_shutdown()
+
+    first = data["accounts"][str(first_uprn)]
+    second = data["accounts"][str(second_uprn)]
+
+    mock_timeline.assert_called_once()
+    assert first["packages"] is second["packages"]
+    assert mock_hyperoptic_client.test_connection_id in first["connections"]
+    assert second["connections"] == {}
+
+
+@pytest.mark.asyncio
+async def test_coordinator_local_update(hass: HomeAssistant, mock_hyperoptic_client):
+    """Test price tiers and countdowns are recomputed locally at midnight."""
+    uprn_str = str(mock_hyperoptic_client.test_account_uprn)
+    package_id = mock_hyperoptic_client.test_package_id
+
+    with (
+        patch(
+            "custom_components.hyperoptic.coordinator.HyperopticApiClient",
+            return_value=mock_hyperoptic_client,
+        ),
+        patch(
+            "custom_components.hyperoptic.coordinator.dt_util.now",
+            return_value=datetime(2026, 1, 1, 12, tzinfo=UTC),
+        ),
+    ):
+        coordinator = HyperopticCoordinator(
+            hass,
+            email="test@example.com",
+            password="password",
+        )
+        coordinator.data = await coordinator._async_update_data()
+
+    package = coordinator.data["accounts"][uprn_str]["packages"][package_id]
+
+    assert package.current_price_tier == "Active Tier: £16.0/month"
+    assert package.days_until_next_price_increase == 120
+    assert coordinator._unsub_local_update is not None
+
+    listener = MagicMock()
+    coordinator.async_add_listener(listener)
+
+    with patch(
+        "custom_components.hyperoptic.coordinator.dt_util.now",
+        return_value=datetime(2026, 6, 1, tzinfo=UTC),
+    ):
+        coordinator._async_handle_local_update(datetime(2026, 6, 1, tzinfo=UTC))
+
+    package = coordinator.data["accounts"][uprn_str]["packages"][package_id]
+    assert package.current_price_tier == "Active Tier: £19.0/month"
+    assert package.next_price_increase_date is None
+    assert package.days_until_next_price_increase is None
+    assert package.days_until_contract_end == 93
+    listener.assert_called_once()
+    mock_hyperoptic_client.async_get_customer_data.assert_awaited_once()
+
+    await coordinator.async_shutdown()
+
+    assert coordinator._unsub_local_update is None
+
+
+@pytest.mark.asyncio
+async def test_coordinator_restores_stored_data(hass: HomeAssistant, hass_storage):
+    """Test the last stored payload is rebuilt without calling the API."""
+    entry = MagicMock()
+    entry.entry_id = "test_entry"
+    entry.options = {}
+
+    hass_storage["hyperoptic.test_entry"] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": "hyperoptic.test_entry",
+        "data": {
+            "parts": {
+                "customer": {
+                    "id": "customer-id",
+                    "accounts": {
+                        "100023336956": {
+                            "uprn": 100023336956,
+                            "order_status": "ACTIVE",
+                            "have_hyperhub": None,
+                            "connection_id": "connection-id",
+                        }
+                    },
+                },
+                "packages": [
+                    {
+                        "id": "package-id",
+                        "bundle_name": None,
+                        "download_speed": 1000,
+                        "upload_speed": 1000,
+                        "current_price": None,
+                        "end_date": "2026-09-02",
+                        "can_renew": False,
+                        "pricing": [[None, None, "63.0"]],
+                    }
+                ],
+                "connections": [{"id": "connection-id", "premise_uprn": 100023336956, "is_installed": True}],
+            },
+            "digests": {"customer": "c", "packages": "p", "connections": "n"},
+            "fetched_at": {"customer": "2026-01-01T00:00:00+00:00"},
+            "stale_since": {},
+        },
+    }
+
+    with patch("custom_components.hyperoptic.coordinator.HyperopticApiClient") as mock_client_class:
+
+        coordinator = HyperopticCoordinator(
+            hass,
+            email="test@example.com",
+            password="password",
+            config_entry=entry,
+        )
+
+        assert await coordinator.async_restore_data() is True
+
+        account_data = coordinator.data["accounts"]["100023336956"]
+        assert account_data["account"].order_status == "ACTIVE"
+        assert account_data["packages"]["package-id"].download_speed == 1000
+        assert account_data["packages"]["package-id"].current_price_tier == "Default Price: £63.0/month"
+        assert account_data["connections"]["connection-id"].is_installed is True
+        assert coordinator.payload_digests == {"customer": "c", "packages": "p", "connections": "n"}
+        assert coordinator.fetched_at == {"customer": datetime(2026, 1, 1, tzinfo=UTC)}
+        mock_client_class.assert_not_called()
+
+        await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_discards_stored_raw_responses(hass: HomeAssistant, hass_storage):
+    """Test raw responses stored by the first storage version are not restored."""
+    entry = MagicMock()
+    entry.entry_id = "test_entry"
+    entry.options = {}
+
+    hass_storage["hyperoptic.test_entry"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": "hyperoptic.test_entry",
+        "data": {
+            "customer": {"id": "customer-id", "identifier": 123456, "givenName": "Alice", "accounts": []},
+            "packages": [],
+            "connections": [],
+        },
+    }
+
+    coordinator = HyperopticCoordinator(hass, email="test@example.com", password="password", config_entry=entry)
+
+    assert await coordinator.async_restore_data() is False
+    assert coordinator.data is None
+
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_restore_without_stored_data(hass: HomeAssistant, hass_storage):
+    """Test restore reports when there is nothing to serve."""
+    entry = MagicMock()
+    entry.entry_id = "test_entry"
+    entry.options = {}
+
+    coordinator = HyperopticCoordinator(
+        hass,
+        email="test@example.com",
+        password="password",
+        config_entry=entry,
+    )
+
+    assert await coordinator.async_restore_data() is False
+    assert coordinator.data is None
+
+
+@pytest.mark.asyncio
+async def test_coordinator_tracks_changed_scopes(hass: HomeAssistant, mock_hyperoptic_client):
+    """Test only objects whose visible fields changed are reported."""
+    uprn_str = str(mock_hyperoptic_client.test_account_uprn)
+    package_id = mock_hyperoptic_client.test_package_id
+    connection_id = mock_hyperoptic_client.test_connection_id
+
+    with patch(
+        "custom_components.hyperoptic.coordinator.HyperopticApiClient",
+        return_value=mock_hyperoptic_client,
+    ):
+        coordinator = HyperopticCoordinator(
+            hass,
+            email="test@example.com",
+            password="password",
+        )
+
+        coordinator.data = await coordinator._async_update_data()
+        assert coordinator.changed_scopes is None
+
+        await _async_refresh_all(coordinator)
+        assert coordinator.changed_scopes == set()
+        assert not coordinator.data_changed({("package", package_id)})
+
+        mock_hyperoptic_client.async_get_connection.return_value = {
+            "id": connection_id,
+            "isInstalled": False,
+            "premiseUprn": mock_hyperoptic_client.test_account_uprn,
+        }
+        await _async_refresh_all(coordinator)
+
+        assert coordinator.changed_scopes == {("connection", connection_id)}
+        assert coordinator.data_changed({("connection", connection_id)})
+        assert not coordinator.data_changed({("account", uprn_str)})
+
+        await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_reuses_unchanged_snapshot(hass: HomeAssistant, mock_hyperoptic_client):
+    """Test identical responses keep the snapshot and skip the listeners."""
+    with patch(
+        "custom_components.hyperoptic.coordinator.HyperopticApiClient",
+        return_value=mock_hyperoptic_client,
+    ):
+        coordinator = HyperopticCoordinator(
+            hass,
+            email="test@example.com",
+            password="password",
+        )
+        listener = MagicMock()
+        coordinator.async_add_listener(listener)
+
+        await _async_refresh_all(coordinator)
+        snapshot = coordinator.data
+        assert set(coordinator.payload_digests) == {"customer", "packages", "connections"}
+
+        with (
+            patch.object(Customer, "model_validate") as customer_validate,
+            patch.object(Package, "model_validate") as package_validate,
+        ):
+            await _async_refresh_all(coordinator)
+
+        # Unchanged responses are recognized before any model is validated
+        customer_validate.assert_not_called()
+        package_validate.assert_not_called()
+        assert coordinator.data is snapshot
+        assert coordinator.changed_scopes == set()
+        listener.assert_called_once()
+
+        mock_hyperoptic_client.async_get_connection.return_value = {
+            "id": mock_hyperoptic_client.test_connection_id,
+            "isInstalled": False,
+            "premiseUprn": mock_hyperoptic_client.test_account_uprn,
+        }
+        await _async_refresh_all(coordinator)
+
+        assert coordinator.data is not snapshot
+        assert listener.call_count == 2
+
+        await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_materializes_values(hass: HomeAssistant, mock_hyperoptic_client):
+    """Test registered platforms get a value table rebuilt with each payload."""
+    with patch(
+        "custom_components.hyperoptic.coordinator.HyperopticApiClient",
+        return_value=mock_hyperoptic_client,
+    ):
+        coordinator = HyperopticCoordinator(
+            hass,
+            email="test@example.com",
+            password="password",
+        )
+        await _async_refresh_all(coordinator)
+
+        connection_id = mock_hyperoptic_client.test_connection_id
+        remove = coordinator.async_add_value_builder(
+            lambda data: {
+                conn_id: conn.is_installed
+                for account_data in data["accounts"].values()
+                for conn_id, conn in account_data["connections"].items()
+            }
+        )
+        assert coordinator.values == {connection_id: True}
+
+        mock_hyperoptic_client.async_get_connection.return_value = {
+            "id": connection_id,
+            "isInstalled": False,
+            "premiseUprn": mock_hyperoptic_client.test_account_uprn,
+        }
+        await _async_refresh_all(coordinator)
+        assert coordinator.values == {connection_id: False}
+
+        remove()
+        coordinator.data = None
+        await _async_refresh_all(coordinator)
+        assert coordinator.values == {}
+
+        await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_adapts_update_interval(hass: HomeAssistant, mock_hyperoptic_client):
+    """Test the refresh interval follows the account lifecycle."""
+    mock_hyperoptic_client.async_get_connection.return_value = {
+        "id": mock_hyperoptic_client.test_connection_id,
+        "isInstalled": False,
+        "premiseUprn": mock_hyperoptic_client.test_account_uprn,
+    }
+    entry = MagicMock()
+    entry.entry_id = "test_entry"
+    entry.options = {"min_update_interval": 2, "max_update_interval": 72}
+
+    with patch(
+        "custom_components.hyperoptic.coordinator.HyperopticApiClient",
+        return_value=mock_hyperoptic_client,
+    ):
+        coordinator = HyperopticCoordinator(
+            hass,
+            email="test@example.com",
+            password="password",
+            config_entry=entry,
+        )
+        coordinator.data = await coordinator._async_update_data()
+
+        assert coordinator.scheduler.decision.reason == "install_pending"
+        assert coordinator.update_interval == timedelta(hours=2)
+
+        mock_hyperoptic_client.async_get_customer_data.side_effect = Exception("API error")
+        mock_hyperoptic_client.async_get_packages_data.side_effect = Exception("API error")
+        mock_hyperoptic_client.async_get_connection.side_effect = Exception("API error")
+        coordinator.invalidate_endpoints()
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_update_data()
+
+        assert coordinator.scheduler.decision.reason == "failure"
+        assert coordinator.update_interval <= timedelta(days=1)
+
+        await coordinator.async_shutdown()
@@ -0,0 +1,84 @@
+"""Tests for Hyperoptic diagnostics."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.core import HomeAssistant
+
+from custom_components.hyperoptic.const import DOMAIN
+from custom_components.hyperoptic.coordinator import HyperopticCoordinator
+from custom_components.hyperoptic.diagnostics import async_get_config_entry_diagnostics
+
+
+@pytest.fixture
+async def coordinator(hass: HomeAssistant, mock_hyperoptic_client):
+    """Return a refreshed coordinator registered for a config entry."""
+    with patch(
+        "custom_components.hyperoptic.coordinator.HyperopticApiClient",
+        return_value=mock_hyperoptic_client,
+    ):
+        coordinator = HyperopticCoordinator(hass, email="test@example.com", password="password")
+        await coordinator.async_refresh()
+        hass.data.setdefault(DOMAIN, {})["test_entry"] = {"coordinator": coordinator}
+        yield coordinator
+        await coordinator.async_shutdown()
+
+
+@pytest.fixture
+def entry():
+    """Return a config entry."""
+    entry = MagicMock()
+    entry.entry_id = "test_entry"
+    entry.as_dict.return_value = {
+        "entry_id": "test_entry",
+        "title": "test@example.com",
+        "unique_id": "test@example.com",
+        "data": {"email": "test@example.com", "password": "password"},
+    }
+    return entry
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_redacts_identifiers(hass: HomeAssistant, coordinator, entry, mock_hyperoptic_client):
+    """Test credentials, UPRNs and account keys are not exposed."""
+    registry_entries = [MagicMock(domain="sensor"), MagicMock(domain="sensor"), MagicMock(domain="binary_sensor")]
+    with patch(
+        "custom_components.hyperoptic.diagnostics.er.async_entries_for_config_entry",
+        return_value=registry_entries,
+    ):
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"] == {"email": REDACTED, "password": REDACTED}
+    assert diagnostics["entry"]["title"] == REDACTED
+    assert str(mock_hyperoptic_client.test_account_uprn) not in str(diagnostics)
+
+    account = diagnostics["snapshot"]["accounts"][0]
+    assert account["label"] == "account_0"
+    assert account["account"]["uprn"] == REDACTED
+    assert account["connections"][0]["premise_uprn"] == REDACTED
+    assert diagnostics["snapshot"]["packages"][0]["id"] == mock_hyperoptic_client.test_package_id
+    assert "pricing_timeline" not in diagnostics["snapshot"]["packages"][0]
+
+    assert diagnostics["entity_counts"] == {"sensor": 2, "binary_sensor": 1}
+    assert diagnostics["stats"]["refresh"]["successes"] == 1
+    assert diagnostics["stats"]["snapshot_misses"] == 1
+    assert diagnostics["scheduler"]["reason"] == coordinator.scheduler.decision.reason
+    assert diagnostics["endpoints"]["packages"]["circuit"] == "closed"
+    assert diagnostics["endpoints"]["packages"]["stale"] is False
+    assert set(diagnostics["payload_digests"]) == {"customer", "packages", "connections"}
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_snapshot_is_bounded(hass: HomeAssistant, coordinator, entry):
+    """Test the snapshot stops at the configured limits and reports the rest."""
+    with (
+        patch("custom_components.hyperoptic.diagnostics.DIAGNOSTICS_MAX_ACCOUNTS", 0),
+        patch("custom_components.hyperoptic.diagnostics.DIAGNOSTICS_MAX_PACKAGES", 0),
+    ):
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["snapshot"]["accounts"] == []
+    assert diagnostics["snapshot"]["accounts_omitted"] == 1
+    assert diagnostics["snapshot"]["packages"] == []
+    assert diagnostics["snapshot"]["packages_omitted"] == 1
@@ -0,0 +1,570 @@
+"""End-to-end tests of the coordinator and API client against a fake server."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+from hyperoptic.exceptions import APIError
+
+from custom_components.hyperoptic import sensor
+from custom_components.hyperoptic.api import HyperopticApiClient
+from custom_components.hyperoptic.const import BREAKER_FAILURE_THRESHOLD, RETRY_ATTEMPTS
+from custom_components.hyperoptic.config_flow import _validate_credentials
+from custom_components.hyperoptic.coordinator import HyperopticCoordinator
+from custom_components.hyperoptic.governor import async_get_governor
+
+from .fake_hyperoptic import FakeHyperopticServer, generate_dataset
+
+TOKEN = "/realms/hyperoptic/protocol/openid-connect/token"
+CUSTOMERS = "/account-service/customers"
+PACKAGES = "/account-service/customers/{customer_id}/packages"
+CONNECTION = "/account-service/connections/{connection_id}"
+
+
+async def _async_refresh_all(coordinator: HyperopticCoordinator) -> None:
+    """Refresh every endpoint, whether due or not."""
+    coordinator.invalidate_endpoints()
+    await coordinator.async_refresh()
+
+
+def _coordinator(hass: HomeAssistant, password: str = "password") -> HyperopticCoordinator:
+    """Return a coordinator using the real API client."""
+    return HyperopticCoordinator(hass, email="test@example.com", password=password)
+
+
+@pytest.mark.asyncio
+async def test_refresh_against_fake_server(hass: HomeAssistant):
+    """Test a full refresh logs in once and calls every endpoint."""
+    async with FakeHyperopticServer(generate_dataset(accounts=3, packages=2)) as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            await _async_refresh_all(coordinator)
+
+            assert coordinator.last_update_success
+            assert len(coordinator.data["accounts"]) == 3
+            assert server.requests[TOKEN] == 1
+            assert server.requests["/account-service/customers"] == 1
+            assert server.requests["/account-service/customers/{customer_id}/packages"] == 1
+            assert server.requests[CONNECTION] == 3
+
+            await _async_refresh_all(coordinator)
+            assert server.requests[TOKEN] == 1
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_fetches_due_endpoints(hass: HomeAssistant):
+    """Test a refresh requested through Home Assistant skips endpoints that are not due."""
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            await coordinator.async_refresh()
+            requests = server.requests.copy()
+
+            await coordinator.async_refresh()
+
+            assert coordinator.last_update_success
+            assert server.requests == requests
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_reauthenticates_after_revoked_tokens(hass: HomeAssistant):
+    """Test revoked tokens are replaced by logging in again."""
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            await _async_refresh_all(coordinator)
+            server.revoke_tokens()
+
+            await _async_refresh_all(coordinator)
+
+            assert coordinator.last_update_success
+            assert server.requests[TOKEN] == 2
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_invalid_password_against_fake_server(hass: HomeAssistant):
+    """Test rejected credentials surface as an auth failure."""
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass, password="wrong")
+
+            with pytest.raises(ConfigEntryAuthFailed):
+                await coordinator._async_update_data()
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_server_errors_against_fake_server(hass: HomeAssistant):
+    """Test failing endpoints surface as an update failure."""
+    async with FakeHyperopticServer(error_rate=1.0) as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+
+            with pytest.raises(UpdateFailed, match="500"):
+                await coordinator._async_update_data()
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_slow_refresh_stops_at_budget(hass: HomeAssistant):
+    """Test a refresh slower than its budget fails instead of hanging."""
+    async with FakeHyperopticServer(latency=5) as server:
+        with (
+            server.patch_client(),
+            patch("custom_components.hyperoptic.coordinator.REFRESH_TIMEOUT_SECONDS", 0.1),
+        ):
+            coordinator = _coordinator(hass)
+
+            with pytest.raises(UpdateFailed, match="longer than 0.1s"):
+                await coordinator._async_update_data()
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_cancels_refresh_in_flight(hass: HomeAssistant):
+    """Test shutting down cancels a refresh waiting on the API."""
+    async with FakeHyperopticServer(latency=5) as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            refresh = asyncio.ensure_future(coordinator._async_update_data())
+            await asyncio.sleep(0.05)
+
+            await coordinator.async_shutdown()
+
+            with pytest.raises(UpdateFailed, match="cancelled by shutdown"):
+                await asyncio.wait_for(refresh, 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_endpoint_keeps_last_good_data(hass: HomeAssistant):
+    """Test a failing endpoint is retried, then served from its last response."""
+    async with FakeHyperopticServer(generate_dataset(accounts=2)) as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            await _async_refresh_all(coordinator)
+            packages = coordinator.data["accounts"]["100000000000"]["packages"]
+            fetched_at = coordinator.fetched_at["packages"]
+
+            server.failing.add(PACKAGES)
+            server.dataset.connections["connection-0"]["isInstalled"] = False
+            await _async_refresh_all(coordinator)
+
+            assert coordinator.last_update_success
+            assert coordinator.stale_endpoints == {"packages"}
+            assert coordinator.fetched_at["packages"] == fetched_at
+            assert server.requests[PACKAGES] == 1 + RETRY_ATTEMPTS
+            account_data = coordinator.data["accounts"]["100000000000"]
+            assert account_data["packages"] == packages
+            assert account_data["connections"]["connection-0"].is_installed is False
+
+            server.failing.clear()
+            await _async_refresh_all(coordinator)
+            assert coordinator.stale_endpoints == set()
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_connection_retried_alone(hass: HomeAssistant):
+    """Test a failing connection is retried without fetching the others again."""
+    failures = {"connection-1"}
+    get_connection = HyperopticApiClient.async_get_connection
+
+    async def _async_flaky_connection(client: HyperopticApiClient, conn_id: str) -> dict:
+        if conn_id in failures:
+            failures.discard(conn_id)
+            raise APIError(500, "Internal Server Error")
+        return await get_connection(client, conn_id)
+
+    async with FakeHyperopticServer(generate_dataset(accounts=3)) as server:
+        with (
+            server.patch_client(),
+            patch.object(HyperopticApiClient, "async_get_connection", _async_flaky_connection),
+        ):
+            coordinator = _coordinator(hass)
+            await _async_refresh_all(coordinator)
+
+            assert coordinator.last_update_success
+            assert server.requests[CONNECTION] == 3
+            assert coordinator.stats.phase("connections").failures == 1
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_outage_serves_stale_data_until_max_staleness(hass: HomeAssistant):
+    """Test entities keep their last good data through an outage, flagged as stale."""
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            await _async_refresh_all(coordinator)
+            coordinator.async_add_value_builder(sensor.build_values)
+            entity = sensor.HyperopticSensorEntity(
+                coordinator, sensor.SENSOR_DESCRIPTIONS["bundle_name"], "100000000000", "package-0"
+            )
+            assert entity.available
+            assert entity.extra_state_attributes == {"data_age": None, "stale": False}
+
+            server.failing.update({CUSTOMERS, PACKAGES, CONNECTION})
+            await _async_refresh_all(coordinator)
+
+            assert not coordinator.last_update_success
+            assert coordinator.stale_endpoints == {"customer", "packages", "connections"}
+            assert entity.available
+            assert entity.native_value == "1Gb Fibre Connection - Broadband"
+            assert entity.extra_state_attributes["stale"]
+            assert entity.extra_state_attributes["data_age"] >= 0
+            # Entities are written again when the data becomes too old
+            assert coordinator._unsub_stale_expiry is not None
+
+            later = dt_util.utcnow() + coordinator.max_staleness + timedelta(minutes=1)
+            with patch.object(dt_util, "utcnow", return_value=later):
+                assert not entity.available
+
+            server.failing.clear()
+            await _async_refresh_all(coordinator)
+            assert entity.available
+            assert entity.extra_state_attributes == {"data_age": None, "stale": False}
+            assert coordinator._unsub_stale_expiry is None
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_outage_staleness_counts_from_first_failure(hass: HomeAssistant):
+    """Test data fetched days ago stays available for max_staleness once the API fails."""
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            await _async_refresh_all(coordinator)
+            coordinator.async_add_value_builder(sensor.build_values)
+            entity = sensor.HyperopticSensorEntity(
+                coordinator, sensor.SENSOR_DESCRIPTIONS["bundle_name"], "100000000000", "package-0"
+            )
+            # A slow cadence leaves the data older than max_staleness when it is due
+            coordinator.fetched_at = {
+                endpoint: fetched_at - timedelta(days=7) for endpoint, fetched_at in coordinator.fetched_at.items()
+            }
+
+            server.failing.update({CUSTOMERS, PACKAGES, CONNECTION})
+            await _async_refresh_all(coordinator)
+            failed_at = dt_util.utcnow()
+
+            assert entity.available
+            assert entity.extra_state_attributes["data_age"] >= timedelta(days=7).total_seconds()
+
+            await _async_refresh_all(coordinator)
+            within = failed_at + coordinator.max_staleness - timedelta(minutes=1)
+            with patch.object(dt_util, "utcnow", return_value=within):
+                assert entity.available
+            with patch.object(dt_util, "utcnow", return_value=within + timedelta(minutes=2)):
+                assert not entity.available
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_reloaded_entry_serves_stale_data_until_max_staleness(hass: HomeAssistant):
+    """Test an entry reloaded from a handoff marks failed endpoints stale instead of failing."""
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            await _async_refresh_all(coordinator)
+            handoff = coordinator.async_handoff_state()
+            await coordinator.async_shutdown()
+
+            reloaded = _coordinator(hass)
+            assert await reloaded.async_restore_data(handoff)
+            assert reloaded.data == coordinator.data
+            assert reloaded.fetched_at == coordinator.fetched_at
+            reloaded.async_add_value_builder(sensor.build_values)
+            entity = sensor.HyperopticSensorEntity(
+                reloaded, sensor.SENSOR_DESCRIPTIONS["bundle_name"], "100000000000", "package-0"
+            )
+
+            server.failing.update({CUSTOMERS, PACKAGES, CONNECTION})
+            await _async_refresh_all(reloaded)
+            failed_at = dt_util.utcnow()
+
+            assert reloaded.stale_endpoints == {"customer", "packages", "connections"}
+            assert reloaded.stale_since.keys() == reloaded.stale_endpoints
+            assert entity.available
+            assert entity.native_value == "1Gb Fibre Connection - Broadband"
+
+            # A second reload keeps counting staleness from the first failure
+            handoff = reloaded.async_handoff_state()
+            await reloaded.async_shutdown()
+            reloaded = _coordinator(hass)
+            assert await reloaded.async_restore_data(handoff)
+            reloaded.async_add_value_builder(sensor.build_values)
+            entity = sensor.HyperopticSensorEntity(
+                reloaded, sensor.SENSOR_DESCRIPTIONS["bundle_name"], "100000000000", "package-0"
+            )
+            assert reloaded.stale_endpoints == {"customer", "packages", "connections"}
+            assert reloaded._unsub_stale_expiry is not None
+
+            within = failed_at + reloaded.max_staleness - timedelta(minutes=1)
+            with patch.object(dt_util, "utcnow", return_value=within):
+                assert entity.available
+            with patch.object(dt_util, "utcnow", return_value=within + timedelta(minutes=2)):
+                assert not entity.available
+
+            await reloaded.async_shutdown()
+
+
+def _record_writes(coordinator: HyperopticCoordinator, entity: sensor.HyperopticSensorEntity) -> list[dict]:
+    """Subscribe an entity to its coordinator and return the attributes it writes."""
+    written: list[dict] = []
+    entity.async_write_ha_state = MagicMock(side_effect=lambda: written.append(entity.extra_state_attributes))
+    coordinator.async_add_listener(entity._handle_coordinator_update)
+    return written
+
+
+@pytest.mark.asyncio
+async def test_stale_state_written_when_data_unchanged(hass: HomeAssistant):
+    """Test entities write their stale attribute when only the stale endpoints change."""
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            await _async_refresh_all(coordinator)
+            coordinator.async_add_value_builder(sensor.build_values)
+            entity = sensor.HyperopticSensorEntity(
+                coordinator, sensor.SENSOR_DESCRIPTIONS["bundle_name"], "100000000000", "package-0"
+            )
+            written = _record_writes(coordinator, entity)
+
+            server.failing.add(PACKAGES)
+            await _async_refresh_all(coordinator)
+            assert coordinator.last_update_success
+            assert written[-1]["stale"]
+
+            server.failing.clear()
+            await _async_refresh_all(coordinator)
+            assert written[-1] == {"data_age": None, "stale": False}
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_stale_state_written_while_failing(hass: HomeAssistant):
+    """Test entities write their stale attribute when more endpoints go stale during an outage."""
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            await _async_refresh_all(coordinator)
+            coordinator.async_add_value_builder(sensor.build_values)
+            entity = sensor.HyperopticSensorEntity(
+                coordinator, sensor.SENSOR_DESCRIPTIONS["order_status"], "100000000000", "package-0"
+            )
+            written = _record_writes(coordinator, entity)
+            server.failing.update({CUSTOMERS, PACKAGES, CONNECTION})
+
+            coordinator.invalidate_endpoints({"packages"})
+            await coordinator.async_refresh()
+            assert not coordinator.last_update_success
+            assert written[-1]["stale"]
+
+            written.clear()
+            coordinator.invalidate_endpoints({"customer"})
+            await coordinator.async_refresh()
+            assert coordinator.stale_endpoints == {"customer", "packages"}
+            assert len(written) == 1
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_partial_refresh_keeps_stored_snapshots(hass: HomeAssistant, hass_storage):
+    """Test a refresh of one endpoint stores it along with the snapshots of the other endpoints."""
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            entry = MagicMock(entry_id="entry-1", options={})
+            coordinator = HyperopticCoordinator(hass, email="test@example.com", password="password", config_entry=entry)
+            await _async_refresh_all(coordinator)
+            await hass.async_block_till_done()
+
+            server.dataset.packages[0]["bundleName"] = "3Gb Fibre Connection - Broadband"
+            coordinator.invalidate_endpoints({"packages"})
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+            await coordinator.async_shutdown()
+
+            stored = hass_storage["hyperoptic.entry-1"]["data"]
+            assert stored.keys() == {"parts", "digests", "fetched_at", "stale_since"}
+            assert stored["parts"]["packages"][0]["bundle_name"] == "3Gb Fibre Connection - Broadband"
+            # Only the snapshot fields are stored, not the raw responses
+            assert stored["parts"]["customer"] == {
+                "id": "customer-id",
+                "accounts": {
+                    str(account["uprn"]): {
+                        "uprn": account["uprn"],
+                        "order_status": account["orderStatus"],
+                        "have_hyperhub": account["haveHyperhub"],
+                        "connection_id": account["_links"]["connection"]["href"].rsplit("/", 1)[-1],
+                    }
+                    for account in server.dataset.customer["accounts"]
+                },
+            }
+
+            restored = HyperopticCoordinator(hass, email="test@example.com", password="password", config_entry=entry)
+            assert await restored.async_restore_data()
+            assert restored.data == coordinator.data
+            assert restored.payload_digests == coordinator.payload_digests
+
+
+@pytest.mark.asyncio
+async def test_failed_customer_reuses_last_customer(hass: HomeAssistant):
+    """Test the other endpoints are still fetched when the customer call fails."""
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            await _async_refresh_all(coordinator)
+
+            server.failing.add(CUSTOMERS)
+            await _async_refresh_all(coordinator)
+
+            assert coordinator.last_update_success
+            assert coordinator.stale_endpoints == {"customer"}
+            assert server.requests[PACKAGES] == 2
+            assert server.requests[CONNECTION] == 2
+
+            server.failing.update({PACKAGES, CONNECTION})
+            await _async_refresh_all(coordinator)
+            assert not coordinator.last_update_success
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_stops_calling_failing_endpoint(hass: HomeAssistant):
+    """Test an endpoint is no longer called once its circuit opens."""
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            await _async_refresh_all(coordinator)
+            server.failing.add(PACKAGES)
+
+            for _ in range(3):
+                await _async_refresh_all(coordinator)
+
+            assert coordinator.last_update_success
+            assert coordinator.breakers["packages"].state == "open"
+            assert server.requests[PACKAGES] == 1 + BREAKER_FAILURE_THRESHOLD
+            assert coordinator.breakers["customer"].state == "closed"
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_half_open_circuit_sends_one_trial_call(hass: HomeAssistant):
+    """Test concurrent calls to a half-open endpoint send a single trial call."""
+    async with FakeHyperopticServer(generate_dataset(accounts=3)) as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            await _async_refresh_all(coordinator)
+            breaker = coordinator.breakers["connections"]
+            for _ in range(BREAKER_FAILURE_THRESHOLD):
+                breaker.record_failure()
+            breaker.reset_timeout = 0
+            assert breaker.state == "half_open"
+
+            await _async_refresh_all(coordinator)
+
+            assert server.requests[CONNECTION] == 3 + 1
+            assert breaker.state == "closed"
+            assert coordinator.stale_endpoints == {"connections"}
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_scheduled_refresh_fetches_due_endpoints(hass: HomeAssistant):
+    """Test scheduled refreshes only fetch the endpoints whose cadence elapsed."""
+    dataset = generate_dataset(accounts=2)
+    dataset.connections["connection-0"]["isInstalled"] = False
+    async with FakeHyperopticServer(dataset) as server:
+        with server.patch_client():
+            coordinator = _coordinator(hass)
+            await _async_refresh_all(coordinator)
+            assert coordinator.scheduler.decision.reason == "install_pending"
+
+            data = await coordinator._async_update_data()
+            assert data is coordinator.data
+            assert server.requests[CUSTOMERS] == 1
+            assert timedelta(0) < coordinator.update_interval <= timedelta(hours=1)
+
+            server.dataset.connections["connection-0"]["isInstalled"] = True
+            with patch.object(dt_util, "utcnow", return_value=dt_util.utcnow() + timedelta(hours=2)):
+                coordinator.data = await coordinator._async_update_data()
+
+            assert server.requests[CUSTOMERS] == 2
+            assert server.requests[CONNECTION] == 4
+            assert server.requests[PACKAGES] == 1
+            assert coordinator.data["accounts"]["100000000000"]["connections"]["connection-0"].is_installed
+            assert coordinator.changed_scopes == {("connection", "connection-0")}
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_entries_sharing_a_login_share_calls(hass: HomeAssistant):
+    """Test entries with the same credentials refreshing together make each call once."""
+    async with FakeHyperopticServer(generate_dataset(accounts=2), latency=0.05) as server:
+        with server.patch_client():
+            governor = async_get_governor(hass)
+            coordinators = [
+                HyperopticCoordinator(
+                    hass,
+                    email="test@example.com",
+                    password="password",
+                    config_entry=MagicMock(entry_id=entry_id, options={}),
+                    governor=governor,
+                )
+                for entry_id in ("entry-1", "entry-2")
+            ]
+
+            await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+
+            assert all(coordinator.last_update_success for coordinator in coordinators)
+            assert coordinators[0].data == coordinators[1].data
+            assert server.requests[TOKEN] == 1
+            assert server.requests[CUSTOMERS] == 1
+            assert server.requests[PACKAGES] == 1
+            assert server.requests[CONNECTION] == 2
+
+            for coordinator in coordinators:
+                await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_first_refresh_reuses_config_flow_login(hass: HomeAssistant):
+    """Test a new entry adopts the login and customer of its config flow."""
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            info = await _validate_credentials(hass, "test@example.com", "password")
+            assert info["title"].startswith("Hyperoptic")
+
+            governor = async_get_governor(hass)
+            coordinator = HyperopticCoordinator(hass, email="test@example.com", password="password", governor=governor)
+            await coordinator.async_config_entry_first_refresh()
+
+            assert coordinator.last_update_success
+            assert server.requests[TOKEN] == 1
+            assert server.requests[CUSTOMERS] == 1
+            assert server.requests[PACKAGES] == 1
+
+            await coordinator.async_shutdown()
@@ -0,0 +1,189 @@
+"""Tests for the shared Hyperoptic request governor."""
+
+import asyncio
+import random
+import time
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.hyperoptic.api import TokenBucket
+from custom_components.hyperoptic.const import EXECUTOR_MAX_WORKERS, STARTUP_STAGGER_SECONDS
+from custom_components.hyperoptic.governor import HyperopticGovernor, async_get_governor
+
+
+@pytest.mark.asyncio
+async def test_clients_shared_per_credentials(hass):
+    """Test entries with the same credentials share one client."""
+    governor = async_get_governor(hass)
+    assert async_get_governor(hass) is governor
+
+    with patch("custom_components.hyperoptic.governor.HyperopticApiClient") as mock_client_class:
+        mock_client_class.side_effect = lambda *args, **kwargs: AsyncMock()
+        first = governor.get_client("test@example.com", "secret", "entry-1")
+        second = governor.get_client("Test@Example.com", "secret", "entry-2")
+        other = governor.get_client("other@example.com", "secret", "entry-3")
+
+    assert first is second
+    assert other is not first
+    assert mock_client_class.call_args.kwargs["rate_limiter"] is governor.rate_limiter
+
+    await governor.async_release_client("test@example.com", "secret", "entry-1")
+    first.async_close.assert_not_called()
+    await governor.async_release_client("test@example.com", "secret", "entry-2")
+    first.async_close.assert_awaited_once()
+
+
+def test_startup_delay(hass):
+    """Test background refreshes are staggered by registration order."""
+    governor = HyperopticGovernor(hass)
+    governor.register("entry-1")
+    governor.register("entry-2")
+
+    assert governor.startup_delay("entry-1") == 0
+    assert governor.startup_delay("entry-2") == STARTUP_STAGGER_SECONDS
+
+    governor.unregister("entry-1")
+    assert governor.startup_delay("entry-2") == 0
+    assert governor.startup_delay("unknown") == 0
+
+
+def test_align_interval_spreads_entries(hass):
+    """Test jittered refreshes keep landing around distinct, fixed slots."""
+    governor = HyperopticGovernor(hass)
+    interval = timedelta(hours=4)
+    governor.register("entry-1")
+    assert governor.align_interval("entry-1", interval) == interval
+    assert governor.align_interval("entry-1", interval, jitter=timedelta(minutes=5)) == interval + timedelta(minutes=5)
+
+    governor.register("entry-2")
+    period = interval.total_seconds()
+    max_jitter = period * 0.1
+    rng = random.Random(1)
+    for now in (1_000_000.0, 1_003_600.0, 1_010_000.0):
+        first_jitter = timedelta(seconds=rng.uniform(-max_jitter, max_jitter))
+        second_jitter = timedelta(seconds=rng.uniform(-max_jitter, max_jitter))
+        with patch("custom_components.hyperoptic.governor.time.time", return_value=now):
+            first = governor.align_interval("entry-1", interval, jitter=first_jitter)
+            second = governor.align_interval("entry-2", interval, jitter=second_jitter)
+
+        # Without the jitter, each refresh lands exactly on its own slot
+        assert (now + (first - first_jitter).total_seconds()) % period == 0
+        assert (now + (second - second_jitter).total_seconds()) % period == period / 2
+        for aligned in (first, second):
+            assert period / 2 - max_jitter <= aligned.total_seconds() <= period * 1.5 + max_jitter
+
+
+def test_align_interval_waits_for_due_time(hass):
+    """Test an aligned refresh never lands before the entry has something due."""
+    governor = HyperopticGovernor(hass)
+    interval = timedelta(hours=4)
+    earliest = timedelta(hours=3, minutes=30)
+    governor.register("entry-1")
+    governor.register("entry-2")
+
+    period = interval.total_seconds()
+    for now in (1_000_000.0, 1_003_600.0, 1_010_000.0):
+        with patch("custom_components.hyperoptic.governor.time.time", return_value=now):
+            first = governor.align_interval("entry-1", interval, earliest)
+            second = governor.align_interval("entry-2", interval, earliest)
+        for aligned in (first, second):
+            assert earliest <= aligned < earliest + interval
+            assert (now + aligned.total_seconds()) % (period / 2) == 0
+
+
+@pytest.mark.asyncio
+async def test_joined_call_cancelled_with_its_last_waiter(hass):
+    """Test a joined call keeps running for its other waiters and stops with the last one."""
+    governor = HyperopticGovernor(hass)
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def _async_slow_call(conn_id: str) -> str:
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return conn_id
+
+    first = asyncio.ensure_future(governor.async_join_call(_async_slow_call, "connection-0"))
+    second = asyncio.ensure_future(governor.async_join_call(_async_slow_call, "connection-0"))
+    await started.wait()
+
+    first.cancel()
+    await asyncio.wait([first])
+    assert not cancelled.is_set()
+
+    second.cancel()
+    await asyncio.wait([second])
+    assert cancelled.is_set()
+    assert second.cancelled()
+    assert governor._calls == {}
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    """Test requests beyond the burst wait for the bucket to refill."""
+    bucket = TokenBucket(rate=100, capacity=2)
+
+    start = time.monotonic()
+    for _ in range(4):
+        await bucket.async_acquire()
+
+    assert time.monotonic() - start >= 0.015
+
+
+@pytest.mark.asyncio
+async def test_validated_login_is_adopted_once(hass):
+    """Test a handed-off login becomes the shared client of its entry."""
+    governor = HyperopticGovernor(hass)
+    client, customer = AsyncMock(), MagicMock()
+    governor.hand_off_login("Test@Example.com", "secret", client, customer)
+
+    login = governor.claim_login("test@example.com", "secret")
+    assert login.client is client
+    assert login.customer is customer
+    assert governor.claim_login("test@example.com", "secret") is None
+
+    assert governor.get_client("test@example.com", "secret", "entry-1", login.client) is client
+    late = AsyncMock()
+    assert governor.get_client("test@example.com", "secret", "entry-2", late) is client
+    await asyncio.sleep(0)
+    late.async_close.assert_awaited_once()
+    client.async_close.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_unclaimed_login_expires(hass):
+    """Test a login no entry claimed is closed after a short while."""
+    governor = HyperopticGovernor(hass)
+    client = AsyncMock()
+    with patch("custom_components.hyperoptic.governor.LOGIN_HANDOFF_SECONDS", 0):
+        governor.hand_off_login("test@example.com", "secret", client, MagicMock())
+        await asyncio.sleep(0.01)
+
+    client.async_close.assert_awaited_once()
+    assert governor.claim_login("test@example.com", "secret") is None
+
+
+@pytest.mark.asyncio
+async def test_executor_shut_down_when_unused(hass):
+    """Test clients share one executor, shut down once no entry uses it."""
+    governor = HyperopticGovernor(hass)
+    governor.register("entry-1")
+    with patch("custom_components.hyperoptic.governor.HyperopticApiClient") as mock_client_class:
+        mock_client_class.side_effect = lambda *args, **kwargs: AsyncMock()
+        governor.get_client("test@example.com", "secret", "entry-1")
+
+    executor = mock_client_class.call_args.kwargs["executor"]
+    assert executor is governor.executor
+    assert executor._max_workers == EXECUTOR_MAX_WORKERS
+
+    await governor.async_release_client("test@example.com", "secret", "entry-1")
+    assert not executor._shutdown
+    governor.unregister("entry-1")
+    assert executor._shutdown
+    assert governor.executor is not executor
@@ -1,5 +1,8 @@
 """Integration tests for Hyperoptic."""
 
+import subprocess
+import sys
+from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -9,7 +12,7 @@ from custom_components.hyperoptic import (
     async_setup_entry,
     async_unload_entry,
 )
-from custom_components.hyperoptic.const import DOMAIN
+from custom_components.hyperoptic.const import DATA_HANDOFF, DOMAIN
 
 
 @pytest.fixture
@@ -36,6 +39,7 @@ async def test_async_setup_entry(hass: HomeAssistant, mock_hyperoptic_client, mo
             "accounts": {},
         }
         mock_coordinator.async_config_entry_first_refresh = AsyncMock()
+        mock_coordinator.async_restore_data = AsyncMock(return_value=False)
         mock_coordinator_class.return_value = mock_coordinator
 
         with patch.object(
@@ -48,6 +52,33 @@ async def test_async_setup_entry(hass: HomeAssistant, mock_hyperoptic_client, mo
             assert result is True
             assert mock_config_entry.entry_id in hass.data[DOMAIN]
             assert "coordinator" in hass.data[DOMAIN][mock_config_entry.entry_id]
+            mock_coordinator.async_config_entry_first_refresh.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_async_setup_entry_warm_start(hass: HomeAssistant, mock_coordinator_data, mock_config_entry):
+    """Test setup restores handed-over data and refreshes in the background."""
+    hass.data[DOMAIN] = {DATA_HANDOFF: {mock_config_entry.entry_id: mock_coordinator_data}}
+
+    with patch("custom_components.hyperoptic.HyperopticCoordinator") as mock_coordinator_class:
+        mock_coordinator = MagicMock()
+        mock_coordinator.async_config_entry_first_refresh = AsyncMock()
+        mock_coordinator.async_restore_data = AsyncMock(return_value=True)
+        mock_coordinator_class.return_value = mock_coordinator
+
+        with patch.object(
+            hass.config_entries,
+            "async_forward_entry_setups",
+            new_callable=AsyncMock,
+        ):
+            result = await async_setup_entry(hass, mock_config_entry)
+
+        assert result is True
+        mock_coordinator.async_restore_data.assert_awaited_once_with(mock_coordinator_data)
+        mock_coordinator.async_config_entry_first_refresh.assert_not_called()
+        mock_config_entry.async_create_background_task.assert_called_once()
+        mock_coordinator.async_staggered_refresh.assert_called_once_with(0)
+        assert mock_config_entry.entry_id not in hass.data[DOMAIN][DATA_HANDOFF]
 
 
 @pytest.mark.asyncio
@@ -72,6 +103,8 @@ async def test_async_unload_entry(hass: HomeAssistant, mock_config_entry):
 
         assert result is True
         assert mock_config_entry.entry_id not in hass.data[DOMAIN]
+        handoff = hass.data[DOMAIN][DATA_HANDOFF][mock_config_entry.entry_id]
+        assert handoff is mock_coordinator.async_handoff_state.return_value
         mock_coordinator.async_shutdown.assert_called_once()
 
 
@@ -98,3 +131,21 @@ async def test_async_unload_entry_unload_failed(hass: HomeAssistant, mock_config
         assert result is False
         assert mock_config_entry.entry_id in hass.data[DOMAIN]
         mock_coordinator.async_shutdown.assert_not_called()
+
+
+def test_import_does_not_load_client_library():
+    """Test importing the integration leaves the client library to the executor."""
+    script = (
+        "import sys\n"
+        "import custom_components.hyperoptic.config_flow, custom_components.hyperoptic.sensor\n"
+        "import custom_components.hyperoptic.binary_sensor, custom_components.hyperoptic.diagnostics\n"
+        "print('hyperoptic' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert result.stdout.strip() == "False"
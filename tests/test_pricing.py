@@ -0,0 +1,83 @@
+"""Tests for Hyperoptic pricing schedule evaluation."""
+
+from datetime import date
+from types import SimpleNamespace
+
+from custom_components.hyperoptic.pricing import (
+    PricingTimeline,
+    PricingTimelineCache,
+    get_pricing_entries,
+)
+
+PRICING = [
+    {"from": None, "until": None, "price": "63.0"},
+    {"from": "2026-05-01", "until": "2026-09-01", "price": "19.0"},
+    {"from": "2025-09-01", "until": "2026-05-01", "price": "16.0"},
+]
+
+
+def _package(pricing, package_id="package-id"):
+    """Build a minimal package with a pricing schedule."""
+    return SimpleNamespace(id=package_id, plan_details=SimpleNamespace(pricing=pricing))
+
+
+def test_current_tier():
+    """Test the active tier is picked by date."""
+    timeline = PricingTimeline(get_pricing_entries(_package(PRICING)))
+
+    assert timeline.current_tier(date(2026, 1, 1)) == "Active Tier: £16.0/month"
+    assert timeline.current_tier(date(2026, 5, 1)) == "Active Tier: £19.0/month"
+    assert timeline.current_tier(date(2026, 9, 1)) == "Default Price: £63.0/month"
+    assert timeline.current_tier(date(2025, 1, 1)) == "Default Price: £63.0/month"
+
+
+def test_next_increase():
+    """Test the next increase is the end of the current period."""
+    timeline = PricingTimeline(get_pricing_entries(_package(PRICING)))
+
+    assert timeline.next_increase(date(2026, 1, 1)) == ("2026-05-01", "19.0")
+    assert timeline.next_increase(date(2026, 6, 1)) == (None, None)
+
+
+def test_price_at():
+    """Test the raw price applying on a date."""
+    timeline = PricingTimeline(get_pricing_entries(_package(PRICING)))
+
+    assert timeline.price_at(date(2026, 1, 1)) == "16.0"
+    assert timeline.price_at(date(2027, 1, 1)) == "63.0"
+    assert timeline.boundaries == [date(2026, 5, 1), date(2026, 9, 1)]
+
+
+def test_model_pricing_and_malformed_dates():
+    """Test attribute-shaped pricing and malformed dates are handled."""
+    pricing = [
+        SimpleNamespace(from_date="2025-09-01", until="not-a-date", price="10.0"),
+        SimpleNamespace(from_date="2025-09-01", until="2026-05-01", price="16.0"),
+    ]
+    timeline = PricingTimeline(get_pricing_entries(_package(pricing)))
+
+    assert timeline.current_tier(date(2026, 1, 1)) == "Active Tier: £16.0/month"
+    assert timeline.next_increase(date(2026, 1, 1)) == (None, None)
+
+
+def test_cache_reuses_unchanged_timeline():
+    """Test compiled timelines are reused until the pricing changes."""
+    cache = PricingTimelineCache()
+    package = _package(PRICING)
+
+    timeline = cache.get(package)
+
+    assert cache.get(_package(list(PRICING))) is timeline
+    assert cache.get(_package(PRICING[:2])) is not timeline
+    assert cache.get(_package([])) is None
+
+
+def test_cache_retain():
+    """Test timelines of removed packages are dropped."""
+    cache = PricingTimelineCache()
+    timeline = cache.get(_package(PRICING, "first"))
+    cache.get(_package(PRICING, "second"))
+
+    cache.retain({"second"})
+
+    assert cache.get(_package(PRICING, "first")) is not timeline
@@ -0,0 +1,77 @@
+"""Tests for Hyperoptic retries and circuit breaking."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from custom_components.hyperoptic.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    async_retry,
+)
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """Test the breaker opens after repeated failures and closes after a good trial."""
+    breaker = CircuitBreaker(threshold=2, reset_timeout=60, max_reset_timeout=300)
+    with patch("custom_components.hyperoptic.resilience.time.monotonic", return_value=1000):
+        breaker.record_failure()
+        breaker.check()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+
+    with patch("custom_components.hyperoptic.resilience.time.monotonic", return_value=1060):
+        assert breaker.state == "half_open"
+        breaker.check()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.reset_timeout == 120
+
+    with patch("custom_components.hyperoptic.resilience.time.monotonic", return_value=1180):
+        breaker.check()
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.reset_timeout == 60
+
+
+def test_circuit_breaker_admits_one_trial_call():
+    """Test only one call is let through while the circuit is half-open."""
+    breaker = CircuitBreaker(threshold=1, reset_timeout=60, max_reset_timeout=300)
+    with patch("custom_components.hyperoptic.resilience.time.monotonic", return_value=1000):
+        breaker.record_failure()
+
+    with patch("custom_components.hyperoptic.resilience.time.monotonic", return_value=1060):
+        breaker.check()
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+
+        breaker.release()
+        breaker.check()
+        breaker.record_success()
+        breaker.check()
+        breaker.check()
+
+
+@pytest.mark.asyncio
+async def test_retry_backs_off_until_success():
+    """Test retryable failures are retried with growing, capped delays."""
+    call = AsyncMock(side_effect=[Exception("HTTP 500"), Exception("HTTP 500"), "ok"])
+    with (
+        patch("custom_components.hyperoptic.resilience.asyncio.sleep") as mock_sleep,
+        patch("custom_components.hyperoptic.resilience.random.uniform", side_effect=lambda low, high: high),
+    ):
+        result = await async_retry(call, attempts=3, base_delay=1, max_delay=1.5, retryable=lambda err: True)
+
+    assert result == "ok"
+    assert [sleep.args[0] for sleep in mock_sleep.await_args_list] == [1, 1.5]
+
+
+@pytest.mark.asyncio
+async def test_retry_stops_on_permanent_failure():
+    """Test failures that are not retryable are raised at once."""
+    call = AsyncMock(side_effect=Exception("401 Unauthorized"))
+    with pytest.raises(Exception, match="401"):
+        await async_retry(call, attempts=3, base_delay=0, max_delay=0, retryable=lambda err: False)
+    assert call.await_count == 1
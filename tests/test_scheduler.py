@@ -0,0 +1,90 @@
+"""Tests for the Hyperoptic refresh scheduler."""
+
+from datetime import timedelta
+
+from custom_components.hyperoptic.const import (
+    CUSTOMER_UPDATE_INTERVAL,
+    INSTALL_UPDATE_INTERVAL,
+    RENEWAL_UPDATE_INTERVAL,
+    SCAN_INTERVAL,
+)
+from custom_components.hyperoptic.scheduler import RefreshScheduler
+
+
+def _scheduler(min_hours: int = 1, max_hours: int = 168) -> RefreshScheduler:
+    """Create a scheduler without jitter."""
+    return RefreshScheduler(timedelta(hours=min_hours), timedelta(hours=max_hours), jitter=0)
+
+
+def test_install_pending_polls_fast():
+    """Test pending installs use the fast cadence."""
+    decision = _scheduler().next_decision(install_pending=True, renewal_due=True, changed=False)
+
+    assert decision.interval == INSTALL_UPDATE_INTERVAL
+    assert decision.reason == "install_pending"
+
+
+def test_renewal_window():
+    """Test contracts near their end use the renewal cadence."""
+    decision = _scheduler().next_decision(install_pending=False, renewal_due=True, changed=False)
+
+    assert decision.interval == RENEWAL_UPDATE_INTERVAL
+    assert decision.reason == "renewal_window"
+
+
+def test_stable_backs_off_to_ceiling():
+    """Test unchanged refreshes double the interval up to the ceiling."""
+    scheduler = _scheduler(max_hours=72)
+
+    intervals = [
+        scheduler.next_decision(install_pending=False, renewal_due=False, changed=False).interval for _ in range(3)
+    ]
+
+    assert intervals == [timedelta(days=2), timedelta(days=3), timedelta(days=3)]
+
+    decision = scheduler.next_decision(install_pending=False, renewal_due=False, changed=True)
+
+    assert decision.interval == SCAN_INTERVAL
+    assert decision.reason == "changed"
+
+
+def test_floor_and_failure():
+    """Test the floor applies and failures retry no later than a day."""
+    scheduler = _scheduler(min_hours=2, max_hours=336)
+
+    assert scheduler.next_decision(install_pending=True, renewal_due=False, changed=True).interval == timedelta(hours=2)
+
+    for _ in range(5):
+        scheduler.next_decision(install_pending=False, renewal_due=False, changed=False)
+
+    assert scheduler.failure_decision().interval == SCAN_INTERVAL
+
+
+def test_jitter_stays_within_bounds():
+    """Test jittered intervals stay close to the chosen cadence."""
+    scheduler = RefreshScheduler(timedelta(hours=1), timedelta(hours=168), jitter=0.1)
+
+    for _ in range(20):
+        decision = scheduler.next_decision(install_pending=False, renewal_due=True, changed=True)
+        assert timedelta(hours=5.4) <= decision.interval <= timedelta(hours=6.6)
+        assert decision.base_interval == RENEWAL_UPDATE_INTERVAL
+
+
+def test_endpoint_cadences():
+    """Test each endpoint follows the lifecycle state it reports on."""
+    scheduler = _scheduler(max_hours=72)
+
+    installing = scheduler.next_decision(install_pending=True, renewal_due=False, changed=True).endpoints
+    assert installing == {
+        "customer": INSTALL_UPDATE_INTERVAL,
+        "packages": SCAN_INTERVAL,
+        "connections": INSTALL_UPDATE_INTERVAL,
+    }
+
+    renewing = scheduler.next_decision(install_pending=False, renewal_due=True, changed=True).endpoints
+    assert renewing == {
+        "customer": min(CUSTOMER_UPDATE_INTERVAL, timedelta(hours=72)),
+        "packages": RENEWAL_UPDATE_INTERVAL,
+        "connections": SCAN_INTERVAL,
+    }
+    assert scheduler.failure_decision().endpoints == renewing
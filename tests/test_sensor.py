@@ -4,11 +4,17 @@ from unittest.mock import MagicMock
 
 import pytest
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 
+from custom_components.hyperoptic.const import SIGNAL_STATS_UPDATED
 from custom_components.hyperoptic.sensor import (
+    DIAGNOSTIC_SENSOR_DESCRIPTIONS,
     SENSOR_DESCRIPTIONS,
+    HyperopticDiagnosticSensorEntity,
     HyperopticSensorEntity,
+    build_values,
 )
+from custom_components.hyperoptic.stats import RefreshStats
 
 
 @pytest.fixture
@@ -28,6 +34,7 @@ async def test_sensor_entity_download_speed(hass: HomeAssistant, mock_hyperoptic
     """Test download speed sensor."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
     package_id = mock_hyperoptic_client.test_package_id
 
@@ -47,6 +54,7 @@ async def test_sensor_entity_upload_speed(hass: HomeAssistant, mock_hyperoptic_c
     """Test upload speed sensor."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
     package_id = mock_hyperoptic_client.test_package_id
 
@@ -65,6 +73,7 @@ async def test_sensor_entity_current_price(hass: HomeAssistant, mock_hyperoptic_
     """Test current price sensor."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
     package_id = mock_hyperoptic_client.test_package_id
 
@@ -83,6 +92,7 @@ async def test_sensor_entity_contract_end_date(hass: HomeAssistant, mock_hyperop
     """Test contract end date sensor."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
     package_id = mock_hyperoptic_client.test_package_id
 
@@ -101,6 +111,7 @@ async def test_sensor_entity_bundle_name(hass: HomeAssistant, mock_hyperoptic_cl
     """Test bundle name sensor."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
     package_id = mock_hyperoptic_client.test_package_id
 
@@ -119,6 +130,7 @@ async def test_sensor_entity_order_status(hass: HomeAssistant, mock_hyperoptic_c
     """Test order status sensor."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
     package_id = mock_hyperoptic_client.test_package_id
 
@@ -137,6 +149,7 @@ async def test_sensor_entity_unique_id(hass: HomeAssistant, mock_hyperoptic_clie
     """Test sensor unique ID is properly generated."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
     package_id = mock_hyperoptic_client.test_package_id
 
@@ -155,6 +168,7 @@ async def test_sensor_no_coordinator_data(hass: HomeAssistant):
     """Test sensor handles no coordinator data."""
     coordinator = MagicMock()
     coordinator.data = None
+    coordinator.values = {}
 
     sensor = HyperopticSensorEntity(
         coordinator=coordinator,
@@ -174,6 +188,7 @@ async def test_sensor_entity_next_price_increase_date(
     """Test next price increase date sensor."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
     package_id = mock_hyperoptic_client.test_package_id
 
@@ -194,6 +209,7 @@ async def test_sensor_entity_next_price_increase_amount(
     """Test next price increase amount sensor."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
     package_id = mock_hyperoptic_client.test_package_id
 
@@ -212,6 +228,7 @@ async def test_sensor_entity_current_price_tier(hass: HomeAssistant, mock_hypero
     """Test current price tier sensor."""
     coordinator = MagicMock()
     coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
     uprn = str(mock_hyperoptic_client.test_account_uprn)
     package_id = mock_hyperoptic_client.test_package_id
 
@@ -223,3 +240,106 @@ async def test_sensor_entity_current_price_tier(hass: HomeAssistant, mock_hypero
     )
 
     assert sensor.native_value == "Active Tier: £16.0/month"
+
+
+@pytest.mark.asyncio
+async def test_sensor_entity_days_until_contract_end(
+    hass: HomeAssistant, mock_hyperoptic_client, mock_coordinator_data
+):
+    """Test days until contract end sensor."""
+    coordinator = MagicMock()
+    coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
+    uprn = str(mock_hyperoptic_client.test_account_uprn)
+    package_id = mock_hyperoptic_client.test_package_id
+
+    sensor = HyperopticSensorEntity(
+        coordinator=coordinator,
+        description=SENSOR_DESCRIPTIONS["days_until_contract_end"],
+        uprn=uprn,
+        package_id=package_id,
+    )
+
+    assert sensor.native_value == 244
+
+
+@pytest.mark.asyncio
+async def test_sensor_entity_days_until_next_price_increase(
+    hass: HomeAssistant, mock_hyperoptic_client, mock_coordinator_data
+):
+    """Test days until next price increase sensor."""
+    coordinator = MagicMock()
+    coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
+    uprn = str(mock_hyperoptic_client.test_account_uprn)
+    package_id = mock_hyperoptic_client.test_package_id
+
+    sensor = HyperopticSensorEntity(
+        coordinator=coordinator,
+        description=SENSOR_DESCRIPTIONS["days_until_next_price_increase"],
+        uprn=uprn,
+        package_id=package_id,
+    )
+
+    assert sensor.native_value == 120
+
+
+@pytest.mark.asyncio
+async def test_sensor_skips_unchanged_update(hass: HomeAssistant, mock_hyperoptic_client, mock_coordinator_data):
+    """Test sensor only writes state when its package changed."""
+    coordinator = MagicMock()
+    coordinator.data = mock_coordinator_data
+    coordinator.values = build_values(mock_coordinator_data)
+    uprn = str(mock_hyperoptic_client.test_account_uprn)
+    package_id = mock_hyperoptic_client.test_package_id
+
+    sensor = HyperopticSensorEntity(
+        coordinator=coordinator,
+        description=SENSOR_DESCRIPTIONS["order_status"],
+        uprn=uprn,
+        package_id=package_id,
+    )
+    sensor.async_write_ha_state = MagicMock()
+
+    coordinator.data_changed.return_value = False
+    sensor._handle_coordinator_update()
+
+    sensor.async_write_ha_state.assert_not_called()
+    coordinator.data_changed.assert_called_with({("package", package_id), ("account", uprn)})
+
+    coordinator.data_changed.return_value = True
+    sensor._handle_coordinator_update()
+
+    sensor.async_write_ha_state.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_diagnostic_sensors(hass: HomeAssistant):
+    """Test refresh statistics sensors follow the coordinator statistics."""
+    coordinator = MagicMock()
+    coordinator.stats = RefreshStats()
+    sensors = {
+        key: HyperopticDiagnosticSensorEntity(coordinator, description, "test_entry")
+        for key, description in DIAGNOSTIC_SENSOR_DESCRIPTIONS.items()
+    }
+
+    assert sensors["api_latency"].native_value is None
+    assert sensors["consecutive_failures"].native_value == 0
+    assert sensors["api_latency"]._attr_unique_id == "hyperoptic_test_entry_api_latency"
+
+    coordinator.stats.phase("customer").record(0.2)
+    coordinator.stats.phase("packages").record(0.4)
+    coordinator.stats.record_refresh(0.75, "HTTP 500")
+    coordinator.stats.record_refresh(1.5, "HTTP 500")
+
+    assert sensors["api_latency"].native_value == 300
+    assert sensors["last_refresh_duration"].native_value == 1500
+    assert sensors["consecutive_failures"].native_value == 2
+
+    sensor = sensors["consecutive_failures"]
+    sensor.hass = hass
+    sensor.async_write_ha_state = MagicMock()
+    await sensor.async_added_to_hass()
+    async_dispatcher_send(hass, SIGNAL_STATS_UPDATED.format("test_entry"))
+
+    sensor.async_write_ha_state.assert_called_once()
@@ -0,0 +1,156 @@
+"""Tests for the Hyperoptic services."""
+
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.hyperoptic import sensor
+from custom_components.hyperoptic.const import DOMAIN, SERVICE_REFRESH
+from custom_components.hyperoptic.coordinator import HyperopticCoordinator
+from custom_components.hyperoptic.services import async_setup_services
+
+from .fake_hyperoptic import FakeHyperopticServer, generate_dataset
+
+TOKEN = "/realms/hyperoptic/protocol/openid-connect/token"
+CUSTOMERS = "/account-service/customers"
+PACKAGES = "/account-service/customers/{customer_id}/packages"
+CONNECTION = "/account-service/connections/{connection_id}"
+
+
+async def _async_add_entry(hass: HomeAssistant, entry_id: str) -> HyperopticCoordinator:
+    """Refresh a coordinator and register it as a loaded entry."""
+    coordinator = HyperopticCoordinator(hass, email="test@example.com", password="password")
+    await coordinator.async_refresh()
+    # Make the data old enough to be refreshed on demand
+    coordinator.fetched_at = {
+        endpoint: fetched_at - timedelta(minutes=5) for endpoint, fetched_at in coordinator.fetched_at.items()
+    }
+    hass.data.setdefault(DOMAIN, {})[entry_id] = {"coordinator": coordinator}
+    entries = [SimpleNamespace(entry_id=entry_id) for entry_id in hass.data[DOMAIN]]
+    hass.config_entries.async_entries = lambda domain=None: entries
+    return coordinator
+
+
+@pytest.mark.asyncio
+async def test_refresh_targets_uprn_and_endpoint(hass: HomeAssistant):
+    """Test a refresh of one endpoint of the entry owning a UPRN."""
+    async_setup_services(hass)
+    async with FakeHyperopticServer(generate_dataset(accounts=2)) as server:
+        with server.patch_client():
+            first = await _async_add_entry(hass, "entry-1")
+            server.dataset.customer["accounts"][1]["uprn"] = 200_000_000_000
+            second = await _async_add_entry(hass, "entry-2")
+            first_fetched_at = dict(first.fetched_at)
+            requests = server.requests.copy()
+
+            await hass.services.async_call(
+                DOMAIN, SERVICE_REFRESH, {"uprn": "200000000000", "endpoint": "packages"}, blocking=True
+            )
+
+            assert server.requests[PACKAGES] == requests[PACKAGES] + 1
+            assert server.requests[CUSTOMERS] == requests[CUSTOMERS]
+            assert server.requests[CONNECTION] == requests[CONNECTION]
+            assert first.fetched_at == first_fetched_at
+            assert second.stale_endpoints == set()
+
+            await first.async_shutdown()
+            await second.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_fetch(hass: HomeAssistant):
+    """Test service calls and a scheduled poll arriving together fetch once."""
+    async_setup_services(hass)
+    async with FakeHyperopticServer(generate_dataset(accounts=2), latency=0.05) as server:
+        with server.patch_client():
+            coordinator = await _async_add_entry(hass, "entry-1")
+            requests = server.requests.copy()
+
+            async def _async_scheduled_poll() -> None:
+                await asyncio.sleep(0.01)
+                await coordinator._async_update_data()
+
+            await asyncio.gather(
+                hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True),
+                hass.services.async_call(DOMAIN, SERVICE_REFRESH, {"config_entry_id": "entry-1"}, blocking=True),
+                hass.services.async_call(DOMAIN, SERVICE_REFRESH, {"endpoint": "customer"}, blocking=True),
+                _async_scheduled_poll(),
+            )
+            # Nothing was left invalidated for the next poll either
+            await coordinator._async_update_data()
+
+            assert coordinator.last_update_success
+            assert server.requests[CUSTOMERS] == requests[CUSTOMERS] + 1
+            assert server.requests[PACKAGES] == requests[PACKAGES] + 1
+            assert server.requests[CONNECTION] == requests[CONNECTION] + 2
+            assert server.requests[TOKEN] == requests[TOKEN]
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_refresh_skips_fresh_data(hass: HomeAssistant):
+    """Test endpoints fetched within the minimum age are not fetched again."""
+    async_setup_services(hass)
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            coordinator = await _async_add_entry(hass, "entry-1")
+            await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
+            requests = server.requests.copy()
+
+            assert await coordinator.async_refresh_on_demand() == set()
+            await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
+
+            assert server.requests == requests
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_refresh_writes_recovered_state(hass: HomeAssistant):
+    """Test a refresh that recovers unchanged data writes the entities' state."""
+    async_setup_services(hass)
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            coordinator = await _async_add_entry(hass, "entry-1")
+            coordinator.async_add_value_builder(sensor.build_values)
+            entity = sensor.HyperopticSensorEntity(
+                coordinator, sensor.SENSOR_DESCRIPTIONS["bundle_name"], "100000000000", "package-0"
+            )
+            written: list[dict] = []
+            entity.async_write_ha_state = MagicMock(side_effect=lambda: written.append(entity.extra_state_attributes))
+            coordinator.async_add_listener(entity._handle_coordinator_update)
+
+            server.failing.add(PACKAGES)
+            await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
+            assert coordinator.last_update_success
+            assert written[-1]["stale"]
+
+            server.failing.clear()
+            # Skip the cooldown the first call started
+            coordinator._on_demand_refresh.async_cancel()
+            await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {"endpoint": "packages"}, blocking=True)
+            assert written[-1] == {"data_age": None, "stale": False}
+
+            await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_refresh_rejects_unknown_targets(hass: HomeAssistant):
+    """Test targeting an entry or UPRN that is not loaded fails validation."""
+    async_setup_services(hass)
+    async with FakeHyperopticServer() as server:
+        with server.patch_client():
+            coordinator = await _async_add_entry(hass, "entry-1")
+
+            with pytest.raises(ServiceValidationError):
+                await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {"uprn": "1"}, blocking=True)
+            with pytest.raises(ServiceValidationError):
+                await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {"config_entry_id": "missing"}, blocking=True)
+
+            await coordinator.async_shutdown()
@@ -0,0 +1,93 @@
+"""Tests for the Hyperoptic data snapshots."""
+
+import dataclasses
+import json
+
+import pytest
+from hyperoptic.models import Account, Package
+
+from custom_components.hyperoptic.pricing import PricingTimeline, PricingTimelineCache
+from custom_components.hyperoptic.snapshot import (
+    AccountSnapshot,
+    ConnectionSnapshot,
+    CustomerSnapshot,
+    PackageSnapshot,
+)
+
+
+def test_snapshots_copy_used_fields():
+    """Test snapshots keep only the fields the platforms read."""
+    account = Account.model_validate({"id": "account-id", "uprn": 123, "orderStatus": "ACTIVE", "haveHyperhub": True})
+    package = Package.model_validate(
+        {
+            "id": "package-id",
+            "identifier": 654321,
+            "bundleName": "1Gb Fibre",
+            "endDate": "2026-09-02",
+            "broadbandProduct": {"downloadSpeedMbps": 1000, "uploadSpeedMbps": 900},
+            "planDetails": {"pricing": [{"from": None, "until": None, "price": "63.0"}]},
+        }
+    )
+
+    assert AccountSnapshot.from_api(account) == AccountSnapshot(uprn=123, order_status="ACTIVE", have_hyperhub=True)
+    assert ConnectionSnapshot.from_api({"id": "connection-id", "premiseUprn": 123}) == ConnectionSnapshot(
+        id="connection-id", premise_uprn=123, is_installed=False
+    )
+
+    snapshot = PackageSnapshot.from_api(package, PricingTimelineCache().get(package))
+    assert (snapshot.download_speed, snapshot.upload_speed) == (1000, 900)
+    assert snapshot.bundle_name == "1Gb Fibre"
+    assert snapshot.pricing_timeline is not None
+    assert not hasattr(snapshot, "__dict__")
+
+
+def test_snapshots_are_immutable_and_comparable():
+    """Test snapshots are frozen, hashable and compare by their fields."""
+    snapshot = ConnectionSnapshot(id="connection-id", premise_uprn=123, is_installed=True)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.is_installed = False
+
+    package = PackageSnapshot(
+        id="package-id",
+        bundle_name=None,
+        download_speed=None,
+        upload_speed=None,
+        current_price=None,
+        end_date=None,
+        can_renew=False,
+    )
+    assert dataclasses.replace(package, pricing_timeline=object()) == package
+    assert dataclasses.replace(package, can_renew=True) != package
+    assert len({snapshot, dataclasses.replace(snapshot)}) == 1
+
+
+def test_snapshots_round_trip_through_json():
+    """Test stored snapshots rebuild equal snapshots with the same pricing."""
+    customer = CustomerSnapshot(
+        id="customer-id",
+        accounts={"123": AccountSnapshot(uprn=123, order_status="ACTIVE", have_hyperhub=True, connection_id="c-1")},
+    )
+    connection = ConnectionSnapshot(id="c-1", premise_uprn=123, is_installed=True)
+    entries = ((None, None, "63.0"), ("2025-09-01", "2026-05-01", "16.0"))
+    package = PackageSnapshot(
+        id="package-id",
+        bundle_name="1Gb Fibre",
+        download_speed=1000,
+        upload_speed=900,
+        current_price=16.0,
+        end_date="2026-09-02",
+        can_renew=True,
+        current_price_tier="Active Tier: £16.0/month",
+        pricing_timeline=PricingTimeline(entries),
+    )
+
+    assert CustomerSnapshot.from_dict(json.loads(json.dumps(customer.as_dict()))) == customer
+    assert ConnectionSnapshot.from_dict(json.loads(json.dumps(connection.as_dict()))) == connection
+
+    stored = json.loads(json.dumps(package.as_dict()))
+    assert "current_price_tier" not in stored
+    timeline = PricingTimelineCache().get_for_entries(stored["id"], tuple(map(tuple, stored["pricing"])))
+    restored = PackageSnapshot.from_dict(stored, timeline)
+    assert restored == dataclasses.replace(package, current_price_tier=None)
+    assert restored.pricing_timeline.entries == entries
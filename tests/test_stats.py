@@ -0,0 +1,35 @@
+"""Tests for the Hyperoptic refresh statistics."""
+
+from custom_components.hyperoptic.const import STATS_HISTORY
+from custom_components.hyperoptic.stats import PhaseStats, RefreshStats
+
+
+def test_phase_histogram_and_history():
+    """Test durations are bucketed and only the recent ones are kept."""
+    phase = PhaseStats()
+    for duration in (0.05, 0.3, 0.3, 20):
+        phase.record(duration)
+    phase.record(1.0, "HTTP 500")
+
+    histogram = phase.histogram()
+    assert histogram["le_0.1"] == 1
+    assert histogram["le_0.5"] == 2
+    assert histogram["le_1"] == 1
+    assert histogram["inf"] == 1
+    assert (phase.successes, phase.failures, phase.last_error) == (4, 1, "HTTP 500")
+
+    for _ in range(STATS_HISTORY):
+        phase.record(0.01)
+    assert len(phase.durations) == STATS_HISTORY
+
+
+def test_consecutive_failures_reset_on_success():
+    """Test the failure streak resets after a successful refresh."""
+    stats = RefreshStats()
+    stats.record_refresh(1.0, "timeout")
+    stats.record_refresh(1.0, "timeout")
+    assert stats.consecutive_failures == 2
+
+    stats.record_refresh(0.5)
+    assert stats.consecutive_failures == 0
+    assert stats.as_dict()["refresh"]["successes"] == 1